@@ -1,30 +1,65 @@
 # agent.py - MAIN AGENT SYSTEM
-from speech import TeluguVoice
-from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+import contextvars
+import queue
+
 from memory import ConversationMemory
+from autonomous_planner import AutonomousPlanner
+from dialogue_fsm import DialogueFSM
+from fact_extractor import extract_facts
+import tracing
+from channels import ReplayChannel, VoiceChannel
+
+DIALOGUE_FSM = DialogueFSM()
+EXIT_WORDS = ["ధన్యవాదాలు", "బై", "పూర్తి"]
+_shared_tools = None
+_tool_pool = None
+
+
+def shared_tools():
+    """Default (Tool1, Tool2), built on first use and shared by every agent"""
+    global _shared_tools
+    if _shared_tools is None:
+        from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+        _shared_tools = (Tool1_EligibilityChecker(), Tool2_SchemeRecommender())
+    return _shared_tools
+
+
+def is_exit(text):
+    """True if the caller said an exit word as a word of its own ("డెబ్బై" is seventy, not "బై")"""
+    return any(word.strip(".,!?।") in EXIT_WORDS for word in text.split())
+
+
+def tool_pool():
+    """Threads that run planner tool calls while run() keeps talking"""
+    global _tool_pool
+    if _tool_pool is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        _tool_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agent-tools")
+    return _tool_pool
 
 
 class TeluguGovernmentAgent:
     """Main agent with state machine"""
 
-    def __init__(self):
-        # Initialize components
-        self.voice = TeluguVoice()
-        self.tool1 = Tool1_EligibilityChecker()
-        self.tool2 = Tool2_SchemeRecommender()
-        self.memory = ConversationMemory()
-
-        # State machine
-        self.state = "START"
-        self.states = {
-            "START": self.handle_start,
-            "ASK_OCCUPATION": self.handle_ask_occupation,
-            "ASK_AGE": self.handle_ask_age,
-            "ASK_INCOME": self.handle_ask_income,
-            "CHECK_ELIGIBILITY": self.handle_check_eligibility,
-            "RECOMMEND": self.handle_recommend,
-            "END": self.handle_end
-        }
+    def __init__(self, tool1=None, tool2=None, use_voice=True, voice=None, memory=None):
+        # Initialize components (tools can be shared between sessions)
+        self._voice = voice  # None + use_voice: TeluguVoice, built when a voice channel needs it
+        self.use_voice = use_voice
+        self._tool1 = tool1  # None: shared_tools(), built when a handler first needs it
+        self._tool2 = tool2
+        self.memory = memory or ConversationMemory()
+        self.eligible_schemes = []
+        self.recommendations = []  # last Tool 2 result
+        self.prewarmed_profile = None  # profile the tools last started on from a partial transcript
+
+        # State machine: compiled once per process, shared by every agent
+        self.fsm = DIALOGUE_FSM
+        self.state = self.fsm.initial
+        self.planner = AutonomousPlanner()
+        self.eligibility_checked = False
+        self.recommendations_given = False
 
         # Telugu responses
         self.responses = {
@@ -34,65 +69,81 @@ class TeluguGovernmentAgent:
             "ask_income": "మీ వార్షిక ఆదాయం ఎంత?",
             "processing": "మీ సమాచారం తనిఖీ చేస్తున్నాను...",
             "contradiction": "క్షమించండి, మునుపు మీరు '{old}' అన్నారు, ఇప్పుడు '{new}' అంటున్నారు. ఏది నిజం?",
+            "not_eligible": "క్షమించండి, మీరు ఏ పథకానికీ అర్హులు కాదు.",
             "error": "దోషం జరిగింది. దయచేసి మళ్లీ ప్రయత్నించండి.",
             "thank_you": "ధన్యవాదాలు! మళ్లీ కలుద్దాం."
         }
 
         print("🤖 తెలుగు ప్రభుత్వ పథకాల ఏజెంట్ సిద్ధంగా ఉంది")
 
+    @property
+    def voice(self):
+        if self._voice is None and self.use_voice:
+            from speech import TeluguVoice  # text-only agents never import the voice stack
+
+            self._voice = TeluguVoice()
+        return self._voice
+
+    @property
+    def tool1(self):
+        if self._tool1 is None:
+            self._tool1 = shared_tools()[0]
+        return self._tool1
+
+    @property
+    def tool2(self):
+        if self._tool2 is None:
+            self._tool2 = shared_tools()[1]
+        return self._tool2
+
     def handle_start(self, user_input):
         """Handle START state"""
-        self.voice.speak(self.responses["greeting"])
-        self.state = "ASK_OCCUPATION"
-        return self.responses["ask_occupation"]
-
-    def handle_ask_occupation(self, user_input):
-        """Handle occupation question"""
-        # Store in memory
-        self.memory.add_interaction(user_input, "Occupation asked", self.state)
-
-        # Check for contradictions
-        contradictions = self.memory.get_contradictions()
-        if contradictions:
-            for cont in contradictions:
-                if cont["field"] == "occupation":
-                    return self.responses["contradiction"].format(
-                        old=cont["old"], new=cont["new"]
-                    )
-
-        self.state = "ASK_AGE"
-        return self.responses["ask_age"]
-
-    def handle_ask_age(self, user_input):
-        """Handle age question"""
-        self.memory.add_interaction(user_input, "Age asked", self.state)
-
-        # Check contradictions
-        contradictions = self.memory.get_contradictions()
-        if contradictions:
-            for cont in contradictions:
-                if cont["field"] == "age":
-                    return self.responses["contradiction"].format(
-                        old=cont["old"], new=cont["new"]
-                    )
-
-        self.state = "ASK_INCOME"
-        return self.responses["ask_income"]
-
-    def handle_ask_income(self, user_input):
-        """Handle income question"""
-        self.memory.add_interaction(user_input, "Income asked", self.state)
-
-        # Now we have all info, move to checking
-        self.state = "CHECK_ELIGIBILITY"
-        return self.responses["processing"]
+        self.state = self.fsm.initial
+        response = self.fsm.step(self, user_input)
+        self.memory.save_position(self.state)
+        return response
+
+    def resume(self):
+        """Continue where the memory store says this session's dialogue is; False if nowhere"""
+        position = self.memory.position
+        if position is None:
+            return False
+        self.state = position[0]
+        if self.state == "RECOMMEND":
+            # Only reached with eligible schemes; the planner recommends next
+            self.eligible_schemes = self.tool1.check(self.memory.get_user_profile())
+            self.eligibility_checked = True
+        return True
+
+    def find_contradiction(self, field):
+        """First contradiction recorded for a slot"""
+        return self.memory.get_contradiction(field)
+
+    def planner_context(self):
+        """What AutonomousPlanner needs to pick the next action"""
+        return {
+            'user_profile': self.memory.user_facts,
+            'eligibility_checked': self.eligibility_checked,
+            'eligible_schemes': self.eligible_schemes,
+            'recommendations_given': self.recommendations_given
+        }
+
+    def ask_missing_slot(self, user_input):
+        """Planner wants more information: go back to the first unanswered question"""
+        slot_state = self.fsm.first_missing_slot(self.memory.user_facts)
+        if slot_state is None:
+            return self.handle_check_eligibility(user_input)
+        self.state = slot_state.name
+        return self.responses[slot_state.prompt]
 
     def handle_check_eligibility(self, user_input):
         """USE TOOL 1: Check eligibility"""
         user_profile = self.memory.get_user_profile()
 
         # TOOL 1 CALL
-        eligible_schemes = self.tool1.check(user_profile)
+        with tracing.span("tool:eligibility_checker"):
+            eligible_schemes = self.tool1.check(user_profile)
+        self.eligibility_checked = True
 
         if eligible_schemes:
             self.eligible_schemes = eligible_schemes
@@ -100,14 +151,17 @@ class TeluguGovernmentAgent:
             return f"మీకు {len(eligible_schemes)} పథకాలు అర్హత ఉన్నాయి"
         else:
             self.state = "END"
-            return "క్షమించండి, మీరు ఏ పథకానికీ అర్హులు కాదు."
+            return self.responses["not_eligible"]
 
     def handle_recommend(self, user_input):
         """USE TOOL 2: Recommend schemes"""
         user_profile = self.memory.get_user_profile()
 
         # TOOL 2 CALL
-        recommendations = self.tool2.recommend(self.eligible_schemes, user_profile)
+        with tracing.span("tool:scheme_recommender"):
+            recommendations = self.tool2.recommend(self.eligible_schemes, user_profile)
+        self.recommendations = recommendations
+        self.recommendations_given = True
 
         # Build response
         response = "మీకు సిఫార్సు చేస్తున్న పథకాలు:\n\n"
@@ -126,42 +180,120 @@ class TeluguGovernmentAgent:
 
     def process(self, user_input):
         """Main processing function - STATE MACHINE"""
-        if self.state in self.states:
-            response = self.states[self.state](user_input)
-            return response
-        else:
-            return self.responses["error"]
+        with tracing.session(self.memory.session_id), tracing.span("state:" + self.state):
+            response = self.fsm.step(self, user_input)
+        self.memory.save_position(self.state)
+        return response
+
+    def predict_next_responses(self):
+        """Fixed responses the next turn will most likely say"""
+        return [self.responses[key] for key in self.fsm.predict(self)]
+
+    def handle_partial(self, partial_text):
+        """Partial transcript while the caller is still talking: read facts early
+
+        Once what has been heard completes the profile, the eligibility check
+        and recommendation start on the tool pool, so the tool turns after the
+        final transcript find their results in the tools' caches.
+        """
+        facts = extract_facts(partial_text)
+        if not facts:
+            return
+        profile = dict(self.memory.user_facts, **facts)
+        if self.fsm.first_missing_slot(profile) is None and profile != self.prewarmed_profile:
+            self.prewarmed_profile = profile
+            print(f"⏳ {partial_text} -> {facts}: పథకాలు ముందుగానే తనిఖీ చేస్తున్నాను")
+            tool_pool().submit(contextvars.copy_context().run, self.prewarm_tools, profile)
+
+    def prewarm_tools(self, profile):
+        """Run the tools once for a profile heard early (results land in their caches)"""
+        with tracing.span("tool:prewarm"):
+            eligible = self.tool1.check(profile)
+            if eligible:
+                self.tool2.recommend(eligible, profile)
+
+    def run_tools(self, decision, deliver):
+        """Call tools for as long as the planner asks for one; deliver(reply) after each"""
+        while decision is not None:
+            with tracing.span("state:" + self.state):
+                reply = self.fsm.step(self, "", decision)
+            self.memory.save_position(self.state)
+            deliver(reply)
+            decision = self.fsm.tool_decision(self)
+
+    def send_with_tools(self, channel, reply, decision):
+        """Send reply while the tools run; their replies follow as soon as each is ready"""
+        if not channel.blocking_send:
+            # send() only queued the reply (voice synthesizes and plays it on its
+            # own threads), so the tools can run right here meanwhile
+            channel.send(reply)
+            self.run_tools(decision, channel.send)
+            return
+
+        replies = queue.SimpleQueue()
+
+        def work():
+            try:
+                self.run_tools(decision, replies.put)
+            except Exception as e:
+                replies.put(e)
+            replies.put(None)
+
+        # The copied context carries the trace session to the tool thread
+        tool_pool().submit(contextvars.copy_context().run, work)
+        channel.send(reply)
+        for result in iter(replies.get, None):
+            if isinstance(result, Exception):
+                raise result
+            channel.send(result)
+
+    def run(self, channel):
+        """Drive one conversation over a channel (voice, text, replay...)"""
+        session_id = self.memory.session_id
+        predict = channel.wants_predictions
+        channel.open(self)
+
+        # Greeting + first question (a voice channel synthesizes the question meanwhile)
+        with tracing.session(session_id):
+            if predict:
+                channel.expect(self.predict_next_responses())
+            channel.send(self.handle_start(""))
+            if predict:
+                channel.expect(self.predict_next_responses())
+
+        while self.state != "END":
+            with tracing.session(session_id), tracing.span("turn"):
+                user_input = channel.receive()
+                if user_input is None:
+                    break  # channel closed
+                if not user_input:
+                    continue
+
+                # Check for exit
+                if is_exit(user_input):
+                    channel.send(self.responses["thank_you"])
+                    break
+
+                reply = self.process(user_input)
+                decision = self.fsm.tool_decision(self)
+                if decision is None:
+                    channel.send(reply)
+                else:
+                    # Profile complete: no need to wait for another user turn
+                    # before the planner's tools run ("processing" goes out meanwhile)
+                    self.send_with_tools(channel, reply, decision)
+                if predict:
+                    # Likely next replies, prepared while the user answers
+                    channel.expect(self.predict_next_responses())
+
+        channel.close()
 
     def run_voice_conversation(self):
         """Run complete voice conversation"""
         print("\n" + "=" * 60)
         print("తెలుగు ప్రభుత్వ పథకాల ఏజెంట్")
         print("=" * 60)
-
-        # Start with greeting
-        response = self.handle_start("")
-        self.voice.speak(response)
-
-        conversation_active = True
-
-        while conversation_active and self.state != "END":
-            # Listen to user
-            user_input = self.voice.listen()
-
-            if not user_input:
-                continue
-
-            # Check for exit
-            if any(word in user_input for word in ["ధన్యవాదాలు", "బై", "పూర్తి"]):
-                self.voice.speak(self.responses["thank_you"])
-                break
-
-            # Process input
-            response = self.process(user_input)
-
-            # Speak response
-            self.voice.speak(response)
-
+        self.run(VoiceChannel(self.voice))
         print("\n" + "=" * 60)
         print("సంభాషణ పూర్తయింది")
         print("=" * 60)
@@ -182,35 +314,20 @@ class TeluguGovernmentAgent:
         ]
 
         print("\n🔧 ఏజెంట్ ప్రారంభం...")
-        response = self.handle_start("")
-        print(f"🤖: {response}")
-
-        for user_input in test_inputs:
-            print(f"\n👤: {user_input}")
-
-            if "ధన్యవాదాలు" in user_input:
-                print("🤖: ధన్యవాదాలు!")
-                break
-
-            response = self.process(user_input)
-            print(f"🤖: {response}")
-
-            if self.state == "END":
-                break
+        self.run(ReplayChannel(test_inputs, echo=True))
 
 
 # Main function
 def main():
     """Main function to run the agent"""
     try:
-        agent = TeluguGovernmentAgent()
-
-        # Ask user for mode
+        # Ask user for mode (the voice stack is only loaded for voice mode)
         print("\nమోడ్ ఎంచుకోండి:")
         print("1. వాయిస్ మోడ్ (మైక్రోఫోన్ అవసరం)")
         print("2. టెక్స్ట్ డెమో మోడ్")
 
         choice = input("ఎంపిక (1 లేదా 2): ")
+        agent = TeluguGovernmentAgent(use_voice=choice == "1")
 
         if choice == "1":
             agent.run_voice_conversation()
@@ -220,7 +337,7 @@ def main():
     except Exception as e:
         print(f"❌ దోషం: {e}")
         print("టెక్స్ట్ డెమో తో ప్రారంభిస్తున్నాను...")
-        agent = TeluguGovernmentAgent()
+        agent = TeluguGovernmentAgent(use_voice=False)
         agent.run_text_demo()
 
 
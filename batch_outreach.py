@@ -0,0 +1,189 @@
+# batch_outreach.py - VECTORIZED ELIGIBILITY & RECOMMENDATION FOR BULK OUTREACH
+import numpy as np
+
+from scoring_rules import NUMERIC_RULE_FIELDS, CompiledScoring
+
+NO_OCCUPATION = -1  # profile without (or with an unknown) occupation
+ANY_OCCUPATION = -2  # scheme open to every occupation
+OTHER_OCCUPATION = -3  # scheme occupation outside the vocabulary
+
+
+class BatchSchemeMatcher:
+    """Runs Tool 1 + Tool 2 over columnar profiles (age, income, occupation code)"""
+
+    def __init__(self, schemes, occupations=None):
+        self.schemes = schemes
+        self.scoring = CompiledScoring(schemes)
+
+        # Occupation vocabulary: profile codes index into this list
+        if occupations is None:
+            occupations = sorted({s["occupation"] for s in schemes if s["occupation"] != "any"})
+        self.occupations = list(occupations)
+        # Occupations the scoring rules test must have codes too
+        for field, op, value in self.scoring.features:
+            if field == "occupation" and value not in self.occupations:
+                self.occupations.append(value)
+        self.occupation_codes = {occ: code for code, occ in enumerate(self.occupations)}
+
+        self.min_age = np.array([s.get("min_age", -np.inf) for s in schemes], dtype=np.float64)
+        self.max_income = np.array([s.get("max_income", np.inf) for s in schemes], dtype=np.float64)
+        self.scheme_occupation = np.array(
+            [ANY_OCCUPATION if s["occupation"] == "any"
+             else self.occupation_codes.get(s["occupation"], OTHER_OCCUPATION)
+             for s in schemes], dtype=np.int32)
+
+        # Tool 2 rules: points of each feature (row) for each scheme (column)
+        self.weights = np.zeros((len(self.scoring.features), len(schemes)), dtype=np.int32)
+        for entries, positions in self.scoring.groups:
+            for feature, name, points in entries:
+                self.weights[feature, positions] += points
+
+        print(f"📦 బ్యాచ్ మ్యాచర్: {len(schemes)} పథకాలు")
+
+    def encode_occupations(self, values):
+        """Map occupation strings (or None) to int codes"""
+        codes = self.occupation_codes
+        return np.array([codes.get(v, NO_OCCUPATION) for v in values], dtype=np.int32)
+
+    def encode_profiles(self, profiles):
+        """Turn profile dicts into columns with the same defaults as the tools"""
+        ages = np.array([p.get("age", 0) for p in profiles], dtype=np.float64)
+        incomes = np.array([p.get("income", 0) for p in profiles], dtype=np.float64)
+        occupations = self.encode_occupations([p.get("occupation") for p in profiles])
+        return ages, incomes, occupations
+
+    def eligibility_matrix(self, ages, incomes, occupation_codes):
+        """Bool matrix (profiles x schemes), same rules as is_eligible()"""
+        ages = np.asarray(ages, dtype=np.float64)[:, None]
+        incomes = np.asarray(incomes, dtype=np.float64)[:, None]
+        occupation_codes = np.asarray(occupation_codes, dtype=np.int32)[:, None]
+
+        return ((ages >= self.min_age)
+                & (incomes <= self.max_income)
+                & ((self.scheme_occupation == ANY_OCCUPATION)
+                   | (self.scheme_occupation == occupation_codes)))
+
+    def feature_matrix(self, ages, incomes, occupation_codes):
+        """Bool matrix (profiles x rule features), same tests as CompiledScoring.active()"""
+        columns = {"age": np.asarray(ages, dtype=np.float64),
+                   "income": np.asarray(incomes, dtype=np.float64),
+                   "occupation": np.asarray(occupation_codes, dtype=np.int32)}
+        features = np.zeros((len(columns["age"]), len(self.scoring.features)), dtype=bool)
+        for feature, field, default, test, value in self.scoring.tests:
+            if field not in NUMERIC_RULE_FIELDS:
+                value = self.occupation_codes[value]
+            features[:, feature] = test(columns[field], value)
+        return features
+
+    def score_matrix(self, ages, incomes, occupation_codes):
+        """Tool 2 scores for every (profile, scheme) pair"""
+        features = self.feature_matrix(ages, incomes, occupation_codes)
+        return features.astype(np.int32) @ self.weights
+
+    def recommend_top3(self, ages, incomes, occupation_codes, eligible=None):
+        """Top 3 scheme indices and scores per profile (-1 where fewer than 3)"""
+        if eligible is None:
+            eligible = self.eligibility_matrix(ages, incomes, occupation_codes)
+        scores = self.score_matrix(ages, incomes, occupation_codes)
+        count, width = eligible.shape
+        k = min(3, width)
+
+        # Higher score first, ties keep catalog order (like the stable sort in recommend).
+        # Scores may be negative, so ineligible schemes get the lowest key possible
+        # and eligibility is read from its own mask, never from the key.
+        rank_key = scores.astype(np.int64) * width + (width - 1 - np.arange(width))
+        rank_key = np.where(eligible, rank_key, np.iinfo(np.int64).min + 1)  # + 1: safe to negate
+
+        if width > k:
+            top = np.argpartition(-rank_key, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(width), (count, width)).copy()
+        top_keys = np.take_along_axis(rank_key, top, axis=1)
+        order = np.argsort(-top_keys, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+
+        indices = np.full((count, 3), -1, dtype=np.int32)
+        top_scores = np.full((count, 3), -1, dtype=np.int32)
+        valid = np.take_along_axis(eligible, top, axis=1)
+        indices[:, :k] = np.where(valid, top, -1)
+        top_scores[:, :k] = np.where(valid, np.take_along_axis(scores, top, axis=1), -1)
+        return indices, top_scores
+
+    def run(self, ages, incomes, occupation_codes, chunk_size=65536):
+        """Yield (start, eligible, indices, scores) chunk by chunk for huge inputs"""
+        ages = np.asarray(ages)
+        incomes = np.asarray(incomes)
+        occupation_codes = np.asarray(occupation_codes)
+        for start in range(0, len(ages), chunk_size):
+            end = start + chunk_size
+            eligible = self.eligibility_matrix(ages[start:end], incomes[start:end],
+                                               occupation_codes[start:end])
+            indices, scores = self.recommend_top3(ages[start:end], incomes[start:end],
+                                                  occupation_codes[start:end], eligible)
+            yield start, eligible, indices, scores
+
+    def to_recommendations(self, indices_row, scores_row, recommender, profile):
+        """One profile's result in the same shape as Tool2.recommend()"""
+        active = self.scoring.active(profile)
+        return [{
+            "scheme": self.schemes[i],
+            "score": int(score),
+            "priority": recommender.get_priority(int(score)),
+            "breakdown": self.scoring.breakdown(i, active)
+        } for i, score in zip(indices_row, scores_row) if i >= 0]
+
+
+# Benchmark: per-dict tools vs vectorized batch
+if __name__ == "__main__":
+    import contextlib
+    import os
+    import time
+    from eligibility_index import generate_catalog, generate_profiles
+    from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+    checker = Tool1_EligibilityChecker()
+    recommender = Tool2_SchemeRecommender()
+
+    # Penalties: eligible schemes can score below zero and must still be ranked
+    penalized = generate_catalog(300, seed=8)
+    for i, scheme in enumerate(penalized):
+        if i % 3 == 0:
+            scheme["scoring"] = [{"name": "senior", "field": "age", "op": "ge", "value": 60, "points": -8},
+                                 {"name": "low_income", "field": "income", "op": "lt", "value": 50000, "points": 5}]
+        elif i % 3 == 1:
+            scheme["scoring"] = [{"name": "not_farmer", "field": "occupation", "op": "ne", "value": "రైతు",
+                                  "points": -2}]
+
+    for name, schemes, count in [("load_schemes", checker.schemes, 1000000),
+                                 ("synthetic", generate_catalog(500), 100000),
+                                 ("negative points", penalized, 20000)]:
+        matcher = BatchSchemeMatcher(schemes)
+        profiles = generate_profiles(count)
+        ages, incomes, occupations = matcher.encode_profiles(profiles)
+
+        start = time.perf_counter()
+        total = 0
+        for _, eligible, indices, scores in matcher.run(ages, incomes, occupations):
+            total += int(eligible.sum())
+        batch_time = time.perf_counter() - start
+
+        # Per-dict baseline on a sample, also used as the equivalence check
+        sample = profiles[:2000]
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            expected = []
+            for profile in sample:
+                eligible_list = [s for s in schemes if checker.is_eligible(s, profile)]
+                expected.append((eligible_list, recommender.recommend(eligible_list, profile)))
+            loop_time = (time.perf_counter() - start) / len(sample) * count
+
+        eligible, indices, scores = next(matcher.run(ages[:2000], incomes[:2000], occupations[:2000]))[1:]
+        for row, (eligible_list, recs) in enumerate(expected):
+            assert [schemes[j] for j in np.flatnonzero(eligible[row])] == eligible_list
+            assert matcher.to_recommendations(indices[row], scores[row], recommender, sample[row]) == recs
+        if name == "negative points":
+            assert any(rec["score"] < 0 for _, recs in expected for rec in recs), "no negative score tested"
+
+        print(f"📊 {name}: {count} ప్రొఫైల్స్ x {len(schemes)} పథకాలు, "
+              f"batch {count / batch_time:,.0f} profiles/s, "
+              f"loop ~{count / loop_time:,.0f} profiles/s, speedup x{loop_time / batch_time:.0f}")
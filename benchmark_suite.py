@@ -0,0 +1,332 @@
+# benchmark_suite.py - REPRODUCIBLE COMPONENT BENCHMARKS WITH JSON BASELINES
+#
+#   python benchmark_suite.py                # run, compare with benchmark_baseline.json
+#   python benchmark_suite.py --save         # record a new baseline (median of 3 processes)
+#   python benchmark_suite.py --check        # exit 1 on a regression (CI)
+#
+# Drives the agent headlessly (no TeluguVoice) over a seeded synthetic corpus.
+# Each component is recorded with the speed of a fixed reference workload,
+# timed when its process started; the baseline is scaled by how much faster
+# that reference runs now, so a baseline recorded on one machine can check another.
+# Some timings land in a fast or a slow mode per process, so a regression is
+# only reported if it also shows when re-measured in fresh interpreters, and
+# --save records each component's median over several processes.
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from agent import TeluguGovernmentAgent
+from channels import ReplayChannel
+from conversation_generator import generate_corpus
+from fact_extractor import extract_facts
+from latency_stats import summarize
+from memory import ConversationMemory
+from self_evaluator import IncrementalEvaluator, SelfEvaluator
+from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+TOLERANCE = 0.25  # slower / bigger than the baseline by more than this is a regression
+CONFIRM_RUNS = 2  # fresh interpreters re-measuring a regression; the median of all runs decides
+
+
+def reference_workload(n=20000):
+    """Fixed interpreter-bound work (calls, dicts, strings) that stands for host speed"""
+    counts = {}
+    for i in range(n):
+        key = f"k{i % 97}"
+        counts[key] = counts.get(key, 0) + len(key.upper())
+    return counts
+
+
+def reference_ops_per_sec(repeat=5, n=20000):
+    """Best-of-repeat iterations/s of reference_workload on this host"""
+    best = min(_timed(reference_workload, n) for _ in range(repeat))
+    return round(n / best, 1)
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def measure(setup, repeat=5):
+    """setup() -> (function, items); fresh state for every pass
+
+    Timing is the best of `repeat` passes; allocation comes from one extra
+    pass under tracemalloc (which slows code down, so it is never timed).
+    """
+    best = None
+    for _ in range(repeat):
+        function, items = setup()
+        latencies = []
+        clock = time.perf_counter
+        start = clock()
+        for item in items:
+            t0 = clock()
+            function(item)
+            latencies.append(clock() - t0)
+        elapsed = clock() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, latencies)
+
+    function, items = setup()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for item in items:
+        function(item)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    elapsed, latencies = best
+    stats = summarize(latencies)
+    stats.update({
+        "ops_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "alloc_peak_kb": round((peak - before) / 1024, 1),
+        "retained_kb": round((after - before) / 1024, 1),
+    })
+    return stats
+
+
+class BenchmarkSuite:
+    """One corpus, shared tools, a measurement per component"""
+
+    def __init__(self, conversations=500, seed=42, repeat=5):
+        # Timed first: later in the run the reference drifts without the components following
+        self.reference = reference_ops_per_sec(max(repeat, 20))
+        self.seed = seed
+        self.repeat = repeat
+        self.corpus = generate_corpus(conversations, seed)
+        self.tool1 = Tool1_EligibilityChecker()
+        self.tool2 = Tool2_SchemeRecommender()
+        self.utterances = [text for c in self.corpus for text in c["turns"]]
+        self.profiles = [c["facts"] for c in self.corpus]
+        # Histories with the agent's real replies, for the evaluator benchmarks
+        self.histories = [self.run_conversation(c).memory.history for c in self.corpus]
+
+    def new_agent(self):
+        return TeluguGovernmentAgent(tool1=self.tool1, tool2=self.tool2, use_voice=False)
+
+    def run_conversation(self, conversation):
+        agent = self.new_agent()
+        agent.run(ReplayChannel(conversation["turns"]))
+        return agent
+
+    @staticmethod
+    def take_turn(pair):
+        """One caller turn as run() takes it: the reply, then any tools the planner calls"""
+        agent, text = pair
+        if agent.state == "END":
+            return
+        agent.process(text)
+        decision = agent.fsm.tool_decision(agent)
+        if decision is not None:
+            agent.run_tools(decision, lambda reply: None)
+
+    def bench_fact_extractor(self):
+        return extract_facts, self.utterances
+
+    def bench_memory(self):
+        memory_turns = []
+        for conversation in self.corpus:
+            memory = ConversationMemory()
+            memory_turns.extend((memory, text) for text in conversation["turns"])
+        return lambda pair: pair[0].add_interaction(pair[1], "", "BENCH"), memory_turns
+
+    def bench_self_evaluator(self):
+        evaluator = SelfEvaluator()
+        return evaluator.evaluate_conversation, [list(h) for h in self.histories]
+
+    def bench_incremental_evaluator(self):
+        turns = []
+        for history in self.histories:
+            evaluator = IncrementalEvaluator()
+            turns.extend((evaluator, entry) for entry in history)
+        return lambda pair: pair[0].evaluate_turn(pair[1]), turns
+
+    def bench_eligibility_checker(self):
+        checker = Tool1_EligibilityChecker()  # cold cache every pass
+        return checker.check, self.profiles
+
+    def bench_scheme_recommender(self):
+        recommender = Tool2_SchemeRecommender()
+        pairs = [(self.tool1.check(profile), profile) for profile in self.profiles]
+        return lambda pair: recommender.recommend(*pair), pairs
+
+    def bench_agent_turn(self):
+        turns = []
+        for conversation in self.corpus:
+            agent = self.new_agent()
+            agent.handle_start("")
+            turns.extend((agent, text) for text in conversation["turns"])
+        return self.take_turn, turns
+
+    def bench_agent_conversation(self):
+        return self.run_conversation, self.corpus
+
+    COMPONENTS = [
+        ("fact_extractor", bench_fact_extractor),
+        ("memory.add_interaction", bench_memory),
+        ("self_evaluator.full", bench_self_evaluator),
+        ("self_evaluator.incremental", bench_incremental_evaluator),
+        ("tool1.check", bench_eligibility_checker),
+        ("tool2.recommend", bench_scheme_recommender),
+        ("agent.turn", bench_agent_turn),
+        ("agent.conversation", bench_agent_conversation),
+    ]
+
+    def run(self, only=None):
+        results = {}
+        for name, bench in self.COMPONENTS:
+            if only and not any(part in name for part in only):
+                continue
+            results[name] = measure(lambda: bench(self), self.repeat)
+            results[name]["reference_ops_per_sec"] = self.reference
+        return {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "conversations": len(self.corpus),
+                "seed": self.seed,
+                "repeat": self.repeat,
+                "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+            "components": results,
+        }
+
+
+def host_speed(stats, old):
+    """How many times faster the reference ran for stats than for old (1.0 if unknown)"""
+    if old.get("reference_ops_per_sec") and stats.get("reference_ops_per_sec"):
+        return stats["reference_ops_per_sec"] / old["reference_ops_per_sec"]
+    return 1.0
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Component -> list of regressions against the baseline ([] = fine)
+
+    Throughput and latency are compared with the baseline scaled by
+    host_speed(); allocation does not depend on the host.
+    """
+    report = {}
+    for name, stats in results["components"].items():
+        old = baseline.get("components", {}).get(name)
+        if old is None:
+            continue
+        speed = host_speed(stats, old)
+        problems = []
+        expected_ops = old["ops_per_sec"] * speed
+        if stats["ops_per_sec"] < expected_ops * (1 - tolerance):
+            problems.append(f"throughput {expected_ops:,.0f} -> {stats['ops_per_sec']:,.0f}/s")
+        # Tail latency of microsecond operations is noisy: only flag clear jumps
+        expected_p99 = old["p99_ms"] / speed
+        if stats["p99_ms"] > expected_p99 * (1 + 2 * tolerance) and stats["p99_ms"] - expected_p99 > 0.05:
+            problems.append(f"p99 {expected_p99:.3f} -> {stats['p99_ms']}ms")
+        if stats["alloc_peak_kb"] > old["alloc_peak_kb"] * (1 + tolerance) + 64:
+            problems.append(f"peak alloc {old['alloc_peak_kb']} -> {stats['alloc_peak_kb']}KB")
+        report[name] = problems
+    return report
+
+
+def remeasure(names, args):
+    """Results for the named components from a fresh interpreter"""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "rerun.json")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--conversations", str(args.conversations),
+                        "--seed", str(args.seed), "--repeat", str(args.repeat), "--baseline", output,
+                        "--output", output, "--confirm", "0", "--only", *names],
+                       check=True, stdout=subprocess.DEVNULL)
+        return load_baseline(output)
+
+
+def keep_median(runs):
+    """Results of runs[0] with every component replaced by its median run (relative to the reference)
+
+    Later runs may cover only some components; the others keep runs[0]'s numbers.
+    """
+    results = runs[0]
+    for name, stats in results["components"].items():
+        measured = sorted((run["components"][name] for run in runs if name in run["components"]),
+                          key=lambda other: other["ops_per_sec"] / host_speed(other, stats))
+        results["components"][name] = measured[len(measured) // 2]
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_results(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Component benchmarks with JSON baselines")
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="substrings of component names")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--output", help="also write this run's results here")
+    parser.add_argument("--save", action="store_true", help="record this run as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if anything regressed")
+    parser.add_argument("--confirm", type=int, default=CONFIRM_RUNS,
+                        help="fresh interpreters that re-measure a regression (or, with --save, everything)")
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        suite = BenchmarkSuite(args.conversations, args.seed, args.repeat)
+        results = suite.run(args.only)
+
+    print(f"📊 {results['meta']['conversations']} సంభాషణలు (seed {args.seed}), "
+          f"Python {results['meta']['python']}")
+    print(f"{'component':<28} {'ops/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'peak KB':>10} {'kept KB':>10} "
+          f"{'reference/s':>12}")
+    for name, stats in results["components"].items():
+        print(f"{name:<28} {stats['ops_per_sec']:>12,.0f} {stats['p50_ms']:>9} {stats['p99_ms']:>9} "
+              f"{stats['alloc_peak_kb']:>10} {stats['retained_kb']:>10} {stats['reference_ops_per_sec']:>12,.0f}")
+
+    baseline = load_baseline(args.baseline)
+    regressions = {}
+    if baseline is None:
+        print(f"ℹ️ baseline లేదు ({args.baseline}); --save తో రికార్డ్ చేయండి")
+    elif baseline["meta"]["conversations"] != results["meta"]["conversations"] or \
+            baseline["meta"]["seed"] != results["meta"]["seed"]:
+        print("ℹ️ baseline వేరే corpus తో ఉంది; పోల్చడం లేదు")
+    else:
+        regressions = {name: p for name, p in compare(results, baseline).items() if p}
+        if regressions and args.confirm and not args.save:
+            # Judged like the baseline was recorded: the median of fresh runs
+            names = list(regressions)
+            print(f"🔁 {', '.join(names)}: {args.confirm} కొత్త ప్రాసెస్‌లలో మళ్లీ కొలుస్తున్నాను, median తో పోలుస్తున్నాను")
+            results = keep_median([results] + [remeasure(names, args) for _ in range(args.confirm)])
+            regressions = {name: p for name, p in compare(results, baseline).items() if p}
+        for name, problems in regressions.items():
+            print(f"⚠️ {name}: {'; '.join(problems)}")
+        if not regressions:
+            print(f"✅ baseline ({baseline['meta']['date']}) తో పోలిస్తే regressions లేవు")
+
+    if args.output:
+        save_results(results, args.output)
+    if args.save:
+        if args.confirm:
+            names = list(results["components"])
+            print(f"🔁 baseline: {args.confirm} కొత్త ప్రాసెస్‌లలో మళ్లీ కొలుస్తున్నాను, median నమోదు")
+            results = keep_median([results] + [remeasure(names, args) for _ in range(args.confirm)])
+        save_results(results, args.baseline)
+        print(f"📁 baseline -> {args.baseline}")
+    if args.check and regressions:
+        sys.exit(1)
@@ -0,0 +1,237 @@
+# channels.py - I/O CHANNELS FOR THE DIALOGUE CORE (VOICE, TEXT, REPLAY)
+#
+# TeluguGovernmentAgent.run(channel) drives a conversation; the channel is the
+# only part that knows how a turn arrives and how a reply leaves:
+#   open(agent)    hook the channel up (e.g. partial transcripts)
+#   receive()      next user text, "" for nothing heard, None when closed
+#   send(text)     deliver a reply
+#   expect(texts)  replies likely to come next (voice synthesizes them early)
+#   close()        flush (voice waits until the last reply has played)
+# When the profile is complete, run() calls the planner's tools right after
+# sending "processing"; if a channel's send() blocks until delivery
+# (blocking_send), the tools run on a worker thread meanwhile instead.
+
+
+class Channel:
+    """Base channel: no prediction, nothing to open or flush"""
+
+    name = "base"
+    wants_predictions = False  # run() skips predict_next_responses() otherwise
+    blocking_send = False  # send() returns before the reply is delivered
+
+    def open(self, agent):
+        pass
+
+    def receive(self):
+        raise NotImplementedError
+
+    def send(self, text):
+        raise NotImplementedError
+
+    def expect(self, texts):
+        pass
+
+    def close(self):
+        pass
+
+
+class VoiceChannel(Channel):
+    """Microphone / TTS through TeluguVoice"""
+
+    name = "voice"
+    wants_predictions = True
+
+    def __init__(self, voice):
+        self.voice = voice
+
+    def open(self, agent):
+        self.voice.on_partial = agent.handle_partial
+
+    def receive(self):
+        return self.voice.listen()
+
+    def send(self, text):
+        self.voice.speak(text, wait=False)
+
+    def expect(self, texts):
+        self.voice.prefetch(texts)
+
+    def close(self):
+        self.voice.wait_until_spoken()
+
+
+class TextChannel(Channel):
+    """Chat-style text: read() returns the user's message, write() delivers ours"""
+
+    name = "text"
+
+    def __init__(self, read=None, write=None):
+        self.read = read or (lambda: input("👤: "))
+        self.write = write or (lambda text: print(f"🤖: {text}"))
+
+    def receive(self):
+        try:
+            return self.read()
+        except EOFError:
+            return None
+
+    def send(self, text):
+        self.write(text)
+
+
+class ReplayChannel(Channel):
+    """Scripted user turns (tests, batch replay); replies are collected in `sent`"""
+
+    name = "replay"
+
+    def __init__(self, turns, echo=False):
+        self.turns = iter(turns)
+        self.echo = echo
+        self.received = []
+        self.sent = []
+
+    def receive(self):
+        text = next(self.turns, None)
+        if text is not None:
+            self.received.append(text)
+            if self.echo:
+                print(f"\n👤: {text}")
+        return text
+
+    def send(self, text):
+        self.sent.append(text)
+        if self.echo:
+            print(f"🤖: {text}")
+
+
+# Benchmark: turn throughput by channel (and proof text never touches audio),
+# then a paced call: tools overlapped with speech vs one user turn per tool
+if __name__ == "__main__":
+    import contextlib
+    import os
+    import statistics
+    import tempfile
+    import threading
+    import time
+    from agent import TeluguGovernmentAgent, shared_tools
+    from audio_cache import AudioCache
+    from conversation_generator import generate_corpus
+    from playback import NullSink, PlaybackEngine
+    from speech import TeluguVoice
+    from speech_backends import LocalHTTPBackend
+    from standin_server import StandInServer
+
+    tool1, tool2 = shared_tools()
+    corpus = generate_corpus(300, seed=7)
+    results = {}
+
+    with StandInServer() as server, tempfile.TemporaryDirectory() as cache_dir, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        cache = AudioCache(cache_dir)
+
+        def tts_requests():
+            return sum(1 for path, _ in server.requests if path == "/translate_tts")
+
+        def make_channel(name, conversation, voice):
+            if name == "replay":
+                return ReplayChannel(conversation["turns"])
+            if name == "text":
+                turns = iter(conversation["turns"])
+                outbox = []
+                return TextChannel(read=lambda: next(turns, None), write=outbox.append)
+            voice.backend.session = conversation["id"]
+            return VoiceChannel(voice)
+
+        for name in ("replay", "text", "voice"):
+            # Every agent has a voice available; only the voice channel may use it
+            voice = TeluguVoice(backend=LocalHTTPBackend(server.url), cache=cache,
+                                player=PlaybackEngine(NullSink()))
+            requests_before, turns = tts_requests(), 0
+            start = time.perf_counter()
+            for conversation in corpus:
+                agent = TeluguGovernmentAgent(tool1=tool1, tool2=tool2, voice=voice)
+                channel = make_channel(name, conversation, voice)
+                agent.run(channel)
+                turns += agent.memory.turn_count
+            elapsed = time.perf_counter() - start
+            voice.player.close()
+            results[name] = (turns / elapsed, tts_requests() - requests_before, voice.cache.hits)
+
+    for name, (turns_per_sec, requests, hits) in results.items():
+        print(f"📊 {name:<7} {turns_per_sec:>10,.0f} turns/s, TTS requests {requests}, audio cache hits {hits}")
+    assert results["replay"][1] == results["text"][1] == 0
+
+    class PacedChannel(ReplayChannel):
+        """A half-duplex call: replies play one after another for `speak` seconds
+        each (send() only blocks if `blocking`); the caller answers only
+        after the last reply has played and takes `answer` seconds to do so."""
+
+        def __init__(self, turns, speak, answer, blocking=False):
+            super().__init__(turns)
+            self.speak = speak
+            self.answer = answer
+            self.blocking_send = blocking  # send() returns once the reply has played
+            self.lock = threading.Lock()
+            self.playing_until = time.monotonic()
+
+        def send(self, text):
+            super().send(text)
+            with self.lock:
+                self.playing_until = max(self.playing_until, time.monotonic()) + self.speak
+            if self.blocking_send:
+                self.wait_until_spoken()
+
+        def wait_until_spoken(self):
+            while (remaining := self.playing_until - time.monotonic()) > 0:
+                time.sleep(remaining)
+
+        def receive(self):
+            self.wait_until_spoken()
+            time.sleep(self.answer)
+            return super().receive()
+
+        def close(self):
+            self.wait_until_spoken()
+
+    class SerialAgent(TeluguGovernmentAgent):
+        """The old loop: "processing" goes out, each tool waits for another user turn"""
+
+        def send_with_tools(self, channel, reply, decision):
+            channel.send(reply)
+
+    class SlowTool:
+        """A tool behind a remote service taking `delay` seconds per call"""
+
+        def __init__(self, tool, method, delay):
+            self.call = getattr(tool, method)
+            self.delay = delay
+            setattr(self, method, self.slow_call)
+
+        def slow_call(self, *args):
+            time.sleep(self.delay)
+            return self.call(*args)
+
+    speak, answer, delay = 0.2, 0.3, 0.1
+    slow1, slow2 = SlowTool(tool1, "check", delay), SlowTool(tool2, "recommend", delay)
+    caller = ["నేను రైతుని", "నా వయస్సు 35", "నా ఆదాయం 40 వేలు", "సరే", "సరే"]
+    paced = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, agent_class, blocking in [("serial", SerialAgent, False),
+                                            ("overlapped", TeluguGovernmentAgent, False),
+                                            ("overlapped, blocking send", TeluguGovernmentAgent, True)]:
+            seconds, user_turns = [], []
+            for _ in range(5):
+                agent = agent_class(tool1=slow1, tool2=slow2, use_voice=False)
+                channel = PacedChannel(caller, speak, answer, blocking)
+                start = time.monotonic()
+                agent.run(channel)
+                seconds.append(time.monotonic() - start)
+                user_turns.append(len(channel.received))
+                recommended = [rec["scheme"]["id"] for rec in agent.recommendations]
+            paced[name] = (statistics.median(seconds), max(user_turns), recommended)
+
+    print(f"📞 paced call (reply {speak}s, caller answer {answer}s, each tool {delay}s):")
+    for name, (seconds, user_turns, recommended) in paced.items():
+        print(f"   {name:<26} {seconds:.2f}s to the last recommendation played, "
+              f"{user_turns} caller turns, {recommended}")
+    assert len({tuple(recommended) for _, _, recommended in paced.values()}) == 1
@@ -0,0 +1,206 @@
+# conversation_generator.py - SYNTHETIC TELUGU CALLER CONVERSATIONS
+#
+# Each conversation answers the three slot questions (occupation, age, income)
+# the way real callers do: numerals as digits, Telugu digits, words or lakh /
+# thousand units, answers out of order or several in one breath, corrections
+# that contradict an earlier answer, and filler in between.
+import json
+import random
+
+TELUGU_DIGITS = str.maketrans("0123456789", "౦౧౨౩౪౫౬౭౮౯")
+UNIT_WORDS = {1: "ఒకటి", 2: "రెండు", 3: "మూడు", 4: "నాలుగు", 5: "ఐదు",
+              6: "ఆరు", 7: "ఏడు", 8: "ఎనిమిది", 9: "తొమ్మిది"}
+TENS_WORDS = {10: "పది", 20: "ఇరవై", 30: "ముప్పై", 40: "నలభై", 50: "యాభై",
+              60: "అరవై", 70: "డెబ్బై", 80: "ఎనభై", 90: "తొంభై"}
+
+OCCUPATION_PHRASES = {
+    "రైతు": ["నేను రైతుని", "రైతు", "నేను వ్యవసాయం చేసే రైతుని"],
+    "ఉద్యోగి": ["నేను ఉద్యోగిని", "ప్రైవేట్ ఉద్యోగి"],
+    "విద్యార్థి": ["నేను విద్యార్థిని"],
+    "వ్యాపారం": ["నేను వ్యాపారిని", "నాకు చిన్న వ్యాపారం ఉంది"],
+}
+AGE_TEMPLATES = ["నా వయస్సు {} సంవత్సరాలు", "{} ఏళ్ళు", "నాకు {} యేర్స్", "నా వయసు {}"]
+FILLERS = ["సరే", "ఏమిటి?", "మళ్లీ చెప్పండి", "నమస్కారం", "అవును"]
+CORRECTION = "క్షమించండి, "
+
+
+def number_words(n):
+    """Telugu number words for 1-99 (None for the teens, which have no word here)"""
+    if n in UNIT_WORDS:
+        return UNIT_WORDS[n]
+    tens, units = n - n % 10, n % 10
+    if tens not in TENS_WORDS or tens == 10 and units:
+        return None
+    return TENS_WORDS[tens] + (f" {UNIT_WORDS[units]}" if units else "")
+
+
+def indian_grouping(n):
+    """150000 -> '1,50,000'"""
+    digits = str(n)
+    if len(digits) <= 3:
+        return digits
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    return ",".join([head] + groups + [tail])
+
+
+def render_number(n, rng, allow_words=True):
+    """Digits, Telugu digits or words; returns (text, noisy?)"""
+    words = number_words(n) if allow_words and isinstance(n, int) else None
+    style = rng.random()
+    if words and style < 0.25:
+        return words, True
+    if style < 0.45:
+        return str(n).translate(TELUGU_DIGITS), True
+    return str(n), False
+
+
+def age_phrase(age, rng):
+    number, noisy = render_number(age, rng)
+    return rng.choice(AGE_TEMPLATES).format(number), noisy
+
+
+def income_phrase(income, rng):
+    """One of the ways a caller states an annual income"""
+    options = [(f"నా ఆదాయం {income}", False), (f"ఆదాయం {indian_grouping(income)}", True)]
+    if income % 50000 == 0 and income >= 100000:
+        lakhs = income / 100000
+        lakhs = int(lakhs) if lakhs.is_integer() else lakhs
+        number, noisy = render_number(lakhs, rng)
+        options.append((f"నా ఆదాయం {number} లక్షలు", noisy))
+    elif income % 1000 == 0 and income < 100000:
+        number, noisy = render_number(income // 1000, rng)
+        options.append((f"{number} వేలు", noisy))
+        if number_words(income // 1000):
+            options.append((f"{number_words(income // 1000)} వేల రూపాయలు", True))
+    return rng.choice(options)
+
+
+def random_income(rng):
+    if rng.random() < 0.5:
+        return rng.randrange(10, 100, 5) * 1000
+    return rng.randrange(2, 12) * 50000
+
+
+def generate_conversation(rng, conversation_id, out_of_order_rate=0.3,
+                          contradiction_rate=0.2, filler_rate=0.1):
+    """One caller: {"id", "turns", "facts" (final truth), "traits"}"""
+    occupation = rng.choice(list(OCCUPATION_PHRASES))
+    facts = {"occupation": occupation, "age": rng.randint(18, 85), "income": random_income(rng)}
+    traits = set()
+
+    answers = [rng.choice(OCCUPATION_PHRASES[occupation])]
+    for phrase, noisy in (age_phrase(facts["age"], rng), income_phrase(facts["income"], rng)):
+        answers.append(phrase)
+        if noisy:
+            traits.add("noisy_numerals")
+
+    if rng.random() < out_of_order_rate:
+        traits.add("out_of_order")
+        if rng.random() < 0.5:
+            rng.shuffle(answers)
+        else:
+            # Two answers in one breath; the freed turn is an acknowledgement
+            i = rng.randrange(2)
+            answers[i:i + 2] = [f"{answers[i]}, {answers[i + 1]}", "సరే"]
+
+    if rng.random() < contradiction_rate:
+        traits.add("contradiction")
+        field = rng.choice(["age", "income"])
+        if field == "age":
+            facts["age"] = max(18, facts["age"] + rng.choice([-7, -3, 2, 5, 10]))
+            phrase, _ = age_phrase(facts["age"], rng)
+        else:
+            old = facts["income"]
+            while facts["income"] == old:
+                facts["income"] = random_income(rng)
+            phrase, _ = income_phrase(facts["income"], rng)
+        answers.append(CORRECTION + phrase)  # after every original answer
+
+    turns = []
+    for answer in answers:
+        if rng.random() < filler_rate:
+            traits.add("filler")
+            turns.append(rng.choice(FILLERS))
+        turns.append(answer)
+    # No closing turns: once the income is known the agent checks eligibility and
+    # recommends without waiting for the caller (TeluguGovernmentAgent.run)
+    return {"id": conversation_id, "turns": turns, "facts": facts, "traits": sorted(traits)}
+
+
+def generate_corpus(count, seed=42, **rates):
+    """count conversations; the same seed always gives the same corpus"""
+    rng = random.Random(seed)
+    return [generate_conversation(rng, f"synthetic-{seed}-{i:06d}", **rates) for i in range(count)]
+
+
+def write_jsonl(path, conversations):
+    with open(path, "w", encoding="utf-8") as f:
+        for conversation in conversations:
+            f.write(json.dumps(conversation, ensure_ascii=False) + "\n")
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Test: the fact extractor recovers the ground truth from every rendering
+if __name__ == "__main__":
+    import argparse
+    from collections import Counter
+    from fact_extractor import extract_facts
+
+    parser = argparse.ArgumentParser(description="Synthetic Telugu conversations")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the corpus as JSONL")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.count, args.seed)
+    assert corpus == generate_corpus(args.count, args.seed), "not reproducible"
+
+    mismatches = 0
+    for conversation in corpus:
+        heard = {}
+        for text in conversation["turns"]:
+            heard.update(extract_facts(text))  # the last statement wins
+        if heard != conversation["facts"]:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"❌ {conversation['turns']}: expected {conversation['facts']}, got {heard}")
+
+    traits = Counter(trait for conversation in corpus for trait in conversation["traits"])
+    print(f"✅ {len(corpus) - mismatches}/{len(corpus)} సంభాషణలు సరిపోలాయి, traits {dict(traits)}")
+
+    # Through the agent: every call reaches END (no number word mistaken for an exit
+    # word), and a caller who answers the three questions in turn leaves the true facts.
+    # Filler, out-of-order answers and late corrections still cost the agent a fact.
+    import contextlib
+    import os
+    from agent import TeluguGovernmentAgent, shared_tools
+    from channels import ReplayChannel
+
+    outcomes = Counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tool1, tool2 = shared_tools()
+        for conversation in corpus:
+            agent = TeluguGovernmentAgent(tool1=tool1, tool2=tool2, use_voice=False)
+            agent.run(ReplayChannel(conversation["turns"]))
+            assert agent.state == "END", (conversation["turns"], agent.state)
+            plain = not set(conversation["traits"]) & {"filler", "out_of_order", "contradiction"}
+            complete = agent.memory.user_facts == conversation["facts"]
+            assert complete or not plain, (conversation["turns"], agent.memory.user_facts)
+            outcomes["plain" if plain else "noisy", complete] += 1
+    plain_total = outcomes["plain", True]
+    noisy_total = outcomes["noisy", True] + outcomes["noisy", False]
+    print(f"✅ agent: all {len(corpus)} calls reach END, {plain_total}/{plain_total} plain callers' facts "
+          f"collected; {outcomes['noisy', True]}/{noisy_total} with filler/reordering/corrections")
+    for text in corpus[0]["turns"]:
+        print(f"   👤 {text}")
+    if args.output:
+        write_jsonl(args.output, corpus)
+        print(f"📁 {args.output}")
@@ -0,0 +1,208 @@
+# dialogue_fsm.py - DECLARATIVE DIALOGUE DEFINITION COMPILED TO A LOOKUP TABLE
+#
+# State types:
+#   greet  - reply with `say` followed by next's prompt, move to `next`
+#   slot   - remember the user's answer for `slot`; if `guard` fails reply with
+#            it, otherwise move to `next` and reply with next's prompt
+#   plan   - ask AutonomousPlanner what to do; `actions` maps the planner's
+#            action to an agent method (which sets the next state itself)
+#   final  - reply with `reply`
+import tracing
+
+DIALOGUE = {
+    "initial": "START",
+    "states": {
+        "START": {"type": "greet", "say": "greeting", "next": "ASK_OCCUPATION"},
+        "ASK_OCCUPATION": {"type": "slot", "slot": "occupation", "prompt": "ask_occupation",
+                           "note": "Occupation asked", "guard": "no_contradiction",
+                           "next": "ASK_AGE"},
+        "ASK_AGE": {"type": "slot", "slot": "age", "prompt": "ask_age",
+                    "note": "Age asked", "guard": "no_contradiction",
+                    "next": "ASK_INCOME"},
+        "ASK_INCOME": {"type": "slot", "slot": "income", "prompt": "ask_income",
+                       "note": "Income asked", "next": "CHECK_ELIGIBILITY"},
+        "CHECK_ELIGIBILITY": {"type": "plan", "prompt": "processing", "actions": {
+            "check_eligibility": "handle_check_eligibility",
+            "recommend_schemes": "handle_recommend",
+            "collect_information": "ask_missing_slot",
+            "ask_for_next_step": "handle_end"}},
+        "RECOMMEND": {"type": "plan", "actions": {
+            "check_eligibility": "handle_check_eligibility",
+            "recommend_schemes": "handle_recommend",
+            "collect_information": "ask_missing_slot",
+            "ask_for_next_step": "handle_end"}},
+        "END": {"type": "final", "reply": "thank_you"},
+    },
+}
+
+# Agent handlers whose reply is a fixed response (used to predict the next prompt)
+FIXED_REPLIES = {"handle_end": ("thank_you",), "handle_check_eligibility": ("not_eligible",)}
+
+GREET, SLOT, PLAN, FINAL = range(4)
+STATE_TYPES = {"greet": GREET, "slot": SLOT, "plan": PLAN, "final": FINAL}
+
+
+class CompiledState:
+    """One row of the lookup table: everything a turn needs, resolved up front"""
+
+    __slots__ = ("name", "kind", "slot", "note", "guard", "next", "reply", "prompt", "say", "actions")
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.slot = self.note = self.guard = self.next = None
+        self.reply = self.prompt = self.say = None
+        self.actions = {}
+
+
+class DialogueFSM:
+    """Compiles a dialogue definition once; step() is a table lookup per turn"""
+
+    GUARDS = {"no_contradiction"}
+
+    def __init__(self, definition=DIALOGUE):
+        self.initial = definition["initial"]
+        self.table = self.compile(definition["states"])
+        # Slot states in definition order, used to re-ask missing information
+        self.slot_states = [s for s in self.table.values() if s.kind == SLOT]
+
+    def compile(self, states):
+        table = {}
+        for name, spec in states.items():
+            if spec.get("type") not in STATE_TYPES:
+                raise ValueError(f"state {name}: unknown type {spec.get('type')!r}")
+            compiled = CompiledState(name, STATE_TYPES[spec["type"]])
+            compiled.slot = spec.get("slot")
+            compiled.note = spec.get("note")
+            compiled.guard = spec.get("guard")
+            compiled.next = spec.get("next")
+            compiled.prompt = spec.get("prompt")
+            compiled.say = spec.get("say")
+            compiled.reply = spec.get("reply")
+            compiled.actions = dict(spec.get("actions", {}))
+            table[name] = compiled
+
+        for compiled in table.values():
+            if compiled.guard is not None and compiled.guard not in self.GUARDS:
+                raise ValueError(f"state {compiled.name}: unknown guard {compiled.guard!r}")
+            if compiled.next is not None:
+                if compiled.next not in table:
+                    raise ValueError(f"state {compiled.name}: unknown next state {compiled.next!r}")
+                # Moving on means asking the next state's question
+                compiled.reply = table[compiled.next].prompt
+        return table
+
+    def step(self, agent, user_input, decision=None):
+        """Run one turn for agent; returns the response text"""
+        state = self.table.get(agent.state)
+        if state is None:
+            return agent.responses["error"]
+
+        kind = state.kind
+        if kind == SLOT:
+            agent.memory.add_interaction(user_input, state.note, state.name)
+            if state.guard is not None:
+                contradiction = agent.find_contradiction(state.slot)
+                if contradiction is not None:
+                    return agent.responses["contradiction"].format(
+                        old=contradiction["old"], new=contradiction["new"])
+            agent.state = state.next
+            return agent.responses[state.reply]
+
+        if kind == PLAN:
+            if decision is None:
+                with tracing.span("planner"):
+                    decision = agent.planner.decide_next_action(agent.planner_context())
+            handler = state.actions.get(decision["action"])
+            if handler is None:
+                return agent.responses["error"]
+            return getattr(agent, handler)(user_input)
+
+        if kind == GREET:
+            # The greeting goes out with the first question; the channel delivers both
+            agent.state = state.next
+            return agent.responses[state.say] + "\n" + agent.responses[state.reply]
+
+        return agent.responses[state.reply]
+
+    def tool_decision(self, agent):
+        """The planner's decision if agent's state would call a tool now, else None"""
+        state = self.table.get(agent.state)
+        if state is None or state.kind != PLAN:
+            return None
+        with tracing.span("planner"):
+            decision = agent.planner.decide_next_action(agent.planner_context())
+        if decision.get("tool") and decision["action"] in state.actions:
+            return decision
+        return None
+
+    def predict(self, agent):
+        """Response keys the next turn will most likely reply with (fixed texts only)"""
+        state = self.table.get(agent.state)
+        if state is None:
+            return []
+        if state.kind != PLAN:
+            return [state.reply] if state.reply else []
+
+        decision = agent.planner.decide_next_action(agent.planner_context())
+        handler = state.actions.get(decision["action"])
+        if handler == "ask_missing_slot":
+            slot_state = self.first_missing_slot(agent.memory.user_facts)
+            return [slot_state.prompt] if slot_state else []
+        return list(FIXED_REPLIES.get(handler, ()))
+
+    def first_missing_slot(self, profile):
+        """First slot state whose slot the profile does not have yet"""
+        for state in self.slot_states:
+            if state.slot not in profile:
+                return state
+        return None
+
+
+# Benchmark: turns/sec with the compiled table vs the old per-turn contradiction scan
+if __name__ == "__main__":
+    import contextlib
+    import os
+    import time
+    from agent import TeluguGovernmentAgent
+    from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+    class LegacyLookupAgent(TeluguGovernmentAgent):
+        """Same agent, but scans the whole contradictions list like the old handlers"""
+
+        def find_contradiction(self, field):
+            for cont in self.memory.get_contradictions():
+                if cont["field"] == field:
+                    return cont
+            return None
+
+    tool1, tool2 = Tool1_EligibilityChecker(), Tool2_SchemeRecommender()
+    normal = ["నేను రైతుని", "నా వయస్సు 35 సంవత్సరాలు", "నా ఆదాయం 2 లక్షలు", "సరే", "సరే"]
+    # A caller who keeps changing their income piles up contradictions before the age question
+    noisy = [f"నేను రైతుని, ఆదాయం {i} వేలు" for i in range(1, 400)]
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = []
+        for name, agent_class in [("legacy scan", LegacyLookupAgent), ("compiled", TeluguGovernmentAgent)]:
+            start = time.perf_counter()
+            turns = 0
+            for _ in range(500):
+                agent = agent_class(tool1=tool1, tool2=tool2, use_voice=False)
+                agent.handle_start("")
+                for text in normal:
+                    agent.process(text)
+                    turns += 1
+            plain = turns / (time.perf_counter() - start)
+
+            agent = agent_class(tool1=tool1, tool2=tool2, use_voice=False)
+            agent.handle_start("")
+            start = time.perf_counter()
+            for text in noisy * 5:
+                agent.state = "ASK_AGE"
+                agent.process(text)
+            heavy = len(noisy) * 5 / (time.perf_counter() - start)
+            results.append((name, plain, heavy, len(agent.memory.contradictions)))
+
+    for name, plain, heavy, contradictions in results:
+        print(f"📊 {name}: {plain:,.0f} turns/s (normal), "
+              f"{heavy:,.0f} turns/s with {contradictions} contradictions on record")
@@ -0,0 +1,176 @@
+# eligibility_index.py - INDEXED ELIGIBILITY MATCHING
+import bisect
+import numbers
+from array import array
+
+NO_MIN_AGE = float("-inf")
+NO_MAX_INCOME = float("inf")
+
+
+class _Bucket:
+    """Schemes of one occupation, sorted by min_age and by max_income"""
+
+    def __init__(self, positions, min_age, max_income):
+        # min_age / max_income: per-position columns shared by all buckets
+        self.min_age = min_age
+        self.max_income = max_income
+
+        # Float columns (snapshots) get compact float arrays for the keys too
+        keys = (lambda values: array("d", values)) if isinstance(min_age, memoryview) else list
+
+        self.by_age = array("I", sorted(positions, key=min_age.__getitem__))
+        self.age_keys = keys(min_age[p] for p in self.by_age)
+
+        self.by_income = array("I", sorted(positions, key=max_income.__getitem__))
+        self.income_keys = keys(max_income[p] for p in self.by_income)
+
+    def match(self, age, income):
+        """Positions with min_age <= age and max_income >= income"""
+        age_end = bisect.bisect_right(self.age_keys, age)
+        income_start = bisect.bisect_left(self.income_keys, income)
+
+        # Walk the smaller side, test the other field per candidate
+        if age_end <= len(self.income_keys) - income_start:
+            max_income = self.max_income
+            return [p for p in self.by_age[:age_end] if max_income[p] >= income]
+        min_age = self.min_age
+        return [p for p in self.by_income[income_start:] if min_age[p] <= age]
+
+
+class EligibilityIndex:
+    """Precomputed lookup with the same results as is_eligible()"""
+
+    def __init__(self, schemes, fallback):
+        self.schemes = schemes
+        self.fallback = fallback  # is_eligible(scheme, profile) for odd inputs
+        self.indexed = True
+
+        if hasattr(schemes, "columns"):
+            # Snapshot catalogs hand out their columns without building dicts
+            min_age, max_income, occupations = schemes.columns()
+        else:
+            min_age = [s.get("min_age", NO_MIN_AGE) for s in schemes]
+            max_income = [s.get("max_income", NO_MAX_INCOME) for s in schemes]
+            occupations = [s["occupation"] for s in schemes]
+
+        grouped = {}
+        for position, occupation in enumerate(occupations):
+            grouped.setdefault(occupation, []).append(position)
+
+        try:
+            self.any_bucket = _Bucket(grouped.pop("any", []), min_age, max_income)
+            self.by_occupation = {occ: _Bucket(positions, min_age, max_income)
+                                  for occ, positions in grouped.items()}
+            # Every threshold in the catalog; profiles between two cuts match alike
+            self.age_cuts = sorted(set(min_age))
+            self.income_cuts = sorted(set(max_income))
+        except TypeError:
+            # Non-numeric thresholds: keep the plain scan
+            self.indexed = False
+
+    def indexable(self, age, income, occupation):
+        return (self.indexed
+                and isinstance(age, numbers.Real)
+                and isinstance(income, numbers.Real)
+                and age == age and income == income  # NaN compares differently
+                and isinstance(occupation, (str, type(None))))
+
+    def signature(self, user_profile):
+        """(age band, income band, occupation) - equal signatures match the same
+        schemes. None when the profile is not indexable."""
+        age = user_profile.get("age", 0)
+        income = user_profile.get("income", 0)
+        occupation = user_profile.get("occupation")
+        if not self.indexable(age, income, occupation):
+            return None
+        if occupation not in self.by_occupation:
+            occupation = None  # only "any" schemes apply
+        return (bisect.bisect_right(self.age_cuts, age),
+                bisect.bisect_left(self.income_cuts, income),
+                occupation)
+
+    def match(self, user_profile):
+        """Return eligible schemes in catalog order"""
+        age = user_profile.get("age", 0)
+        income = user_profile.get("income", 0)
+        occupation = user_profile.get("occupation")
+
+        if not self.indexable(age, income, occupation):
+            return [s for s in self.schemes if self.fallback(s, user_profile)]
+
+        positions = self.any_bucket.match(age, income)
+        bucket = self.by_occupation.get(occupation)
+        if bucket is not None:
+            positions += bucket.match(age, income)
+        positions.sort()
+
+        schemes = self.schemes
+        return [schemes[p] for p in positions]
+
+
+def generate_catalog(size, seed=7):
+    """Synthetic scheme catalog for benchmarks"""
+    import random
+
+    rng = random.Random(seed)
+    occupations = ["రైతు", "ఉద్యోగి", "విద్యార్థి", "వ్యాపారం", "any"]
+    catalog = []
+    for i in range(size):
+        scheme = {
+            "id": f"scheme_{i}",
+            "name": f"పథకం {i}",
+            "occupation": rng.choice(occupations),
+            "benefits": "-",
+        }
+        if rng.random() < 0.9:
+            scheme["min_age"] = rng.randint(0, 70)
+        if rng.random() < 0.9:
+            scheme["max_income"] = rng.randrange(10000, 1000000, 5000)
+        catalog.append(scheme)
+    return catalog
+
+
+def generate_profiles(count, seed=11):
+    """Synthetic citizen profiles for benchmarks"""
+    import random
+
+    rng = random.Random(seed)
+    occupations = ["రైతు", "ఉద్యోగి", "విద్యార్థి", "వ్యాపారం", None]
+    profiles = []
+    for _ in range(count):
+        profile = {"age": rng.randint(15, 90), "income": rng.randrange(0, 1200000, 1000)}
+        occupation = rng.choice(occupations)
+        if occupation:
+            profile["occupation"] = occupation
+        profiles.append(profile)
+    return profiles
+
+
+# Benchmark: linear scan vs index
+if __name__ == "__main__":
+    import time
+    from tools import Tool1_EligibilityChecker
+
+    checker = Tool1_EligibilityChecker()
+    profiles = generate_profiles(200)
+
+    for size in (10000, 100000):
+        catalog = generate_catalog(size)
+
+        start = time.perf_counter()
+        index = EligibilityIndex(catalog, checker.is_eligible)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scanned = [[s for s in catalog if checker.is_eligible(s, p)] for p in profiles]
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexed = [index.match(p) for p in profiles]
+        index_time = time.perf_counter() - start
+
+        assert scanned == indexed, "index results differ from is_eligible"
+        print(f"📊 {size} పథకాలు: build {build * 1000:.1f}ms, "
+              f"scan {scan_time / len(profiles) * 1000:.3f}ms/profile, "
+              f"index {index_time / len(profiles) * 1000:.3f}ms/profile, "
+              f"speedup x{scan_time / index_time:.1f}")
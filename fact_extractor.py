@@ -0,0 +1,202 @@
+# fact_extractor.py - SINGLE-PASS FACT EXTRACTION (AGE, INCOME, OCCUPATION)
+import re
+
+TELUGU_DIGITS = str.maketrans("౦౧౨౩౪౫౬౭౮౯", "0123456789")
+
+# Number words that may stand in for digits ("ముప్పై ఐదు సంవత్సరాలు")
+NUMBER_WORDS = {
+    "ఒకటి": 1, "ఒక": 1, "రెండు": 2, "మూడు": 3, "నాలుగు": 4, "ఐదు": 5, "అయిదు": 5,
+    "ఆరు": 6, "ఏడు": 7, "ఎనిమిది": 8, "తొమ్మిది": 9, "పది": 10,
+    "ఇరవై": 20, "ముప్పై": 30, "ముప్ఫై": 30, "నలభై": 40, "నలబై": 40,
+    "యాభై": 50, "యాబై": 50, "అరవై": 60, "డెబ్బై": 70, "ఎనభై": 80, "తొంభై": 90,
+    "వంద": 100, "వందల": 100,
+}
+
+# Occupation keyword -> stored value; earlier entries win when several appear
+OCCUPATIONS = [
+    ("రైతు", "రైతు"),
+    ("ఉద్యోగి", "ఉద్యోగి"),
+    ("విద్యార్థి", "విద్యార్థి"),
+    ("వ్యాపారం", "వ్యాపారం"),
+    ("వ్యాపారి", "వ్యాపారం"),
+]
+
+INCOME_UNITS = {"లక్ష": 100000, "వేలు": 1000, "వేల": 1000, "ఆదాయం": 1000}
+
+
+def _alternation(words):
+    # Longest first so "వందల" is preferred over "వంద"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+_WORD = _alternation(NUMBER_WORDS)
+_NUM = rf"[0-9౦-౯]+(?:,[0-9౦-౯]+)*(?:\.[0-9౦-౯]+)?|(?:{_WORD})(?:\s*(?:{_WORD}))*"
+_AGE_UNIT = r"సంవత్సరాల|వయస్సు|యేర్స్|ఏళ్ళు|ఏళ్లు"
+_AGE_WORD = r"వయస్సు|వయసు"
+_INCOME_UNIT = _alternation(INCOME_UNITS)
+
+# Lookahead on the possible first characters lets the scanner skip ahead quickly
+_FIRST_CHARS = set("0123456789౦౧౨౩౪౫౬౭౮౯వఆ")
+_FIRST_CHARS.update(w[0] for w in NUMBER_WORDS)
+_FIRST_CHARS.update(k[0] for k, _ in OCCUPATIONS)
+
+FACT_PATTERN = re.compile(
+    rf"(?=[{''.join(sorted(_FIRST_CHARS))}])"
+    rf"(?:(?:{_AGE_WORD})\s*(?P<age_a>{_NUM})"
+    rf"|(?P<age_b>{_NUM})\s*(?:{_AGE_UNIT})"
+    rf"|ఆదాయం\s*(?P<income_a>{_NUM})\s*(?P<unit_a>లక్ష|వేలు|వేల)?"
+    rf"|(?P<income_b>{_NUM})\s*(?P<unit_b>{_INCOME_UNIT})"
+    rf"|(?P<occupation>{_alternation(k for k, _ in OCCUPATIONS)}))"
+)
+NUMBER_WORD_PATTERN = re.compile(_WORD)
+OCCUPATION_RANK = {keyword: (rank, value) for rank, (keyword, value) in enumerate(OCCUPATIONS)}
+
+
+def parse_number(token):
+    """'35', '౩౫', '1,50,000', '2.5' or 'ముప్పై ఐదు' -> number"""
+    if token.isascii() and token.isdigit():
+        return int(token)
+    if token[0] in "0123456789౦౧౨౩౪౫౬౭౮౯":
+        token = token.translate(TELUGU_DIGITS).replace(",", "")
+        return float(token) if "." in token else int(token)
+
+    total = 0
+    for word in NUMBER_WORD_PATTERN.findall(token):
+        value = NUMBER_WORDS[word]
+        if value == 100:
+            total = (total or 1) * 100
+        else:
+            total += value
+    return total
+
+
+class FactExtractor:
+    """Pulls age, income and occupation out of one utterance in one regex scan"""
+
+    def extract(self, text):
+        """Return {"age": int, "income": int, "occupation": str} (found keys only)"""
+        facts = {}
+        best_occupation = None
+
+        for match in FACT_PATTERN.finditer(text):
+            kind = match.lastgroup
+            if kind == "occupation":
+                rank = OCCUPATION_RANK[match.group("occupation")]
+                if best_occupation is None or rank < best_occupation:
+                    best_occupation = rank
+            elif kind in ("age_a", "age_b"):
+                if "age" not in facts:
+                    facts["age"] = int(parse_number(match.group(kind)))
+            elif "income" not in facts:
+                # lastgroup is the unit when one matched
+                number = match.group("income_a") or match.group("income_b")
+                unit = match.group("unit_a") or match.group("unit_b")
+                multiplier = INCOME_UNITS[unit] if unit else 1
+                facts["income"] = int(round(parse_number(number) * multiplier))
+
+        if best_occupation is not None:
+            facts["occupation"] = best_occupation[1]
+        return facts
+
+
+_default_extractor = FactExtractor()
+
+
+def extract_facts(text):
+    """Module-level shortcut used by memory and the self-evaluator"""
+    return _default_extractor.extract(text)
+
+
+# Correctness corpus: utterance -> expected facts
+CORPUS = [
+    ("నా వయస్సు 30 సంవత్సరాలు", {"age": 30}),
+    ("నా వయస్సు 35", {"age": 35}),
+    ("45 ఏళ్ళు", {"age": 45}),
+    ("నాకు 60 యేర్స్", {"age": 60}),
+    ("నా వయస్సు ౪౫ సంవత్సరాలు", {"age": 45}),
+    ("ముప్పై ఐదు సంవత్సరాలు", {"age": 35}),
+    ("నా వయసు అరవై రెండు", {"age": 62}),
+    ("నా ఆదాయం 2 లక్షలు", {"income": 200000}),
+    ("3 లక్షలు", {"income": 300000}),
+    ("2.5 లక్షలు", {"income": 250000}),
+    ("50 వేలు", {"income": 50000}),
+    ("యాభై వేల రూపాయలు", {"income": 50000}),
+    ("పది వేలు", {"income": 10000}),
+    ("నా ఆదాయం 50000", {"income": 50000}),
+    ("ఆదాయం 1,50,000", {"income": 150000}),
+    ("ఆదాయం ౨ లక్షలు", {"income": 200000}),
+    ("రెండు లక్షలు", {"income": 200000}),
+    ("50 ఆదాయం", {"income": 50000}),
+    ("నేను రైతుని", {"occupation": "రైతు"}),
+    ("నేను వ్యాపారిని", {"occupation": "వ్యాపారం"}),
+    ("విద్యార్థి కానీ నాన్న రైతు", {"occupation": "రైతు"}),
+    ("నేను రైతుని, నా వయస్సు 40 సంవత్సరాలు, ఆదాయం 1 లక్ష",
+     {"age": 40, "income": 100000, "occupation": "రైతు"}),
+    ("నమస్కారం", {}),
+    ("ఆరోగ్య బీమా కావాలి", {}),
+    ("సరే", {}),
+]
+
+
+def _legacy_extract(text):
+    """The per-call patterns memory.py used before this module (for comparison)"""
+    facts = {}
+    age_match = re.search(r'(\d+)\s*(సంవత్సరాలు|వయస్సు|యేర్స్)', text)
+    if age_match:
+        facts["age"] = int(age_match.group(1))
+    income_match = re.search(r'(\d+)\s*(లక్ష|వేలు|ఆదాయం)', text)
+    if income_match:
+        num = int(income_match.group(1))
+        facts["income"] = num * 100000 if 'లక్ష' in income_match.group(2) else num * 1000
+    for occ in ['రైతు', 'ఉద్యోగి', 'విద్యార్థి', 'వ్యాపారం']:
+        if occ in text:
+            facts["occupation"] = occ
+            break
+    return facts
+
+
+def _legacy_memory_and_evaluator(text):
+    """Old cost per utterance: memory's passes plus the evaluator's own findall passes"""
+    facts = _legacy_extract(text)
+    re.findall(r'(\d+)\s*(సంవత్సరాలు|వయస్సు)', text)
+    re.findall(r'(\d+)\s*(లక్ష|వేలు|ఆదాయం)', text)
+    return facts
+
+
+# Correctness corpus + micro-benchmark
+if __name__ == "__main__":
+    import time
+
+    failures = 0
+    for text, expected in CORPUS:
+        got = extract_facts(text)
+        if got != expected:
+            failures += 1
+            print(f"❌ {text!r}: expected {expected}, got {got}")
+    print(f"✅ {len(CORPUS) - failures}/{len(CORPUS)} corpus cases")
+
+    # End to end: ages in words reach the extractor ("నలబై", "యాబై", "డెబ్బై" end in
+    # the exit word "బై") and move the call past ASK_AGE
+    import contextlib
+    import os
+    from agent import TeluguGovernmentAgent, is_exit
+    from channels import ReplayChannel
+
+    for age, words in [(42, "నలబై రెండు"), (55, "యాబై ఐదు"), (72, "డెబ్బై రెండు")]:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            agent = TeluguGovernmentAgent(use_voice=False)
+            agent.run(ReplayChannel(["నేను రైతుని", f"నా వయస్సు {words} సంవత్సరాలు"]))
+        assert (agent.state, agent.memory.user_facts.get("age")) == ("ASK_INCOME", age), \
+            (words, agent.state, agent.memory.user_facts)
+    assert is_exit("సరే, బై!") and is_exit("ధన్యవాదాలు") and not is_exit("డెబ్బై ఏళ్ళు")
+    print("✅ ages in words get past ASK_AGE; exit words only match whole words")
+
+    texts = [text for text, _ in CORPUS] * 2000
+    for name, function in [("legacy memory", _legacy_extract),
+                           ("legacy memory + evaluator", _legacy_memory_and_evaluator),
+                           ("single-pass (shared)", extract_facts)]:
+        start = time.perf_counter()
+        for text in texts:
+            function(text)
+        elapsed = time.perf_counter() - start
+        print(f"📊 {name}: {elapsed / len(texts) * 1e6:.2f}µs/utterance")
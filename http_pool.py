@@ -0,0 +1,128 @@
+# http_pool.py - SHARED KEEP-ALIVE HTTP CLIENT FOR THE SPEECH PATH
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from latency_stats import summarize
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class PooledHTTPClient:
+    """One requests.Session shared by every caller: keep-alive pool,
+    bounded concurrency, timeouts and jittered retry/backoff"""
+
+    def __init__(self, pool_size=32, max_concurrency=32, timeout=(3.05, 10),
+                 retries=2, backoff=0.2, max_backoff=2.0, retry_methods=("GET",)):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size,
+                              max_retries=0, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_methods = set(retry_methods)
+
+        # endpoint -> recent latencies (seconds)
+        self.latencies = defaultdict(lambda: deque(maxlen=2048))
+        self.counts = defaultdict(int)  # requests / retries / failures
+        self.lock = threading.Lock()
+
+    def _record(self, endpoint, seconds, outcome):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            self.counts[outcome] += 1
+
+    def _sleep_before_retry(self, attempt):
+        """Full jitter: uniform(0, min(max_backoff, backoff * 2**attempt))"""
+        time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+    def request(self, method, url, **kwargs):
+        """Send a request; retries connection errors, timeouts and 429/5xx"""
+        kwargs.setdefault("timeout", self.timeout)
+        parsed = urlparse(url)
+        endpoint = f"{method} {parsed.netloc}{parsed.path}"
+        attempts = self.retries + 1 if method in self.retry_methods else 1
+
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            try:
+                with self.slots:
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(endpoint, time.perf_counter() - start, "failures")
+                if attempt + 1 == attempts:
+                    raise
+            else:
+                retryable = response.status_code in RETRY_STATUSES
+                self._record(endpoint, time.perf_counter() - start,
+                             "failures" if retryable else "requests")
+                if not retryable or attempt + 1 == attempts:
+                    return response
+                response.close()
+
+            with self.lock:
+                self.counts["retries"] += 1
+            self._sleep_before_retry(attempt)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def metrics(self):
+        """Per-endpoint latency percentiles plus request/retry/failure counts"""
+        with self.lock:
+            snapshot = {endpoint: list(values) for endpoint, values in self.latencies.items()}
+            counts = dict(self.counts)
+        return {"counts": counts,
+                "endpoints": {endpoint: summarize(values) for endpoint, values in snapshot.items()}}
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_client():
+    """Process-wide client so every TeluguVoice reuses the same connections"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = PooledHTTPClient()
+        return _shared_client
+
+
+# Benchmark: bare requests.get vs pooled keep-alive client
+if __name__ == "__main__":
+    from standin_server import StandInServer
+
+    with StandInServer() as server:
+        url = server.url + "/translate_tts"
+        count = 300
+
+        start = time.perf_counter()
+        for i in range(count):
+            requests.get(url, params={"q": f"నమస్కారం {i}"})
+        bare = time.perf_counter() - start
+
+        client = PooledHTTPClient()
+        start = time.perf_counter()
+        for i in range(count):
+            client.get(url, params={"q": f"నమస్కారం {i}"})
+        pooled = time.perf_counter() - start
+
+        print(f"📊 bare {bare / count * 1000:.2f}ms/req, pooled {pooled / count * 1000:.2f}ms/req")
+        print(f"📊 {client.metrics()}")
@@ -0,0 +1,88 @@
+# latency_stats.py - SMALL HELPERS FOR LATENCY NUMBERS
+import bisect
+import math
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[index]
+
+
+def summarize(values):
+    """count / p50 / p95 / p99 / max in milliseconds for a list of seconds"""
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+# Upper bounds (seconds) for latency histograms, Prometheus style
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Fixed buckets: constant memory however many observations"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Estimate like Prometheus histogram_quantile (linear inside a bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def cumulative(self):
+        """[(upper bound or '+Inf', cumulative count), ...]"""
+        total = 0
+        rows = []
+        for bound, bucket_count in zip(self.buckets + ("+Inf",), self.counts):
+            total += bucket_count
+            rows.append((bound, total))
+        return rows
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "p50_ms": round(self.quantile(0.50) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "mean_ms": round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+        }
+
+
+# Test: nearest rank (the smallest value with at least pct% of values at or below it)
+if __name__ == "__main__":
+    assert percentile([1, 2, 3, 4, 5], 50) == 3
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert [percentile(list(range(1, 101)), pct) for pct in range(1, 101)] == list(range(1, 101))
+    assert percentile([7], 99) == 7 and percentile([], 50) == 0.0
+    print("✅ percentile: nearest rank")
@@ -1,58 +1,89 @@
 # memory.py - Conversation Memory System
+import time
+from collections import deque
 from datetime import datetime
+from itertools import islice
+
+from fact_extractor import extract_facts
+import tracing
 
 
 class ConversationMemory:
     """Memory system for storing conversation"""
 
-    def __init__(self):
-        self.history = []
+    def __init__(self, session_id=None, store=None, max_history=100):
+        # Recent turns live in a ring buffer; older ones only in the store
+        self.session_id = session_id
+        self.store = store if session_id is not None else None
+        self.history = deque(maxlen=max_history)
+        self.turn_count = 0
         self.user_facts = {}
         self.contradictions = []
+        self.contradiction_index = {}  # field -> first contradiction on that field
+        self.facts_changed = False
+        self.position = None  # (dialogue state, turn count) as last saved to the store
+
+        if self.store is not None:
+            self.resume()
         print("💾 కన్వర్సేషన్ మెమరీ సిస్టమ్ సిద్ధంగా ఉంది")
 
-    def add_interaction(self, user_input, agent_response, state):
-        """Add interaction to memory"""
-        entry = {
-            "timestamp": datetime.now().strftime("%H:%M:%S"),
+    def resume(self):
+        """Reload a dropped session's facts and recent turns from the store"""
+        snapshot = self.store.load_snapshot(self.session_id)
+        if snapshot is not None:
+            self.user_facts, self.contradictions = snapshot
+            for cont in self.contradictions:
+                self.contradiction_index.setdefault(cont["field"], cont)
+
+        self.position = self.store.load_position(self.session_id)
+        self.turn_count = self.store.turn_count(self.session_id)
+        start = self.turn_count - (self.history.maxlen or self.turn_count)
+        for row in self.store.load_turns(self.session_id, start=max(0, start)):
+            self.history.append(self._entry(row["ts"], row["user"], row["agent"], row["state"]))
+
+    @staticmethod
+    def _entry(ts, user_input, agent_response, state):
+        return {
+            "timestamp": datetime.fromtimestamp(ts).strftime("%H:%M:%S"),
+            "ts": ts,
             "user": user_input,
             "agent": agent_response,
             "state": state
         }
+
+    def add_interaction(self, user_input, agent_response, state):
+        """Add interaction to memory"""
+        entry = self._entry(time.time(), user_input, agent_response, state)
         self.history.append(entry)
+        if self.store is not None:
+            self.store.append_turn(self.session_id, self.turn_count, entry)
+        self.turn_count += 1
 
         # Extract facts from user input
         self.extract_facts(user_input)
-
-        print(f"💾 మెమరీలో సేవ్ చేయబడింది: {len(self.history)} ఇంటరాక్షన్లు")
+        if self.facts_changed and self.store is not None:
+            self.store.save_snapshot(self.session_id, self.user_facts,
+                                     self.contradictions, entry["ts"])
+        self.facts_changed = False
+
+        print(f"💾 మెమరీలో సేవ్ చేయబడింది: {self.turn_count} ఇంటరాక్షన్లు")
+
+    def save_position(self, state):
+        """Record where the dialogue is, so another process can pick the session up"""
+        if self.store is None:
+            return
+        position = (state, self.turn_count)
+        if position != self.position:
+            self.store.save_position(self.session_id, state, self.turn_count)
+            self.position = position
 
     def extract_facts(self, text):
         """Extract facts from Telugu text"""
-        import re
-
-        # Extract age
-        age_match = re.search(r'(\d+)\s*(సంవత్సరాలు|వయస్సు|యేర్స్)', text)
-        if age_match:
-            age = int(age_match.group(1))
-            self.store_fact("age", age)
-
-        # Extract income
-        income_match = re.search(r'(\d+)\s*(లక్ష|వేలు|ఆదాయం)', text)
-        if income_match:
-            num = int(income_match.group(1))
-            unit = income_match.group(2)
-            if 'లక్ష' in unit:
-                income = num * 100000
-            else:
-                income = num * 1000
-            self.store_fact("income", income)
-
-        # Extract occupation
-        occupations = ['రైతు', 'ఉద్యోగి', 'విద్యార్థి', 'వ్యాపారం']
-        for occ in occupations:
-            if occ in text:
-                self.store_fact("occupation", occ)
-                break
+        with tracing.span("extract_facts"):
+            facts = extract_facts(text)
+        for key in ("age", "income", "occupation"):
+            if key in facts:
+                self.store_fact(key, facts[key])
 
     def store_fact(self, key, value):
         """Store fact with contradiction check"""
@@ -60,33 +91,55 @@ class ConversationMemory:
             old_value = self.user_facts[key]
             if old_value != value:
                 # CONTRADICTION DETECTED!
-                self.contradictions.append({
+                contradiction = {
                     "field": key,
                     "old": old_value,
                     "new": value,
                     "time": datetime.now().strftime("%H:%M:%S")
-                })
+                }
+                self.contradictions.append(contradiction)
+                self.contradiction_index.setdefault(key, contradiction)
                 print(f"⚠️ విరోధాభాసం కనుగొనబడింది: {key} = {old_value} → {value}")
 
+        if self.user_facts.get(key) != value:
+            self.facts_changed = True
         self.user_facts[key] = value
 
     def get_contradictions(self):
         """Get all contradictions"""
         return self.contradictions
 
+    def get_contradiction(self, field):
+        """First contradiction on a field, or None (no scan)"""
+        return self.contradiction_index.get(field)
+
     def get_user_profile(self):
         """Get user profile from facts"""
         return self.user_facts.copy()
 
     def get_history(self, last_n=5):
-        """Get last n interactions"""
-        return self.history[-last_n:] if self.history else []
+        """Get last n interactions (older ones come from the store)"""
+        if last_n <= 0:
+            return []
+        buffered = len(self.history)
+        if last_n <= buffered or self.store is None:
+            return list(islice(self.history, max(0, buffered - last_n), None))
+
+        start = max(0, self.turn_count - last_n)
+        older = self.store.load_turns(self.session_id, start=start, end=self.turn_count - buffered)
+        return [self._entry(row["ts"], row["user"], row["agent"], row["state"])
+                for row in older] + list(self.history)
 
     def clear(self):
         """Clear memory"""
-        self.history = []
+        self.history.clear()
+        self.turn_count = 0
         self.user_facts = {}
         self.contradictions = []
+        self.contradiction_index = {}
+        self.position = None
+        if self.store is not None:
+            self.store.delete_session(self.session_id)
         print("🧹 మెమరీ క్లియర్ చేయబడింది")
 
 
@@ -0,0 +1,207 @@
+# memory_store.py - PERSISTENT STORE FOR CONVERSATION MEMORY
+import atexit
+import json
+import sqlite3
+import threading
+
+
+class SQLiteMemoryStore:
+    """Append-only turn log per session + snapshot of facts/contradictions and dialogue position"""
+
+    def __init__(self, path="conversation_memory.db", commit_every=256):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS turns (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                ts REAL NOT NULL,
+                user TEXT,
+                agent TEXT,
+                state TEXT,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS snapshots (
+                session_id TEXT PRIMARY KEY,
+                facts TEXT NOT NULL,
+                contradictions TEXT NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS positions (
+                session_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                turns INTEGER NOT NULL
+            );
+        """)
+        self.lock = threading.Lock()
+        self.commit_every = commit_every
+        self.pending = 0
+        atexit.register(self.flush)
+
+    def _wrote(self):
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.conn.commit()
+            self.pending = 0
+
+    def append_turn(self, session_id, seq, entry):
+        """Append one interaction (never rewritten)"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO turns VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, seq, entry["ts"], entry["user"], entry["agent"], entry["state"]))
+            self._wrote()
+
+    def save_snapshot(self, session_id, user_facts, contradictions, ts):
+        """Replace the session's facts/contradictions snapshot"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                (session_id, json.dumps(user_facts, ensure_ascii=False),
+                 json.dumps(contradictions, ensure_ascii=False), ts))
+            self._wrote()
+
+    def load_snapshot(self, session_id):
+        """(user_facts, contradictions) or None for an unknown session"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT facts, contradictions FROM snapshots WHERE session_id = ?",
+                (session_id,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), json.loads(row[1])
+
+    def save_position(self, session_id, state, turns):
+        """Dialogue state the session is in after its first `turns` turns"""
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO positions VALUES (?, ?, ?)",
+                              (session_id, state, turns))
+            self._wrote()
+
+    def load_position(self, session_id):
+        """(state, turns) or None for an unknown session"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT state, turns FROM positions WHERE session_id = ?", (session_id,)).fetchone()
+        return None if row is None else tuple(row)
+
+    def data_version(self):
+        """Counter that moves when another connection commits (no table is read)"""
+        with self.lock:
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load_turns(self, session_id, start=0, end=None):
+        """Turns with start <= seq < end, oldest first"""
+        if end is None:
+            end = 1 << 62
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT seq, ts, user, agent, state FROM turns "
+                "WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, start, end)).fetchall()
+        return [{"seq": seq, "ts": ts, "user": user, "agent": agent, "state": state}
+                for seq, ts, user, agent, state in rows]
+
+    def turn_count(self, session_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MAX(seq) FROM turns WHERE session_id = ?", (session_id,)).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def delete_session(self, session_id):
+        with self.lock:
+            self.conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+            self.conn.execute("DELETE FROM snapshots WHERE session_id = ?", (session_id,))
+            self.conn.execute("DELETE FROM positions WHERE session_id = ?", (session_id,))
+            self._wrote()
+
+    def flush(self):
+        """Commit buffered writes"""
+        with self.lock:
+            if self.pending:
+                self.conn.commit()
+                self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+        atexit.unregister(self.flush)
+
+
+# Benchmark: 100k sessions, bounded RAM history spilled to SQLite
+if __name__ == "__main__":
+    import argparse
+    import contextlib
+    import os
+    import tempfile
+    import time
+    import tracemalloc
+    from latency_stats import summarize
+    from memory import ConversationMemory
+
+    parser = argparse.ArgumentParser(description="Conversation memory benchmark")
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--turns", type=int, default=8)
+    args = parser.parse_args()
+
+    script = ["నేను రైతుని", "నా వయస్సు 35 సంవత్సరాలు", "నా ఆదాయం 2 లక్షలు", "సరే"]
+
+    def add_session(i, store, max_history, add_times=None):
+        memory = ConversationMemory(session_id=f"s{i}", store=store, max_history=max_history)
+        for t in range(args.turns):
+            start = time.perf_counter()
+            memory.add_interaction(script[t % len(script)], "సరే", "ASK_AGE")
+            if add_times is not None:
+                add_times.append(time.perf_counter() - start)
+        return memory
+
+    def run(store, max_history):
+        # RAM per session from a tracemalloc'd sample, timings without tracing
+        sample = max(1, args.sessions // 10)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            tracemalloc.start()
+            kept = [add_session(f"ram{i}", store, max_history) for i in range(sample)]
+            ram = tracemalloc.get_traced_memory()[0] / sample
+            tracemalloc.stop()
+            del kept
+
+            add_times = []
+            memories = [add_session(i, store, max_history, add_times) for i in range(args.sessions)]
+
+        ring_times, spill_times = [], []
+        for memory in memories[:: max(1, args.sessions // 1000)]:
+            start = time.perf_counter()
+            memory.get_history(3)
+            ring_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            memory.get_history(args.turns)
+            spill_times.append(time.perf_counter() - start)
+        return ram, summarize(add_times), summarize(ring_times), summarize(spill_times)
+
+    ram, add_stats, ring_stats, _ = run(None, max_history=None)
+    print(f"📊 unbounded in-RAM: {ram:.0f} B/session, "
+          f"add p50 {add_stats['p50_ms']}ms, get_history(3) p50 {ring_stats['p50_ms']}ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteMemoryStore(os.path.join(directory, "memory.db"))
+        ram, add_stats, ring_stats, spill_stats = run(store, max_history=4)
+        store.flush()
+        print(f"📊 sqlite + ring(4): {ram:.0f} B/session, "
+              f"add p50 {add_stats['p50_ms']}ms p99 {add_stats['p99_ms']}ms, "
+              f"get_history(3) p50 {ring_stats['p50_ms']}ms, "
+              f"get_history({args.turns}) p50 {spill_stats['p50_ms']}ms, "
+              f"db {os.path.getsize(store.path) / 1e6:.1f}MB")
+
+        # Reconnect: rebuild sessions from disk
+        resume_times = []
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for i in range(0, args.sessions, max(1, args.sessions // 1000)):
+                start = time.perf_counter()
+                memory = ConversationMemory(session_id=f"s{i}", store=store, max_history=4)
+                resume_times.append(time.perf_counter() - start)
+                assert memory.get_user_profile()["occupation"] == "రైతు"
+                assert len(memory.get_history(args.turns)) == args.turns
+        print(f"📊 resume: {summarize(resume_times)}")
+        store.close()
@@ -0,0 +1,235 @@
+# playback.py - NON-BLOCKING AUDIO PLAYBACK ENGINE
+import io
+import itertools
+import queue
+import threading
+import time
+
+import tracing
+
+# How a queued utterance ended
+FINISHED = "finished"
+CANCELLED = "cancelled"  # dropped before or while playing
+FAILED = "failed"
+
+
+class PygameSink:
+    """pygame.mixer, initialised once, playing in-memory MP3 buffers"""
+
+    name = "pygame"
+
+    def __init__(self):
+        import pygame
+
+        self.pygame = pygame
+        pygame.mixer.init()
+
+    def play(self, audio):
+        music = self.pygame.mixer.music
+        music.load(io.BytesIO(audio), "mp3")
+        music.play()
+
+    def busy(self):
+        return self.pygame.mixer.music.get_busy()
+
+    def stop(self):
+        self.pygame.mixer.music.stop()
+
+    def close(self):
+        self.pygame.mixer.quit()
+
+
+class NullSink:
+    """Plays nothing; each buffer 'lasts' duration seconds (or bytes / bytes_per_second)"""
+
+    name = "null"
+
+    def __init__(self, duration=0.0, bytes_per_second=None):
+        self.duration = duration
+        self.bytes_per_second = bytes_per_second
+        self.ends_at = 0.0
+        self.played = []  # (monotonic start time, audio)
+
+    def play(self, audio):
+        seconds = len(audio) / self.bytes_per_second if self.bytes_per_second else self.duration
+        now = time.monotonic()
+        self.ends_at = now + seconds
+        self.played.append((now, audio))
+
+    def busy(self):
+        return time.monotonic() < self.ends_at
+
+    def stop(self):
+        self.ends_at = 0.0
+
+    def close(self):
+        pass
+
+
+class PlaybackItem:
+    """Handle for one queued buffer"""
+
+    def __init__(self, item_id, audio, label, session=None):
+        self.id = item_id
+        self.audio = audio
+        self.label = label
+        self.session = session  # trace session that queued it
+        self.status = None  # FINISHED / CANCELLED / FAILED once done
+        self.started = None  # monotonic time playback began
+        self.ended = None
+        self.cancelled = False
+        self.generation = 0
+        self.done = threading.Event()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+
+class PlaybackEngine:
+    """Plays queued buffers one after another on its own thread
+
+    enqueue() returns immediately. on_start(item) / on_end(item) run on the
+    playback thread; idle is set whenever nothing is queued or playing.
+    """
+
+    def __init__(self, sink=None, poll_interval=0.01):
+        self.sink = sink if sink is not None else PygameSink()
+        self.poll_interval = poll_interval
+        self.queue = queue.Queue()
+        self.ids = itertools.count(1)
+        self.generation = 0  # bumped by cancel_all(); older items are dropped
+        self.current = None
+        self.pending = 0  # queued or playing
+        self.lock = threading.Lock()
+        self.idle = threading.Event()
+        self.idle.set()
+        self.wakeup = threading.Event()  # cuts the busy-poll short on cancel
+        self.on_start = []
+        self.on_end = []
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="playback", daemon=True)
+        self.thread.start()
+
+    def enqueue(self, audio, label=None):
+        item = PlaybackItem(next(self.ids), audio, label, tracing.current_session())
+        with self.lock:
+            item.generation = self.generation
+            self.pending += 1
+            self.idle.clear()
+        self.queue.put(item)
+        return item
+
+    def play(self, audio, label=None):
+        """Blocking convenience: queue and wait until it has played"""
+        item = self.enqueue(audio, label)
+        item.wait()
+        return item
+
+    def cancel_all(self):
+        """Stop what is playing and drop everything queued"""
+        with self.lock:
+            self.generation += 1
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self._finish(item, CANCELLED)
+        self.wakeup.set()
+
+    def wait_idle(self, timeout=None):
+        return self.idle.wait(timeout)
+
+    def _emit(self, callbacks, item):
+        for callback in callbacks:
+            try:
+                callback(item)
+            except Exception as e:
+                print(f"⚠️ ప్లేబ్యాక్ కాల్‌బ్యాక్ దోషం: {e}")
+
+    def _finish(self, item, status):
+        item.status = status
+        item.ended = time.monotonic()
+        item.audio = None  # do not keep played buffers alive
+        if item.started is not None:
+            self._emit(self.on_end, item)
+        item.done.set()
+        with self.lock:
+            self.pending -= 1
+            if self.pending == 0:
+                self.idle.set()
+
+    def _dropped(self, item):
+        return item.cancelled or item.generation != self.generation
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self._dropped(item):
+                self._finish(item, CANCELLED)
+                continue
+
+            self.current = item
+            self.wakeup.clear()
+            item.started = time.monotonic()
+            self._emit(self.on_start, item)
+            try:
+                with tracing.span("playback", session=item.session) as span:
+                    self.sink.play(item.audio)
+                    while self.sink.busy() and not self._dropped(item):
+                        self.wakeup.wait(self.poll_interval)
+                    if self._dropped(item):
+                        self.sink.stop()
+                        status = CANCELLED
+                    else:
+                        status = FINISHED
+                    span.set(status=status)
+            except Exception as e:
+                print(f"❌ ప్లేబ్యాక్ దోషం: {e}")
+                status = FAILED
+            self.current = None
+            self._finish(item, status)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.cancel_all()
+        self.queue.put(None)
+        self.thread.join()
+        self.sink.close()
+
+
+# Test: the caller keeps working while audio plays; cancellation; event order
+if __name__ == "__main__":
+    events = []
+    engine = PlaybackEngine(NullSink(duration=0.2))
+    engine.on_start.append(lambda item: events.append(("start", item.label)))
+    engine.on_end.append(lambda item: events.append(("end", item.label, item.status)))
+
+    start = time.monotonic()
+    items = [engine.enqueue(b"ID3" * 100, label=f"chunk {i}") for i in range(3)]
+    queued = time.monotonic() - start
+
+    # The "dialogue loop" does 100ms of work while the first chunk plays
+    time.sleep(0.1)
+    busy_while_playing = items[0].status is None
+    items[0].wait()
+    engine.cancel_all()  # caller barged in during chunk 1
+    engine.wait_idle(1.0)
+    elapsed = time.monotonic() - start
+
+    assert busy_while_playing
+    assert [item.status for item in items] == [FINISHED, CANCELLED, CANCELLED], items
+    assert events[0] == ("start", "chunk 0") and events[1] == ("end", "chunk 0", FINISHED)
+    print(f"🔈 enqueue 3 chunks: {queued * 1000:.2f}ms, "
+          f"played 1 + cancelled 2 in {elapsed:.2f}s, events {events}")
+
+    item = engine.play(b"ID3")
+    print(f"🔈 blocking play(): {item.status} after {(item.ended - item.started):.2f}s")
+    engine.close()
@@ -0,0 +1,167 @@
+# prefetch.py - SPECULATIVE SYNTHESIS OF THE NEXT PROMPTS
+import contextvars
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+
+class PrefetchScheduler:
+    """Synthesizes predicted chunks in the background, keeps them in memory
+
+    prefetch() replaces the current prediction; take() hands audio over (waiting
+    for a prediction still in flight). Audio nobody asked for is evicted first
+    once budget_bytes is exceeded.
+    """
+
+    def __init__(self, synthesize, budget_bytes=2 * 1024 * 1024, max_workers=2):
+        self.synthesize = synthesize  # chunk -> audio bytes or None
+        self.budget_bytes = budget_bytes
+        self.ready = OrderedDict()  # chunk -> audio, oldest first
+        self.pending = {}  # chunk -> future
+        self.wanted = set()  # chunks of the latest prediction
+        self.claimed = set()  # in-flight chunks a take() is waiting for: never cancelled
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.stats = {"prefetched": 0, "used": 0, "waited": 0, "discarded": 0, "cancelled": 0}
+
+    def prefetch(self, chunks):
+        """Start synthesizing chunks that are not ready or in flight"""
+        with self.lock:
+            self.wanted = set(chunks)
+            for chunk, future in list(self.pending.items()):
+                if chunk not in self.wanted and chunk not in self.claimed and future.cancel():
+                    del self.pending[chunk]
+                    self.stats["cancelled"] += 1
+            for chunk in chunks:
+                if chunk not in self.ready and chunk not in self.pending:
+                    self.pending[chunk] = self.pool.submit(contextvars.copy_context().run,
+                                                           self._fetch, chunk)
+
+    def _fetch(self, chunk):
+        try:
+            audio = self.synthesize(chunk)
+        except Exception as e:
+            print(f"⚠️ ముందస్తు సంశ్లేషణ విఫలమైంది: {e}")
+            audio = None
+        with self.lock:
+            self.pending.pop(chunk, None)
+            if audio is not None and chunk not in self.ready:
+                self.ready[chunk] = audio
+                self.total_bytes += len(audio)
+                self.stats["prefetched"] += 1
+                self._evict()
+        return audio
+
+    def _evict(self):
+        while self.total_bytes > self.budget_bytes and self.ready:
+            # Stale predictions go first, then the oldest ones
+            victim = next((c for c in self.ready if c not in self.wanted), None)
+            if victim is None:
+                victim = next(iter(self.ready))
+            self.total_bytes -= len(self.ready.pop(victim))
+            self.stats["discarded"] += 1
+
+    def take(self, chunk):
+        """Prefetched audio for chunk (waits if it is still being synthesized), else None"""
+        with self.lock:
+            audio = self.ready.pop(chunk, None)
+            if audio is not None:
+                self.total_bytes -= len(audio)
+                self.stats["used"] += 1
+                return audio
+            future = self.pending.get(chunk)
+            if future is None:
+                return None
+            # Claimed before the lock is released, so a prefetch() of a new
+            # prediction cannot cancel it while we wait
+            self.claimed.add(chunk)
+
+        # Already on its way: joining it beats starting a second request
+        try:
+            audio = future.result()
+        except CancelledError:
+            audio = None  # close() shut the pool down; the caller synthesizes itself
+        with self.lock:
+            self.claimed.discard(chunk)
+            if audio is not None and self.ready.pop(chunk, None) is not None:
+                self.total_bytes -= len(audio)
+            self.stats["waited"] += 1
+        return audio
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Benchmark: perceived response latency (caller stops talking -> first audio)
+if __name__ == "__main__":
+    import contextlib
+    import os
+    import tempfile
+    import time
+    from agent import TeluguGovernmentAgent
+    from audio_cache import AudioCache
+    from playback import NullSink, PlaybackEngine
+    from speech import TeluguVoice
+    from speech_backends import LocalHTTPBackend
+    from standin_server import StandInServer
+    from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+    class CallerVoice(TeluguVoice):
+        """listen() takes as long as the caller talks; records first-audio latency"""
+
+        def listen(self):
+            text = super().listen()
+            time.sleep(0.8)  # the caller is still talking
+            self.heard_at = time.monotonic()
+            return text
+
+    # A new prediction arriving while take() waits must not cancel the chunk it waits for
+    release = threading.Event()
+
+    def slow_synthesize(chunk):
+        if chunk == "blocker":
+            release.wait(5)
+        return chunk.encode("utf-8")
+
+    scheduler = PrefetchScheduler(slow_synthesize, max_workers=1)
+    scheduler.prefetch(["blocker", "ask_age"])  # ask_age is queued behind the blocker
+    taken = []
+    waiter = threading.Thread(target=lambda: taken.append(scheduler.take("ask_age")))
+    waiter.start()
+    while "ask_age" not in scheduler.claimed:
+        time.sleep(0.001)
+    scheduler.prefetch(["ask_income"])  # would cancel the queued ask_age
+    release.set()
+    waiter.join(5)
+    assert taken == [b"ask_age"] and scheduler.stats["cancelled"] == 0, (taken, scheduler.stats)
+    scheduler.close()
+    print("✅ take() waiting on a chunk survives a new prediction")
+
+    tool1, tool2 = Tool1_EligibilityChecker(), Tool2_SchemeRecommender()
+    results = {}
+    with StandInServer(latency=0.25) as server:
+        for label, budget in [("no prefetch", 0), ("prefetch", 256 * 1024)]:
+            latencies = []
+            with tempfile.TemporaryDirectory() as cache_dir, open(os.devnull, "w") as devnull, \
+                    contextlib.redirect_stdout(devnull):
+                sink = NullSink(duration=0.05)
+                voice = CallerVoice(backend=LocalHTTPBackend(server.url, session=label),
+                                    cache=AudioCache(cache_dir), player=PlaybackEngine(sink),
+                                    prefetch_budget=budget)
+                voice.heard_at = None
+
+                def first_audio(item):
+                    if voice.heard_at is not None:
+                        latencies.append(item.started - voice.heard_at)
+                        voice.heard_at = None
+
+                voice.player.on_start.append(first_audio)
+                agent = TeluguGovernmentAgent(tool1=tool1, tool2=tool2, voice=voice)
+                agent.run_voice_conversation()
+            results[label] = (latencies, voice.prefetcher.stats if voice.prefetcher else {})
+
+    for label, (latencies, stats) in results.items():
+        fixed = latencies[:3]  # ask_age, ask_income, processing
+        print(f"📊 {label}: fixed prompts {[round(l * 1000) for l in fixed]}ms, "
+              f"all turns {[round(l * 1000) for l in latencies]}ms {stats}")
@@ -0,0 +1,217 @@
+# prefork.py - PREFORKED TEXT WORKERS SHARING WARM, IMMUTABLE STATE
+#
+# The parent imports the agent, builds the shared tools (catalog snapshot,
+# eligibility index), runs one throwaway conversation so every lazy path is
+# warm, freezes the GC, then forks workers onto one listening socket. Workers
+# inherit all of it copy-on-write and answer their first caller at once.
+#
+# Any worker may accept a caller's next connection, so sessions live in a
+# SQLite memory store every worker opens: a worker that has not seen the
+# session (or has an old copy) reloads it and carries on.
+import asyncio
+import contextlib
+import gc
+import os
+import signal
+import socket
+
+from agent import TeluguGovernmentAgent, shared_tools
+from memory_store import SQLiteMemoryStore
+from session_server import CALLER_SCRIPT, SessionServer
+
+
+def warm_up():
+    """Build and exercise everything the workers share; returns (tool1, tool2)"""
+    tool1, tool2 = shared_tools()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        agent = TeluguGovernmentAgent(tool1=tool1, tool2=tool2, use_voice=False)
+        agent.handle_start("")
+        for text in CALLER_SCRIPT:
+            agent.process(text)
+    return tool1, tool2
+
+
+class PreforkServer:
+    """Parent process: owns the socket, keeps `workers` forked SessionServers alive"""
+
+    def __init__(self, workers=None, host="127.0.0.1", port=8765, idle_timeout=300,
+                 store_path="conversation_memory.db"):
+        self.workers = workers or os.cpu_count() or 1
+        if store_path is None and self.workers > 1:
+            raise ValueError("several workers need a store_path: a caller's next line may reach another worker")
+        self.store_path = store_path
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.children = {}  # pid -> worker slot
+        self.stopping = False
+        self.sock = None
+        self.server = None
+
+    def start(self):
+        """Bind, warm up, fork the workers; returns self"""
+        self.sock = socket.create_server((self.host, self.port), backlog=1024)
+        self.port = self.sock.getsockname()[1]
+        tool1, tool2 = warm_up()
+        self.server = SessionServer(idle_timeout=self.idle_timeout, tool1=tool1, tool2=tool2)
+        # Long-lived objects move out of the collector's reach, so a worker's
+        # GC passes do not write to (and un-share) the inherited pages
+        gc.collect()
+        gc.freeze()
+        for slot in range(self.workers):
+            self.spawn(slot)
+        print(f"🍴 {self.workers} వర్కర్లు {self.host}:{self.port} పై సిద్ధం")
+        return self
+
+    def spawn(self, slot):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                if self.store_path is not None:
+                    # Own connection per worker (SQLite handles must not cross a fork);
+                    # every turn is committed so the other workers see it at once
+                    self.server.store = SQLiteMemoryStore(self.store_path, commit_every=1)
+                asyncio.run(self.server.serve(sock=self.sock))
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = slot
+        return pid
+
+    def supervise(self):
+        """Reap workers and fork replacements until stop() (blocks)"""
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            slot = self.children.pop(pid, None)
+            if slot is not None and not self.stopping:
+                print(f"⚠️ వర్కర్ {pid} ఆగిపోయింది ({status}), మళ్లీ ప్రారంభిస్తున్నాను")
+                self.spawn(slot)
+
+    def stop(self):
+        """Terminate the workers; supervise() returns once they are reaped"""
+        self.stopping = True
+        for pid in list(self.children):
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    def serve_forever(self):
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        try:
+            self.supervise()
+        except KeyboardInterrupt:
+            self.stop()
+            self.supervise()
+        finally:
+            self.sock.close()
+            self.server.close()
+
+
+def first_reply(port, session_id="startup-probe", timeout=30.0):
+    """Open a session over TCP and wait for the greeting (retries until listening)"""
+    import json
+    import time
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=timeout) as conn:
+                request = json.dumps({"session": session_id, "text": None}) + "\n"
+                conn.sendall(request.encode("utf-8"))
+                reply = conn.makefile("rb").readline()
+                if reply:
+                    return json.loads(reply)
+        except (ConnectionRefusedError, ConnectionResetError):
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"no reply on port {port}")
+        time.sleep(0.005)
+
+
+# Startup benchmark: import time, time-to-first-turn, worker first reply
+if __name__ == "__main__":
+    import argparse
+    import statistics
+    import subprocess
+    import sys
+    import threading
+    import time
+
+    parser = argparse.ArgumentParser(description="Preforked session workers")
+    parser.add_argument("--serve", action="store_true", help="run the preforked server")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--store", default="conversation_memory.db", help="session store shared by the workers")
+    parser.add_argument("--runs", type=int, default=5, help="benchmark repetitions")
+    args = parser.parse_args()
+
+    if args.serve:
+        PreforkServer(args.workers, port=args.port, store_path=args.store).start().serve_forever()
+        sys.exit(0)
+
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def child_seconds(code):
+        """Median of a fresh interpreter's measurement (it prints seconds)"""
+        samples = []
+        for _ in range(args.runs):
+            output = subprocess.run([sys.executable, "-c", code], cwd=here, check=True,
+                                    capture_output=True, text=True).stdout
+            samples.append(float(output.strip().splitlines()[-1]))
+        return statistics.median(samples)
+
+    timer = "import time; t0 = time.perf_counter()\n"
+    first_turn = ("agent.handle_start(''); agent.process('నేను రైతుని'); "
+                  "agent.process('నా వయస్సు 35'); agent.process('నా ఆదాయం 2 లక్షలు'); "
+                  "agent.process('సరే')\nprint(time.perf_counter() - t0)")
+    cases = {
+        "import agent": timer + "import agent\nprint(time.perf_counter() - t0)",
+        "import agent + speech stack (eager)": timer + "import agent, speech\nprint(time.perf_counter() - t0)",
+        "first tool turn (lazy)": timer + "import agent\nagent = agent.TeluguGovernmentAgent(use_voice=False)\n"
+                                  + first_turn,
+        "first tool turn (eager)": timer + "import agent, speech, tools\n"
+                                   "agent = agent.TeluguGovernmentAgent(tool1=tools.Tool1_EligibilityChecker(), "
+                                   "tool2=tools.Tool2_SchemeRecommender(), use_voice=False)\n" + first_turn,
+    }
+    for label, code in cases.items():
+        print(f"⏱️ {label:<38} {child_seconds(code) * 1000:8.1f}ms")
+
+    # A new worker answering its first caller: cold interpreter vs forked from a warm parent
+    cold = []
+    for run in range(args.runs):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, "session_server.py", "--serve", "--port", str(8790 + run)],
+                                   cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            first_reply(8790 + run)
+            cold.append(time.perf_counter() - start)
+        finally:
+            process.terminate()
+            process.wait()
+
+    forked = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        server = PreforkServer(workers=1, port=0, store_path=None).start()
+        parent_ready = time.perf_counter() - start
+        supervisor = threading.Thread(target=server.supervise, daemon=True)
+        supervisor.start()
+        for run in range(args.runs + 1):
+            start = time.perf_counter()
+            if run:
+                os.kill(next(iter(server.children)), signal.SIGKILL)  # the supervisor forks a replacement
+            reply = first_reply(server.port, f"probe-{run}")
+            if run:
+                forked.append(time.perf_counter() - start)
+        server.stop()
+        supervisor.join(5)
+
+    print(f"⏱️ {'cold worker: spawn -> first reply':<38} {statistics.median(cold) * 1000:8.1f}ms")
+    print(f"⏱️ {'forked worker: fork -> first reply':<38} {statistics.median(forked) * 1000:8.1f}ms "
+          f"(parent warm-up once: {parent_ready * 1000:.1f}ms)")
+    print(f"   {reply['state']}: {reply['response'][:40]}...")
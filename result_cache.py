@@ -0,0 +1,125 @@
+# result_cache.py - LRU/TTL CACHE FOR TOOL RESULTS
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """Bounded LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, max_entries=4096, ttl=600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[0] <= self.clock():
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (self.clock() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop everything (the catalog changed)"""
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Benchmark: busy hour of repeat callers, uncached vs cached tools
+if __name__ == "__main__":
+    import contextlib
+    import os
+    import random
+    from eligibility_index import generate_catalog
+    from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+    rng = random.Random(3)
+    occupations = ["రైతు", "ఉద్యోగి", "విద్యార్థి", "వ్యాపారం", None]
+    # Round numbers, like people actually say them; 4000 callers, most of whom
+    # call more than once in the hour
+    callers = []
+    for _ in range(4000):
+        profile = {"age": rng.randint(18, 80), "income": rng.randrange(0, 600000, 10000)}
+        if rng.random() < 0.9:
+            profile["occupation"] = rng.choice(occupations)
+        callers.append(profile)
+    profiles = [dict(rng.choice(callers)) for _ in range(20000)]
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        checker = Tool1_EligibilityChecker(cache=ResultCache(max_entries=32768))
+        recommender = Tool2_SchemeRecommender(cache=ResultCache(max_entries=32768))
+
+        def busy_hour(cached, size, warm=False):
+            if not warm:
+                checker.reload_schemes(generate_catalog(size))
+                recommender.cache.invalidate()
+            checker.use_cache = recommender.use_cache = cached
+            start = time.perf_counter()
+            results = []
+            for profile in profiles:
+                eligible = checker.check(profile)
+                results.append([r["scheme"]["id"] for r in recommender.recommend(eligible, profile)])
+            return time.perf_counter() - start, results
+
+        timings = []
+        for size in (50, 2000):
+            uncached_time, expected = busy_hour(False, size)
+            cached_time, actual = busy_hour(True, size)
+            assert actual == expected, "cached results differ"
+            stats = checker.cache.stats()
+            warm_time, actual = busy_hour(True, size, warm=True)  # every call a hit
+            assert actual == expected, "cached results differ"
+            timings.append((size, uncached_time, cached_time, warm_time))
+
+        # Reload invalidates: a changed catalog is visible on the next call
+        checker.reload_schemes(checker.load_schemes())
+        reloaded = [s["id"] for s in checker.check({"age": 35, "income": 50000, "occupation": "రైతు"})]
+
+    assert reloaded == ["pm_kisan", "pm_awas", "ayushman"], reloaded
+    for size, uncached_time, cached_time, warm_time in timings:
+        print(f"📊 {size} పథకాలు: uncached {uncached_time / len(profiles) * 1e6:.1f}µs, "
+              f"cached {cached_time / len(profiles) * 1e6:.1f}µs "
+              f"({uncached_time / cached_time:.1f}x), hit {warm_time / len(profiles) * 1e6:.1f}µs "
+              f"({uncached_time / warm_time:.1f}x) per check+recommend")
+    print(f"📈 check cache {stats}")
+    print(f"📈 recommend cache {recommender.cache.stats()}")
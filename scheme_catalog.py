@@ -0,0 +1,436 @@
+# scheme_catalog.py - EXTERNAL SCHEME CATALOG + SHARED BINARY SNAPSHOT
+#
+# Snapshot layout (native byte order, checked by the byte-order mark):
+#   header   magic "TGSC", format, byte-order mark, scheme count, SHA-256 of
+#            the source file it was compiled from
+#   float64  min_age[count]     (-inf = no limit)
+#   float64  max_income[count]  (+inf = no limit)
+#   uint32   offsets[count + 1] for each string column (id, name, occupation,
+#            benefits, extra), into
+#   bytes    UTF-8 string blob
+# "extra" holds any other scheme keys as JSON. Workers mmap the file read-only,
+# so every process on the host shares the same page-cache copy, and the numeric
+# columns feed EligibilityIndex directly.
+import array
+import csv
+import hashlib
+import json
+import mmap
+import numbers
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Mapping
+
+from scoring_rules import validate_rules
+
+MAGIC = b"TGSC"
+FORMAT_VERSION = 2
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct("=4sHHII32s")  # magic, format, reserved, byte-order mark, count, source digest
+NO_SOURCE = bytes(32)  # digest of a snapshot not compiled from a file
+SNAPSHOT_MODE = 0o644  # every worker user on the host maps the same file
+NUMERIC_FIELDS = ("min_age", "max_income")
+NO_LIMIT = {"min_age": float("-inf"), "max_income": float("inf")}
+STRING_FIELDS = ("id", "name", "occupation", "benefits")
+SNAPSHOT_SUFFIX = ".tgsc"
+
+
+def read_source(path):
+    """Scheme dicts from a .json (list, or {"schemes": [...]}) or .csv file"""
+    if path.lower().endswith(".csv"):
+        schemes = []
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                scheme = {}
+                for key, value in row.items():
+                    if value is None or value == "":
+                        continue
+                    if key in NUMERIC_FIELDS:
+                        value = float(value)
+                        value = int(value) if value.is_integer() else value
+                    elif key == "scoring":
+                        value = json.loads(value)  # rules as a JSON list in one cell
+                    scheme[key] = value
+                schemes.append(scheme)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        schemes = data["schemes"] if isinstance(data, dict) else data
+    return [validate_scheme(scheme, path) for scheme in schemes]
+
+
+def validate_scheme(scheme, source="catalog"):
+    if "id" not in scheme:
+        raise ValueError(f"{source}: scheme without an id: {scheme!r}")
+    scheme = dict(scheme)
+    scheme.setdefault("occupation", "any")
+    for field in NUMERIC_FIELDS:
+        value = scheme.get(field)
+        if value is not None and (not isinstance(value, numbers.Real) or isinstance(value, bool)
+                                  or value != value or value in (float("inf"), float("-inf"))):
+            raise ValueError(f"{source}: scheme {scheme['id']}: {field} must be a number")
+    if "scoring" in scheme:
+        validate_rules(scheme["scoring"], f"{source}: scheme {scheme['id']}")
+    return scheme
+
+
+def source_digest(path):
+    """SHA-256 of a catalog source; a snapshot is only used for the exact bytes it came from"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def write_snapshot(schemes, path, digest=NO_SOURCE):
+    """Compile schemes into a snapshot file (atomically replaced)"""
+    count = len(schemes)
+    numeric = {field: array.array("d", (float(s.get(field, NO_LIMIT[field])) for s in schemes))
+               for field in NUMERIC_FIELDS}
+
+    blob = bytearray()
+    offsets = []
+    for field in STRING_FIELDS + ("extra",):
+        column = array.array("I", [0] * (count + 1))
+        for i, scheme in enumerate(schemes):
+            if field == "extra":
+                extra = {k: v for k, v in scheme.items() if k not in NUMERIC_FIELDS + STRING_FIELDS}
+                value = json.dumps(extra, ensure_ascii=False) if extra else ""
+            else:
+                value = scheme.get(field)
+                # Missing strings are stored as a lone NUL so they stay missing
+                value = "\0" if value is None else str(value)
+            column[i] = len(blob)
+            blob += value.encode("utf-8")
+        column[count] = len(blob)
+        if len(blob) >= 2 ** 32:
+            raise ValueError("catalog too large for 32-bit string offsets")
+        offsets.append(column)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, BYTE_ORDER_MARK, count, digest))
+            for field in NUMERIC_FIELDS:
+                numeric[field].tofile(f)
+            for column in offsets:
+                column.tofile(f)
+            f.write(blob)
+        os.chmod(temp_path, SNAPSHOT_MODE)  # mkstemp creates it 0600
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path
+
+
+class SnapshotScheme(Mapping):
+    """Read-only dict-like view of one scheme inside a snapshot"""
+
+    __slots__ = ("snapshot", "position")
+
+    def __init__(self, snapshot, position):
+        self.snapshot = snapshot
+        self.position = position
+
+    def __getitem__(self, key):
+        return self.snapshot.field(self.position, key)
+
+    def get(self, key, default=None):
+        try:
+            return self.snapshot.field(self.position, key)
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __iter__(self):
+        return iter(self.snapshot.keys(self.position))
+
+    def __len__(self):
+        return len(self.snapshot.keys(self.position))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        # Pickle (e.g. to another process) as a plain dict
+        return dict, (dict(self),)
+
+
+class SchemeSnapshot:
+    """Sequence of SnapshotScheme over a memory-mapped snapshot file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.mm)
+
+        magic, version, _, mark, count, self.source_digest = HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path}: not a scheme snapshot (format {FORMAT_VERSION})")
+        if mark != BYTE_ORDER_MARK:
+            raise ValueError(f"{path}: snapshot written with a different byte order")
+        self.count = count
+
+        position = HEADER.size
+        self.numeric = {}
+        for field in NUMERIC_FIELDS:
+            self.numeric[field] = view[position:position + 8 * count].cast("d")
+            position += 8 * count
+        self.offsets = {}
+        for field in STRING_FIELDS + ("extra",):
+            self.offsets[field] = view[position:position + 4 * (count + 1)].cast("I")
+            position += 4 * (count + 1)
+        self.blob = view[position:]
+        self.extras = {}  # position -> decoded extra keys, filled on first access
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [SnapshotScheme(self, i) for i in range(*position.indices(self.count))]
+        if position < 0:
+            position += self.count
+        if not 0 <= position < self.count:
+            raise IndexError("scheme index out of range")
+        return SnapshotScheme(self, position)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield SnapshotScheme(self, i)
+
+    def columns(self):
+        """(min_age, max_income, occupation) columns for EligibilityIndex"""
+        offsets = self.offsets["occupation"]
+        blob = self.blob
+        decoded = {}  # a few distinct occupations, one str object each
+        occupations = []
+        for i in range(self.count):
+            raw = bytes(blob[offsets[i]:offsets[i + 1]])
+            occupation = decoded.get(raw)
+            if occupation is None:
+                occupation = decoded[raw] = raw.decode("utf-8")
+            occupations.append(occupation)
+        return self.numeric["min_age"], self.numeric["max_income"], occupations
+
+    def string(self, field, position):
+        offsets = self.offsets[field]
+        return bytes(self.blob[offsets[position]:offsets[position + 1]]).decode("utf-8")
+
+    def extra(self, position):
+        extra = self.extras.get(position)
+        if extra is None:
+            raw = self.string("extra", position)
+            extra = self.extras[position] = json.loads(raw) if raw else {}
+        return extra
+
+    def field(self, position, key):
+        if key in self.numeric:
+            value = self.numeric[key][position]
+            if value == NO_LIMIT[key]:
+                raise KeyError(key)
+            return int(value) if value.is_integer() else value
+        if key in self.offsets and key != "extra":
+            value = self.string(key, position)
+            if value == "\0":
+                raise KeyError(key)
+            return value
+        return self.extra(position)[key]
+
+    def keys(self, position):
+        keys = [k for k in STRING_FIELDS if self.string(k, position) != "\0"]
+        keys += [k for k in NUMERIC_FIELDS if self.numeric[k][position] != NO_LIMIT[k]]
+        return keys + list(self.extra(position))
+
+
+def snapshot_path_for(source_path):
+    return source_path + SNAPSHOT_SUFFIX
+
+
+def load_catalog(path):
+    """Open a catalog file as a shared snapshot
+
+    A .json/.csv source is compiled to <path>.tgsc first unless the snapshot
+    was compiled from exactly these bytes (mtimes are not trusted: cp -p,
+    rsync and tar restore old ones). If the snapshot cannot be written
+    (read-only directory), the source is used as plain dicts.
+    """
+    if path.endswith(SNAPSHOT_SUFFIX):
+        return SchemeSnapshot(path)
+
+    snapshot_path = snapshot_path_for(path)
+    digest = source_digest(path)
+    try:
+        snapshot = SchemeSnapshot(snapshot_path)
+        if snapshot.source_digest == digest:
+            return snapshot
+    except (FileNotFoundError, ValueError):
+        pass  # missing or old format: recompile
+
+    schemes = read_source(path)
+    try:
+        write_snapshot(schemes, snapshot_path, digest)
+    except OSError as e:
+        print(f"⚠️ స్నాప్‌షాట్ రాయలేకపోయాను ({e}), JSON నుండే లోడ్ చేస్తున్నాను")
+        return schemes
+    return SchemeSnapshot(snapshot_path)
+
+
+class CatalogWatcher:
+    """Polls a catalog file and hot-reloads Tool 1 when it changes"""
+
+    def __init__(self, checker, path, interval=2.0):
+        self.checker = checker
+        self.path = path
+        self.interval = interval
+        self.stamp = self.file_stamp()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def poll(self):
+        """Reload if the file changed; returns True when a new catalog went live"""
+        stamp = self.file_stamp()
+        if stamp is None or stamp == self.stamp:
+            return False
+        try:
+            schemes = load_catalog(self.path)
+        except (OSError, ValueError) as e:
+            # Keep serving the old catalog; a half-written file gets retried
+            print(f"❌ కేటలాగ్ రీలోడ్ విఫలమైంది: {e}")
+            return False
+        self.stamp = stamp
+        self.checker.reload_schemes(schemes)
+        print(f"🔄 కేటలాగ్ రీలోడ్ అయింది: {len(schemes)} పథకాలు")
+        return True
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+
+def _rss_worker(args):
+    """Spawned worker: load a catalog + index, report time and memory"""
+    import contextlib
+    import time
+    from tools import Tool1_EligibilityChecker
+
+    path, as_dicts = args
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        if as_dicts:
+            checker = Tool1_EligibilityChecker()
+            checker.reload_schemes(read_source(path))
+        else:
+            checker = Tool1_EligibilityChecker(catalog_path=path)
+        startup = time.perf_counter() - start
+        checker.check({"age": 40, "income": 100000, "occupation": "రైతు"})
+
+    memory = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty", "Shared_Clean"):
+                    memory[key] = int(value.split()[0]) // 1024  # MB
+    except OSError:
+        import resource
+        memory["Rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+    return startup, memory
+
+
+# Benchmark: JSON vs snapshot startup and per-worker memory for large catalogs
+if __name__ == "__main__":
+    import contextlib
+    import multiprocessing
+    import shutil
+    import time
+    from eligibility_index import generate_catalog
+    from tools import Tool1_EligibilityChecker
+
+    directory = tempfile.mkdtemp()
+    try:
+        # Round trip: JSON and CSV sources give the same schemes as the snapshot
+        sample = generate_catalog(500)
+        sample[0]["documents"] = ["ఆధార్", "రేషన్ కార్డు"]
+        json_path = os.path.join(directory, "sample.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(sample, f, ensure_ascii=False)
+        csv_path = os.path.join(directory, "sample.csv")
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["id", "name", "min_age", "max_income",
+                                                   "occupation", "benefits"])
+            writer.writeheader()
+            writer.writerows({k: v for k, v in s.items() if k != "documents"} for s in sample)
+        from_json = load_catalog(json_path)
+        from_csv = load_catalog(csv_path)
+        assert [dict(s) for s in from_json] == sample, "JSON snapshot round trip"
+        assert [dict(s) for s in from_csv] == [dict(s) for s in read_source(csv_path)], "CSV round trip"
+
+        # Hot reload while a conversation holds schemes from the old snapshot
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            checker = Tool1_EligibilityChecker(catalog_path=json_path)
+            watcher = CatalogWatcher(checker, json_path)
+            in_flight = checker.check({"age": 40, "income": 100000, "occupation": "రైతు"})
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(sample[:10], f, ensure_ascii=False)
+            assert watcher.poll()
+        assert len(checker.schemes) == 10
+        assert all(s["name"] for s in in_flight), "old snapshot must stay readable"
+        print(f"🔄 hot reload: 500 -> {len(checker.schemes)} పథకాలు, "
+              f"{len(in_flight)} in-flight schemes still readable")
+
+        # A source restored with an old mtime (cp -p, rsync, tar) is still recompiled
+        snapshot_mtime = os.stat(snapshot_path_for(json_path)).st_mtime_ns
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(sample[:20], f, ensure_ascii=False)
+        os.utime(json_path, ns=(snapshot_mtime - 10 ** 9,) * 2)
+        assert len(load_catalog(json_path)) == 20, "stale snapshot served"
+        mode = os.stat(snapshot_path_for(json_path)).st_mode & 0o777
+        assert mode == SNAPSHOT_MODE, oct(mode)
+        print(f"✅ older source mtime -> recompiled, snapshot mode {oct(mode)}")
+
+        size = 200000
+        big = os.path.join(directory, "big.json")
+        with open(big, "w", encoding="utf-8") as f:
+            json.dump(generate_catalog(size), f, ensure_ascii=False)
+        start = time.perf_counter()
+        write_snapshot(read_source(big), snapshot_path_for(big), source_digest(big))
+        compile_time = time.perf_counter() - start
+        print(f"📦 {size} పథకాలు: JSON {os.path.getsize(big) / 2 ** 20:.1f}MB, "
+              f"snapshot {os.path.getsize(snapshot_path_for(big)) / 2 ** 20:.1f}MB, "
+              f"compile {compile_time:.2f}s")
+
+        context = multiprocessing.get_context("spawn")
+        for label, as_dicts in [("JSON dicts", True), ("mmap snapshot", False)]:
+            # Fresh processes per mode, so one mode's heap does not count for the other
+            with context.Pool(4) as pool:
+                results = pool.map(_rss_worker, [(big, as_dicts)] * 4)
+                startup = sum(r[0] for r in results) / len(results)
+                memory = results[-1][1]
+                print(f"📊 {label}: startup {startup:.2f}s per worker, "
+                      + ", ".join(f"{k} {v}MB" for k, v in memory.items()))
+    finally:
+        shutil.rmtree(directory)
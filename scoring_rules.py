@@ -0,0 +1,211 @@
+# scoring_rules.py - RECOMMENDATION SCORING RULES DECLARED AS DATA
+#
+# A scheme may carry its own rules:
+#   "scoring": [{"name": "farmer", "field": "occupation", "op": "eq",
+#                "value": "రైతు", "points": 10}, ...]
+# Schemes without "scoring" get DEFAULT_SCORING. CompiledScoring turns the
+# rules of a scheme list into features (one distinct field/op/value test
+# each) plus the points each scheme gets per feature: a profile is tested
+# once per feature, then the points of the features it satisfies are summed.
+import heapq
+import itertools
+import numbers
+import operator
+
+OPS = {"eq": operator.eq, "ne": operator.ne, "lt": operator.lt,
+       "le": operator.le, "gt": operator.gt, "ge": operator.ge}
+# Profile fields rules may test, with the value used when the profile lacks it
+FIELDS = {"age": 0, "income": 0, "occupation": None}
+NUMERIC_RULE_FIELDS = ("age", "income")
+
+DEFAULT_SCORING = [
+    {"name": "low_income", "field": "income", "op": "lt", "value": 50000, "points": 5},
+]
+
+
+def validate_rules(rules, source="catalog"):
+    """Raise ValueError unless rules is a list of well-formed rule dicts"""
+    if not isinstance(rules, list):
+        raise ValueError(f"{source}: scoring must be a list of rules")
+    for rule in rules:
+        if not isinstance(rule, dict) or not isinstance(rule.get("name"), str):
+            raise ValueError(f"{source}: scoring rule without a name: {rule!r}")
+        field, op, points = rule.get("field"), rule.get("op"), rule.get("points")
+        if field not in FIELDS:
+            raise ValueError(f"{source}: rule {rule['name']}: unknown field {field!r}")
+        if op not in OPS or field not in NUMERIC_RULE_FIELDS and op not in ("eq", "ne"):
+            raise ValueError(f"{source}: rule {rule['name']}: op {op!r} does not apply to {field}")
+        if not isinstance(points, numbers.Integral) or isinstance(points, bool):
+            raise ValueError(f"{source}: rule {rule['name']}: points must be a whole number")
+        value = rule.get("value")
+        if field in NUMERIC_RULE_FIELDS and (not isinstance(value, numbers.Real) or isinstance(value, bool)):
+            raise ValueError(f"{source}: rule {rule['name']}: value must be a number")
+        if field not in NUMERIC_RULE_FIELDS and not isinstance(value, str):
+            raise ValueError(f"{source}: rule {rule['name']}: value must be a string")
+    return rules
+
+
+class CompiledScoring:
+    """The scoring rules of one scheme list as features and weights
+
+    Schemes sharing one rules list (DEFAULT_SCORING, or a catalog's own list)
+    form a group: the list is compiled once and every member scores the same.
+    """
+
+    def __init__(self, schemes, default_rules=DEFAULT_SCORING):
+        self.size = len(schemes)
+        self.features = []  # (field, op, value), one per distinct test
+        self.tests = []  # (feature, field, default, op function, value)
+        self.groups = []  # (((feature, rule name, points), ...), [scheme positions])
+        self.rules = []  # per scheme: its group's rule entries
+        self.feature_ids = {}
+        group_ids = {}  # id(rules list) -> group
+        compiled_lists = []  # keeps every rules list alive, so ids stay unique
+        for position, scheme in enumerate(schemes):
+            rules = scheme.get("scoring")
+            if rules is None:
+                rules = default_rules
+            group = group_ids.get(id(rules))
+            if group is None:
+                group = group_ids[id(rules)] = len(self.groups)
+                self.groups.append((self.compile_rules(rules), []))
+                compiled_lists.append(rules)
+            entries, positions = self.groups[group]
+            positions.append(position)
+            self.rules.append(entries)
+
+    def compile_rules(self, rules):
+        entries = []
+        for rule in rules:
+            key = (rule["field"], rule["op"], rule["value"])
+            feature = self.feature_ids.get(key)
+            if feature is None:
+                feature = self.feature_ids[key] = len(self.features)
+                self.features.append(key)
+                self.tests.append((feature, rule["field"], FIELDS[rule["field"]],
+                                   OPS[rule["op"]], rule["value"]))
+            entries.append((feature, rule["name"], rule["points"]))
+        return tuple(entries)
+
+    def active(self, profile):
+        """Features the profile satisfies - everything scoring depends on"""
+        get = profile.get
+        return tuple([feature for feature, field, default, test, value in self.tests
+                      if test(get(field, default), value)])
+
+    def top_k(self, active, k=3):
+        """[(position, score)] best first; equal scores keep list order (stable, like sort)"""
+        by_score = {}
+        for entries, positions in self.groups:
+            score = sum([points for feature, name, points in entries if feature in active])
+            by_score.setdefault(score, []).append(positions)
+
+        best = []
+        for score in sorted(by_score, reverse=True):
+            position_lists = by_score[score]
+            merged = position_lists[0] if len(position_lists) == 1 else heapq.merge(*position_lists)
+            best.extend((position, score) for position in itertools.islice(merged, k - len(best)))
+            if len(best) >= k:
+                break
+        return best
+
+    def breakdown(self, position, active):
+        """rule name -> points it contributed to one scheme's score"""
+        contributions = {}
+        for feature, name, points in self.rules[position]:
+            if feature in active:
+                contributions[name] = contributions.get(name, 0) + points
+        return contributions
+
+
+def _legacy_rank(eligible_schemes, user_profile):
+    """The hard-coded scoring Tool 2 used before rules were data (for comparison)"""
+    recommendations = []
+    for scheme in eligible_schemes:
+        score = 0
+        if scheme["id"] == "pm_kisan" and user_profile.get("occupation") == "రైతు":
+            score += 10
+        if user_profile.get("income", 0) < 50000:
+            score += 5
+        age = user_profile.get("age", 0)
+        if age > 60 and scheme["id"] == "pm_awas":
+            score += 3
+        recommendations.append({"scheme": scheme, "score": score})
+    recommendations.sort(key=lambda x: x["score"], reverse=True)
+    return recommendations[:3]
+
+
+# Test: same top 3 as the hard-coded scoring, then speed with big eligible lists
+if __name__ == "__main__":
+    import contextlib
+    import os
+    import random
+    import time
+    from eligibility_index import generate_catalog, generate_profiles
+    from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        checker = Tool1_EligibilityChecker()
+        recommender = Tool2_SchemeRecommender()
+        recommender.use_cache = False
+    builtin = list(checker.schemes)
+
+    # Synthetic catalogs carry copies of the real schemes (and their rules) at random places
+    rng = random.Random(9)
+    catalogs = [builtin]
+    for size in (10, 200, 3000):
+        catalog = generate_catalog(size, seed=size)
+        for scheme in builtin:
+            catalog.insert(rng.randrange(len(catalog) + 1), dict(scheme))
+        catalogs.append(catalog)
+
+    profiles = generate_profiles(3000, seed=4)
+    profiles += [{"occupation": "రైతు", "income": 20000, "age": 70}, {}, {"age": 61}, {"income": 49999}]
+    checked = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for catalog in catalogs:
+            for profile in profiles[:600] if len(catalog) > 100 else profiles:
+                eligible = [s for s in catalog if checker.is_eligible(s, profile)]
+                expected = _legacy_rank(eligible, profile)
+                got = recommender.recommend(eligible, profile)
+                assert [(r["scheme"]["id"], r["score"]) for r in got] == \
+                       [(r["scheme"]["id"], r["score"]) for r in expected], (profile, got, expected)
+                assert all(sum(r["breakdown"].values()) == r["score"] for r in got)
+                checked += 1
+    print(f"✅ {checked} (catalog, profile) జతలు: compiled rules == hard-coded scoring")
+
+    # Negative points and many rule lists: the heap/merge top 3 == a full stable sort
+    mixed = generate_catalog(500, seed=2)
+    for i, scheme in enumerate(mixed):
+        if i % 4:
+            scheme["scoring"] = [{"name": "senior", "field": "age", "op": "ge", "value": 40 + i % 30, "points": -(i % 7)},
+                                 {"name": "farmer", "field": "occupation", "op": "eq", "value": "రైతు", "points": i % 5}]
+    compiled = CompiledScoring(mixed)
+    for profile in profiles[:500]:
+        active = compiled.active(profile)
+        totals = [sum(compiled.breakdown(position, active).values()) for position in range(len(mixed))]
+        expected = sorted(range(len(mixed)), key=totals.__getitem__, reverse=True)[:3]
+        assert compiled.top_k(active) == [(position, totals[position]) for position in expected], profile
+    print("✅ negative points: top 3 == full stable sort")
+
+    farmer = {"occupation": "రైతు", "income": 20000, "age": 70}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        explained = recommender.recommend(builtin, farmer)
+    for rec in explained:
+        print(f"   {rec['scheme']['id']}: {rec['score']} = {rec['breakdown']}")
+
+    for size in (100, 1000, 5000):
+        eligible = generate_catalog(size, seed=1)
+        for scheme in rng.sample(eligible, size // 10):
+            scheme["scoring"] = [{"name": "farmer", "field": "occupation", "op": "eq", "value": "రైతు", "points": 10},
+                                 {"name": "senior", "field": "age", "op": "gt", "value": 60, "points": 3}]
+        compiled = CompiledScoring(eligible)
+        timings = {}
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for label, function in [("hard-coded + full sort", lambda: _legacy_rank(eligible, farmer)),
+                                    ("compiled + heap", lambda: compiled.top_k(compiled.active(farmer)))]:
+                start = time.perf_counter()
+                for _ in range(200):
+                    function()
+                timings[label] = (time.perf_counter() - start) / 200 * 1000
+        print(f"📊 {size} eligible: " + ", ".join(f"{k} {v:.3f}ms" for k, v in timings.items()))
@@ -1,4 +1,22 @@
 # self_evaluator.py
+from collections import deque
+
+from fact_extractor import extract_facts
+
+INFO_WORDS = ['వయస్సు', 'ఆదాయం', 'వృత్తి', 'age', 'income', 'occupation']
+TOOL_WORDS = ['అర్హత', 'సిఫార్సు', 'eligibility', 'recommend']
+
+
+def progress_score(info_collected, tool_used):
+    """Goal progress from the two flags"""
+    if info_collected and tool_used:
+        return 1.0  # 100% progress
+    elif info_collected:
+        return 0.5  # 50% progress
+    else:
+        return 0.1  # 10% progress
+
+
 class SelfEvaluator:
     """Evaluates own performance and recovers from failures"""
 
@@ -13,51 +31,56 @@ class SelfEvaluator:
             text = entry.get('user', '')
 
             # Check if info collected
-            if any(word in text for word in ['వయస్సు', 'ఆదాయం', 'వృత్తి', 'age', 'income', 'occupation']):
+            if any(word in text for word in INFO_WORDS):
                 info_collected = True
 
             # Check if agent mentioned tools
             agent_text = entry.get('agent', '')
-            if any(word in agent_text for word in ['అర్హత', 'సిఫార్సు', 'eligibility', 'recommend']):
+            if any(word in agent_text for word in TOOL_WORDS):
                 tool_used = True
 
-        if info_collected and tool_used:
-            return 1.0  # 100% progress
-        elif info_collected:
-            return 0.5  # 50% progress
-        else:
-            return 0.1  # 10% progress
+        return progress_score(info_collected, tool_used)
+
     def evaluate_conversation(self, conversation_history):
         """Evaluate if conversation is progressing toward goal"""
 
         # Check for stuck patterns
         if self.is_stuck(conversation_history):
-            return {
-                'issue': 'సంభాషణ స్తంభించింది',
-                'action': 'change_approach',
-                'new_approach': 'ప్రత్యక్ష ప్రశ్న అడగండి'
-            }
+            return self.stuck_verdict()
 
         # Check for contradictions
         contradictions = self.find_contradictions(conversation_history)
         if contradictions:
-            return {
-                'issue': 'విరోధాభాసాలు కనుగొనబడ్డాయి',
-                'action': 'clarify_contradictions',
-                'contradictions': contradictions
-            }
+            return self.contradiction_verdict(contradictions)
 
         # Check if goal is being achieved
         goal_progress = self.assess_goal_progress(conversation_history)
         if goal_progress < 0.3:
-            return {
-                'issue': 'లక్ష్యం దిశలో పురోగతి లేదు',
-                'action': 'reassess_goal',
-                'suggestion': 'లక్ష్యం మళ్లీ నిర్వచించండి'
-            }
+            return self.no_progress_verdict()
 
         return {'status': 'progressing_well'}
 
+    def stuck_verdict(self):
+        return {
+            'issue': 'సంభాషణ స్తంభించింది',
+            'action': 'change_approach',
+            'new_approach': 'ప్రత్యక్ష ప్రశ్న అడగండి'
+        }
+
+    def contradiction_verdict(self, contradictions):
+        return {
+            'issue': 'విరోధాభాసాలు కనుగొనబడ్డాయి',
+            'action': 'clarify_contradictions',
+            'contradictions': contradictions
+        }
+
+    def no_progress_verdict(self):
+        return {
+            'issue': 'లక్ష్యం దిశలో పురోగతి లేదు',
+            'action': 'reassess_goal',
+            'suggestion': 'లక్ష్యం మళ్లీ నిర్వచించండి'
+        }
+
     def is_stuck(self, history):
         """Check if conversation is stuck in loops"""
         if len(history) < 3:
@@ -74,19 +97,100 @@ class SelfEvaluator:
         income_mentions = []
 
         for entry in history:
-            text = entry.get('user', '')
-            # Extract ages
-            import re
-            ages = re.findall(r'(\d+)\s*(సంవత్సరాలు|వయస్సు)', text)
-            if ages:
-                age_mentions.append(int(ages[0][0]))
-
-            # Extract income
-            incomes = re.findall(r'(\d+)\s*(లక్ష|వేలు|ఆదాయం)', text)
-            if incomes:
-                income_mentions.append(incomes[0][0])
+            facts = extract_facts(entry.get('user', ''))
+            if 'age' in facts:
+                age_mentions.append(facts['age'])
+            if 'income' in facts:
+                income_mentions.append(facts['income'])
 
         if len(set(age_mentions)) > 1:
             contradictions.append(f"వయస్సు: {set(age_mentions)}")
 
-        return contradictions
\ No newline at end of file
+        return contradictions
+
+
+class IncrementalEvaluator(SelfEvaluator):
+    """Same verdicts as evaluate_conversation, but updated once per new turn"""
+
+    def __init__(self, stuck_window=3):
+        self.stuck_window = stuck_window
+        self.recent_agent = deque(maxlen=stuck_window)  # hashes of last agent turns
+        self.repeat_run = 0  # how many of the latest agent turns are identical
+        self.last_agent = None
+        self.ages_seen = {}  # distinct ages, first-seen order
+        self.incomes_seen = {}
+        self.info_collected = False
+        self.tool_used = False
+
+    def observe(self, entry):
+        """Fold one history entry into the running state - O(1)"""
+        agent_text = entry.get('agent', '')
+        agent_hash = hash(agent_text)
+        if self.recent_agent and self.recent_agent[-1] == agent_hash and self.last_agent == agent_text:
+            self.repeat_run += 1
+        else:
+            self.repeat_run = 1
+        self.recent_agent.append(agent_hash)
+        self.last_agent = agent_text
+
+        text = entry.get('user', '')
+        facts = extract_facts(text)
+        if 'age' in facts:
+            self.ages_seen.setdefault(facts['age'])
+        if 'income' in facts:
+            self.incomes_seen.setdefault(facts['income'])
+
+        if not self.info_collected and any(word in text for word in INFO_WORDS):
+            self.info_collected = True
+        if not self.tool_used and any(word in agent_text for word in TOOL_WORDS):
+            self.tool_used = True
+
+    def evaluate(self):
+        """Verdict for everything observed so far"""
+        if self.repeat_run >= self.stuck_window:
+            return self.stuck_verdict()
+
+        if len(self.ages_seen) > 1:
+            # set() of the distinct ages in first-seen order prints like the full rescan
+            return self.contradiction_verdict([f"వయస్సు: {set(self.ages_seen)}"])
+
+        if progress_score(self.info_collected, self.tool_used) < 0.3:
+            return self.no_progress_verdict()
+
+        return {'status': 'progressing_well'}
+
+    def evaluate_turn(self, entry):
+        """observe() + evaluate() for the usual one-turn-at-a-time use"""
+        self.observe(entry)
+        return self.evaluate()
+
+
+# Test: incremental verdicts match full rescans, and cost per turn
+if __name__ == "__main__":
+    import random
+    import time
+
+    rng = random.Random(3)
+    users = ["నేను రైతుని", "నా వయస్సు 30 సంవత్సరాలు", "నా వయస్సు 45 సంవత్సరాలు",
+             "నా ఆదాయం 2 లక్షలు", "సరే", "ఏమిటి?"]
+    agents = ["మీ వయస్సు ఎంత?", "మీ వార్షిక ఆదాయం ఎంత?", "మీకు 3 పథకాలు అర్హత ఉన్నాయి", "సరే"]
+
+    full = SelfEvaluator()
+    for conversation in range(200):
+        incremental = IncrementalEvaluator()
+        history = []
+        for turn in range(rng.randint(1, 30)):
+            entry = {'user': rng.choice(users), 'agent': rng.choice(agents)}
+            history.append(entry)
+            assert incremental.evaluate_turn(entry) == full.evaluate_conversation(history)
+    print("✅ 200 సంభాషణలు: incremental == full rescan")
+
+    history = [{'user': rng.choice(users), 'agent': rng.choice(agents)} for _ in range(2000)]
+    for name, evaluator in [("full rescan", full), ("incremental", IncrementalEvaluator())]:
+        start = time.perf_counter()
+        for n in range(1, len(history) + 1):
+            if evaluator is full:
+                full.evaluate_conversation(history[:n])
+            else:
+                evaluator.evaluate_turn(history[n - 1])
+        print(f"📊 {name}: 2000 turns in {(time.perf_counter() - start) * 1000:.1f}ms")
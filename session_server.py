@@ -0,0 +1,323 @@
+# session_server.py - MULTI-SESSION ASYNC SERVER
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import time
+
+from agent import TeluguGovernmentAgent, is_exit, shared_tools
+from latency_stats import percentile
+from memory import ConversationMemory
+
+
+class Session:
+    """One caller's conversation (own agent state and memory)"""
+
+    def __init__(self, session_id, agent):
+        self.session_id = session_id
+        self.agent = agent
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+        self.turns = 0
+        self.store_version = None  # store.data_version() when the agent was last known current
+
+
+class SessionServer:
+    """Runs many conversations in one process over asyncio"""
+
+    def __init__(self, idle_timeout=300, quiet=True, store=None, tool1=None, tool2=None):
+        # Shared, read-only parts: one copy for every session
+        self.tool1 = tool1 if tool1 is not None else shared_tools()[0]
+        self.tool2 = tool2 if tool2 is not None else shared_tools()[1]
+
+        self.store = store  # e.g. SQLiteMemoryStore: memory survives reconnects
+        self.sessions = {}
+        self.idle_timeout = idle_timeout
+        self.quiet = quiet
+        self._devnull = open(os.devnull, "w")
+        print("🌐 సెషన్ సర్వర్ సిద్ధంగా ఉంది")
+
+    def create_agent(self, session_id):
+        """Build a text-only agent that reuses the shared tools"""
+        memory = ConversationMemory(session_id=session_id, store=self.store)
+        return TeluguGovernmentAgent(tool1=self.tool1, tool2=self.tool2,
+                                     use_voice=False, memory=memory)
+
+    def _output(self):
+        """Silence per-turn prints when serving many callers"""
+        if self.quiet:
+            return contextlib.redirect_stdout(self._devnull)
+        return contextlib.nullcontext()
+
+    def new_session(self, session_id):
+        """Session whose agent is about to be loaded at the store's current version"""
+        session = Session(session_id, None)
+        if self.store is not None:
+            session.store_version = self.store.data_version()
+        return session
+
+    def open_session(self, session_id):
+        """Start a new conversation and return its greeting"""
+        session = self.new_session(session_id)
+        with self._output():
+            session.agent = self.create_agent(session_id)
+            greeting = session.agent.handle_start("")
+        self.sessions[session_id] = session
+        return greeting
+
+    def resume_agent(self, session_id):
+        """Agent for a session as the store has it
+
+        A caller who reconnected to another worker continues where they were;
+        anyone else starts a new conversation, and their line answers its
+        first question.
+        """
+        with self._output():
+            agent = self.create_agent(session_id)
+            if not agent.resume():
+                agent.handle_start("")
+        return agent
+
+    def resume_session(self, session_id):
+        """Session for an id this process does not hold"""
+        session = self.new_session(session_id)
+        session.agent = self.resume_agent(session_id)
+        self.sessions[session_id] = session
+        return session
+
+    def refresh(self, session):
+        """Reload the session's agent if another worker has moved it on since we last did
+
+        Only when some other connection has committed to the store since then
+        is the session's position read back.
+        """
+        if self.store is None:
+            return
+        version = self.store.data_version()
+        if version == session.store_version:
+            return
+        session.store_version = version
+        if self.store.load_position(session.session_id) != session.agent.memory.position:
+            session.agent = self.resume_agent(session.session_id)
+
+    def close_session(self, session_id):
+        """Drop a conversation"""
+        self.sessions.pop(session_id, None)
+
+    def close(self):
+        """Release what the server holds open (sessions, the quiet-mode devnull)"""
+        self.sessions.clear()
+        self._devnull.close()
+
+    async def handle_turn(self, session_id, user_input):
+        """Process one user turn; returns (response, state, done)"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.resume_session(session_id)
+
+        # Turns of one session run in order, sessions run independently
+        async with session.lock:
+            self.refresh(session)
+            session.last_active = time.monotonic()
+            session.turns += 1
+            agent = session.agent
+
+            if is_exit(user_input):
+                agent.state = "END"
+                agent.memory.save_position("END")  # a reconnect must not pick the call up again
+                self.close_session(session_id)
+                return agent.responses["thank_you"], "END", True
+
+            with self._output():
+                response = agent.process(user_input)
+
+            done = agent.state == "END"
+            if done:
+                self.close_session(session_id)
+            return response, agent.state, done
+
+    def reap_idle(self):
+        """Remove sessions idle for longer than idle_timeout"""
+        now = time.monotonic()
+        expired = [sid for sid, s in self.sessions.items()
+                   if now - s.last_active > self.idle_timeout and not s.lock.locked()]
+        for sid in expired:
+            self.close_session(sid)
+        return len(expired)
+
+    async def _reaper(self):
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, 30))
+            self.reap_idle()
+
+    async def _serve_client(self, reader, writer):
+        """Line-delimited JSON: {"session": id, "text": ...}"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    session_id = str(request["session"])
+                except (ValueError, KeyError, TypeError):
+                    writer.write(b'{"error": "bad request"}\n')
+                    await writer.drain()
+                    continue
+
+                text = request.get("text")
+                if text is None:
+                    response, state, done = self.open_session(session_id), "ASK_OCCUPATION", False
+                else:
+                    response, state, done = await self.handle_turn(session_id, text)
+
+                reply = {"session": session_id, "state": state, "response": response, "done": done}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, sock=None):
+        """Run the TCP server until cancelled (sock: an already listening socket)"""
+        if sock is not None:
+            server = await asyncio.start_server(self._serve_client, sock=sock)
+            host, port = sock.getsockname()[:2]
+        else:
+            server = await asyncio.start_server(self._serve_client, host, port)
+        reaper = asyncio.ensure_future(self._reaper())
+        print(f"🌐 {host}:{port} వద్ద వింటున్నాను")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reaper.cancel()
+
+
+# Scripted caller used by the load benchmark
+CALLER_SCRIPT = [
+    "నేను రైతుని",
+    "నా వయస్సు 35 సంవత్సరాలు",
+    "నా ఆదాయం 2 లక్షలు",
+    "సరే",
+    "సరే",
+]
+
+
+async def _simulate_caller(server, session_id, latencies):
+    server.open_session(session_id)
+    for text in CALLER_SCRIPT:
+        start = time.perf_counter()
+        _, _, done = await server.handle_turn(session_id, text)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0)  # let other callers interleave
+        if done:
+            break
+
+
+async def _simulate_tcp_caller(host, port, session_id, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for text in [None] + CALLER_SCRIPT:
+            start = time.perf_counter()
+            request = {"session": session_id, "text": text}
+            writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            if text is not None:
+                latencies.append(time.perf_counter() - start)
+            if reply.get("done"):
+                break
+    finally:
+        writer.close()
+
+
+async def run_load_benchmark(num_sessions=2000, use_tcp=False, port=8766):
+    """Run num_sessions concurrent callers; report turns/sec and p50/p99"""
+    server = SessionServer()
+    latencies = []
+
+    serve_task = None
+    if use_tcp:
+        serve_task = asyncio.ensure_future(server.serve(port=port))
+        await asyncio.sleep(0.2)
+        callers = [_simulate_tcp_caller("127.0.0.1", port, f"caller-{i}", latencies)
+                   for i in range(num_sessions)]
+    else:
+        callers = [_simulate_caller(server, f"caller-{i}", latencies)
+                   for i in range(num_sessions)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*callers)
+    elapsed = time.perf_counter() - start
+
+    if serve_task:
+        serve_task.cancel()
+        await asyncio.gather(serve_task, return_exceptions=True)
+    server.close()
+
+    result = {
+        "sessions": num_sessions,
+        "turns": len(latencies),
+        "seconds": round(elapsed, 3),
+        "turns_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+    print(f"📈 {result}")
+    return result
+
+
+# Benchmark / server entry point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Telugu agent session server")
+    parser.add_argument("--serve", action="store_true", help="run the TCP server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=2000, help="benchmark callers")
+    parser.add_argument("--tcp", action="store_true", help="benchmark over TCP")
+    args = parser.parse_args()
+
+    if args.serve:
+        server = SessionServer()
+        try:
+            asyncio.run(server.serve(port=args.port))
+        finally:
+            server.close()
+    else:
+        # Two workers sharing one store: a caller whose next line reaches the other
+        # worker carries on there (and back again) instead of starting over
+        import tempfile
+        from memory_store import SQLiteMemoryStore
+
+        async def reconnect_check(stores):
+            first, second = SessionServer(store=stores[0]), SessionServer(store=stores[1])
+            first.open_session("roaming")
+            await first.handle_turn("roaming", CALLER_SCRIPT[0])
+            _, state, _ = await second.handle_turn("roaming", CALLER_SCRIPT[1])
+            assert state == "ASK_INCOME", state
+            _, state, _ = await first.handle_turn("roaming", CALLER_SCRIPT[2])
+            assert state == "CHECK_ELIGIBILITY", state
+            _, state, _ = await second.handle_turn("roaming", CALLER_SCRIPT[3])
+            assert state == "RECOMMEND", state
+            assert second.sessions["roaming"].agent.memory.user_facts == \
+                {"occupation": "రైతు", "age": 35, "income": 200000}
+            _, state, done = await first.handle_turn("roaming", CALLER_SCRIPT[4])
+            assert (state, done) == ("END", True), state
+            _, state, _ = await second.handle_turn("stranger", CALLER_SCRIPT[0])
+            assert state == "ASK_AGE", state  # a new caller's first line is answered, not dropped
+            _, state, done = await second.handle_turn("stranger", "బై")
+            assert (state, done) == ("END", True), state
+            _, state, done = await first.handle_turn("stranger", CALLER_SCRIPT[1])
+            assert (state, done) == ("END", True), state  # hung up: not resumed on reconnect
+            first.close()
+            second.close()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # One connection per worker, committing every write (as prefork does)
+            stores = [SQLiteMemoryStore(os.path.join(tmp, "sessions.db"), commit_every=1)
+                      for _ in range(2)]
+            asyncio.run(reconnect_check(stores))
+            for store in stores:
+                store.close()
+        print("✅ a session resumes on whichever worker its next line reaches")
+        asyncio.run(run_load_benchmark(args.sessions, use_tcp=args.tcp, port=args.port))
@@ -1,83 +1,215 @@
 # speech.py - WORKING VERSION WITH GOOGLE TTS
-import speech_recognition as sr
-import requests
-import io
-import pygame
-import tempfile
-import os
+import contextvars
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+from audio_cache import AudioCache
+from playback import PlaybackEngine, PygameSink
+from prefetch import PrefetchScheduler
+from speech_backends import GoogleBackend
+from streaming_asr import ChunkedRecognizer, MicrophoneFrames, StreamingListener
+
+
+# Sentence ends: . ! ? । and line breaks (keep the mark; "1." list numbers stay attached)
+SENTENCE_END = re.compile(r'(?<=[.!?।])(?<!\d\.)\s+|\n+')
+MAX_CHUNK_CHARS = 180  # translate_tts rejects long queries
+
+
+def split_sentences(text, max_chars=MAX_CHUNK_CHARS):
+    """Split text into sentence-sized chunks for pipelined TTS"""
+    chunks = []
+    for sentence in SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            # Break long sentences at the last comma or space
+            cut = max(sentence.rfind(",", 0, max_chars), sentence.rfind(" ", 0, max_chars))
+            if cut <= 0:
+                cut = max_chars
+            chunks.append(sentence[:cut + 1].strip())
+            sentence = sentence[cut + 1:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+class _PlaybackDone:
+    """Stop condition for the barge-in watcher: synthesis done and queue drained"""
+
+    def __init__(self, job, player):
+        self.job = job
+        self.player = player
+
+    def is_set(self):
+        return self.job.done() and self.player.idle.is_set()
 
 
 class TeluguVoice:
-    def __init__(self):
-        """Initialize Telugu voice system with Google TTS"""
-        self.recognizer = sr.Recognizer()
-        self.use_google_tts = True
-        print("🔊 తెలుగు వాయిస్ సిస్టమ్ (గూగుల్ TTS) సిద్ధంగా ఉంది")
-
-    def speak(self, text):
-        """Speak Telugu text using Google TTS"""
+    def __init__(self, backend=None, voice="te", cache=None, play_audio=True,
+                 listener=None, streaming=False, barge_in=True, player=None,
+                 prefetch_budget=2 * 1024 * 1024):
+        """Initialize Telugu voice system (Google backend by default)
+
+        streaming=True listens through a StreamingListener on the microphone
+        (or pass listener=); with barge_in the caller can talk over a prompt.
+        """
+        self.backend = backend if backend is not None else GoogleBackend()
+        self.use_google_tts = isinstance(self.backend, GoogleBackend)
+        self.voice = voice
+        self.cache = cache if cache is not None else AudioCache()
+        self.play_audio = play_audio
+        self.synth_pool = ThreadPoolExecutor(max_workers=1)
+
+        if listener is None and streaming:
+            listener = StreamingListener(MicrophoneFrames(), ChunkedRecognizer(self.backend.recognize_pcm))
+        self.listener = listener
+        self.barge_in = barge_in and listener is not None
+        self.interrupted = threading.Event()  # set when the caller barges in
+        self.watcher = None
+        self.player = player  # PlaybackEngine; a pygame one is started on first use
+        self.speaking = None  # future of the last speak()
+        self.on_partial = None  # called with partial transcripts while the caller talks
+        # Predicted next prompts, synthesized while the caller talks (0 disables)
+        self.prefetcher = PrefetchScheduler(self.fetch_audio, prefetch_budget) if prefetch_budget else None
+        print(f"🔊 తెలుగు వాయిస్ సిస్టమ్ ({self.backend.name}) సిద్ధంగా ఉంది")
+
+    def synthesize(self, text):
+        """Return audio bytes for one chunk (prefetched, cache, then the backend)"""
+        with tracing.span("tts") as span:
+            if self.prefetcher is not None:
+                audio = self.prefetcher.take(text)
+                if audio is not None:
+                    span.set(source="prefetch")
+                    return audio
+            return self.fetch_audio(text)
+
+    def fetch_audio(self, text):
+        """Audio for one chunk from the cache, else the backend"""
+        with tracing.span("tts_fetch") as span:
+            audio = self.cache.get(text, self.voice)
+            if audio is not None:
+                span.set(source="cache")
+                return audio
+
+            span.set(source=self.backend.name)
+            audio = self.backend.synthesize(text, self.voice)
+            if audio is not None:
+                self.cache.put(text, self.voice, audio)
+            return audio
+
+    def prefetch(self, texts):
+        """Synthesize likely next responses in the background"""
+        if self.prefetcher is not None:
+            self.prefetcher.prefetch([chunk for text in texts for chunk in split_sentences(text)])
+
+    def get_player(self):
+        """Playback engine, started on first use"""
+        if self.player is None:
+            self.player = PlaybackEngine(PygameSink())
+        return self.player
+
+    def play(self, audio):
+        """Play audio bytes and wait until done"""
+        return self.get_player().play(audio)
+
+    def speak(self, text, wait=True):
+        """Speak Telugu text; chunks are synthesized ahead while earlier ones play
+
+        wait=False returns as soon as the job is queued, so the dialogue loop
+        keeps working while audio plays; wait_until_spoken() blocks later.
+        """
         print(f"\n🤖 అసిస్టెంట్: {text}")
 
+        self.interrupted.clear()
+        chunks = split_sentences(text)
+        if not chunks:
+            return
         try:
-            # Use Google Translate TTS API
-            tts_url = f"https://translate.google.com/translate_tts"
-
-            params = {
-                'ie': 'UTF-8',
-                'tl': 'te',  # Telugu language
-                'client': 'tw-ob',
-                'q': text
-            }
-
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-
-            response = requests.get(tts_url, params=params, headers=headers)
-
-            if response.status_code == 200:
-                # Save to temp file
-                with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
-                    temp_path = f.name
-                    f.write(response.content)
-
-                # Play with pygame
-                pygame.mixer.init()
-                pygame.mixer.music.load(temp_path)
-                pygame.mixer.music.play()
-
-                # Wait for playback to finish
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)
-
-                # Cleanup
-                pygame.mixer.quit()
-                os.unlink(temp_path)
-            else:
-                print("⚠️ TTS failed, showing text only")
-
+            player = self.get_player() if self.play_audio else None
         except Exception as e:
             print(f"❌ TTS error: {e}")
             print(f"[Voice would say: {text}]")
+            player = None
+
+        # The copied context carries the trace session to the synthesis thread
+        self.speaking = self.synth_pool.submit(contextvars.copy_context().run,
+                                               self._synthesize_and_queue, text, chunks, player)
+        if self.barge_in and player is not None:
+            self._watch_for_barge_in(_PlaybackDone(self.speaking, player))
+        if wait:
+            self.wait_until_spoken()
+
+    def _synthesize_and_queue(self, text, chunks, player):
+        items = []
+        try:
+            for chunk in chunks:
+                if self.interrupted.is_set():
+                    break
+                audio = self.synthesize(chunk)
+                if audio is None:
+                    print("⚠️ TTS failed, showing text only")
+                    continue
+                if player is not None:
+                    items.append(player.enqueue(audio, label=chunk))
+        except Exception as e:
+            print(f"❌ TTS error: {e}")
+            print(f"[Voice would say: {text}]")
+        return items
+
+    def wait_until_spoken(self):
+        """Block until the last speak() has played (or was interrupted)"""
+        if self.speaking is None:
+            return
+        for item in self.speaking.result():
+            item.wait()
+        if self.watcher is not None:
+            self.watcher.join()
+
+    def _watch_for_barge_in(self, done):
+        if self.watcher is not None and self.watcher.is_alive():
+            return  # already watching the earlier prompt, which is still queued
+
+        def watch():
+            if self.listener.wait_for_speech(done):
+                self.interrupted.set()
+                self.player.cancel_all()
+                print("✋ మీరు మాట్లాడుతున్నారు, ఆపుతున్నాను")
+
+        self.watcher = threading.Thread(target=watch, daemon=True)
+        self.watcher.start()
 
     def listen(self):
-        """Listen to Telugu speech"""
+        """Listen to Telugu speech (None once the listener's audio stream has ended)"""
         try:
-            with sr.Microphone() as source:
-                print("🎤 వినడం... 5 సెకన్లలో మాట్లాడండి")
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
-
-            text = self.recognizer.recognize_google(audio, language="te-IN")
+            if self.listener is not None:
+                # Blocks behind the barge-in watcher until the prompt ends or is interrupted
+                self.listener.on_partial = self.on_partial
+                with tracing.span("listen"):
+                    text = self.listener.listen()
+                if text is None:
+                    print("🔇 ఆడియో ముగిసింది")
+                    return None
+            else:
+                self.wait_until_spoken()  # do not record our own prompt
+                with tracing.span("listen"):
+                    text = self.backend.listen()
             print(f"👤 మీరు చెప్పారు: {text}")
             return text
 
-        except sr.WaitTimeoutError:
+        except Exception as e:
+            if not _is_wait_timeout(e):
+                print(f"❌ దోషం: {e}")
+                return ""
             print("⏰ మాట్లాడలేదు. టెక్స్ట్‌లో టైప్ చేయండి:")
             return input("టెక్స్ట్: ")
-        except Exception as e:
-            print(f"❌ దోషం: {e}")
-            return ""
+
+
+def _is_wait_timeout(error):
+    """speech_recognition's listen timeout (it is only imported by voice backends)"""
+    sr = sys.modules.get("speech_recognition")
+    return sr is not None and isinstance(error, sr.WaitTimeoutError)
 
 
 # Install required library first
@@ -0,0 +1,168 @@
+# speech_backends.py - PLUGGABLE ASR/TTS BACKENDS
+import hashlib
+import io
+import os
+import wave
+
+import tracing
+
+GOOGLE_TTS_URL = "https://translate.google.com/translate_tts"
+
+
+class SpeechBackend:
+    """Interface used by TeluguVoice.listen/speak"""
+
+    name = "base"
+
+    def listen(self):
+        """Capture one user turn and return its text"""
+        raise NotImplementedError
+
+    def synthesize(self, text, voice):
+        """Return audio bytes for text, or None on failure"""
+        raise NotImplementedError
+
+    def recognize_pcm(self, pcm, sample_rate, sample_width):
+        """Text of one clip of raw PCM (used by streaming_asr.ChunkedRecognizer)"""
+        raise NotImplementedError
+
+
+def shared_http_client():
+    """http_pool's client; requests is imported on first use"""
+    from http_pool import get_shared_client
+
+    return get_shared_client()
+
+
+def pcm_to_wav(pcm, sample_rate, sample_width):
+    """Wrap mono PCM in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class GoogleBackend(SpeechBackend):
+    """Microphone + recognize_google, translate_tts for speech"""
+
+    name = "google"
+
+    def __init__(self, tts_url=GOOGLE_TTS_URL, http=None):
+        import speech_recognition as sr  # only voice workers pay for it
+
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+        self.recognizer.dynamic_energy_threshold = True  # keeps following the noise
+        self.calibrated = False
+        self.tts_url = tts_url
+        self.http = http or shared_http_client()
+
+    def listen(self):
+        with self.sr.Microphone() as source:
+            print("🎤 వినడం... 5 సెకన్లలో మాట్లాడండి")
+            if not self.calibrated:
+                # Once per backend, not every turn
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                self.calibrated = True
+            audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
+
+        with tracing.span("asr"):
+            return self.recognizer.recognize_google(audio, language="te-IN")
+
+    def recognize_pcm(self, pcm, sample_rate, sample_width):
+        try:
+            return self.recognizer.recognize_google(
+                self.sr.AudioData(pcm, sample_rate, sample_width), language="te-IN")
+        except self.sr.UnknownValueError:
+            return ""
+
+    def synthesize(self, text, voice):
+        params = {
+            'ie': 'UTF-8',
+            'tl': voice,  # Telugu language
+            'client': 'tw-ob',
+            'q': text
+        }
+
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+
+        response = self.http.get(self.tts_url, params=params, headers=headers)
+        if response.status_code != 200:
+            return None
+        return response.content
+
+
+class LocalHTTPBackend(SpeechBackend):
+    """Talks to standin_server.StandInServer (no network needed)"""
+
+    name = "local_http"
+
+    def __init__(self, base_url, session="default", http=None):
+        self.base_url = base_url.rstrip("/")
+        self.session = session
+        self.http = http or shared_http_client()
+
+    def listen(self):
+        """Next scripted utterance from the stand-in"""
+        response = self.http.get(f"{self.base_url}/listen", params={"session": self.session})
+        response.raise_for_status()
+        return response.json()["text"]
+
+    def recognize(self, audio):
+        """Send recorded audio bytes, get the fixture transcript back"""
+        response = self.http.post(f"{self.base_url}/recognize", data=audio)
+        response.raise_for_status()
+        return response.json()["text"]
+
+    def recognize_pcm(self, pcm, sample_rate, sample_width):
+        return self.recognize(pcm_to_wav(pcm, sample_rate, sample_width))
+
+    def synthesize(self, text, voice):
+        response = self.http.get(f"{self.base_url}/translate_tts",
+                                params={"ie": "UTF-8", "tl": voice, "q": text})
+        if response.status_code != 200:
+            return None
+        return response.content
+
+
+class FileBackend(SpeechBackend):
+    """Reads user turns from a text file, audio from a directory of recordings"""
+
+    name = "file"
+
+    def __init__(self, input_path, audio_dir=None, output_path=None):
+        with open(input_path, encoding="utf-8") as f:
+            self.inputs = [line.strip() for line in f if line.strip()]
+        self.position = 0
+        self.audio_dir = audio_dir
+        self.output_path = output_path
+
+    @staticmethod
+    def audio_name(text, voice):
+        """File name of the recording for (voice, text)"""
+        return hashlib.sha256(f"{voice}\0{text}".encode("utf-8")).hexdigest() + ".mp3"
+
+    def listen(self):
+        if self.position >= len(self.inputs):
+            return "ధన్యవాదాలు"  # script finished: end the conversation
+        text = self.inputs[self.position]
+        self.position += 1
+        return text
+
+    def synthesize(self, text, voice):
+        if self.output_path:
+            with open(self.output_path, "a", encoding="utf-8") as f:
+                f.write(text.replace("\n", " ") + "\n")
+
+        if not self.audio_dir:
+            return None
+        path = os.path.join(self.audio_dir, self.audio_name(text, voice))
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
@@ -0,0 +1,227 @@
+# standin_server.py - LOCAL STAND-IN FOR THE SPEECH (ASR/TTS) SERVICES
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Caller script replayed by /listen when no fixtures are given
+DEFAULT_SCRIPT = [
+    "నేను రైతుని",
+    "నా వయస్సు 35 సంవత్సరాలు",
+    "నా ఆదాయం 2 లక్షలు",
+    "సరే",
+    "సరే",
+    "ధన్యవాదాలు",
+]
+
+
+def fake_audio(text, voice="te"):
+    """Deterministic bytes standing in for an MP3 of `text`"""
+    digest = hashlib.sha256(f"{voice}\0{text}".encode("utf-8")).digest()
+    return b"ID3" + digest * (1 + len(text.encode("utf-8")) // 32)
+
+
+def load_fixtures(directory):
+    """Read <directory>/fixtures.json
+
+    {"listen": [utterance, ...],
+     "tts": {text: audio_file},
+     "asr": {audio_file: text}}
+    """
+    with open(os.path.join(directory, "fixtures.json"), encoding="utf-8") as f:
+        spec = json.load(f)
+
+    def read(name):
+        with open(os.path.join(directory, name), "rb") as audio:
+            return audio.read()
+
+    return {
+        "listen": spec.get("listen", DEFAULT_SCRIPT),
+        "tts": {text: read(name) for text, name in spec.get("tts", {}).items()},
+        "asr": {hashlib.sha256(read(name)).hexdigest(): text
+                for name, text in spec.get("asr", {}).items()},
+    }
+
+
+class StandInServer:
+    """Replays recorded ASR/TTS fixtures on localhost with configurable latency
+
+    GET  /translate_tts?q=...  -> recorded audio (or deterministic fake bytes)
+    POST /recognize            -> {"text": ...} for a recorded audio clip
+    GET  /listen?session=...   -> {"text": ...} next scripted utterance
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fixtures_dir=None):
+        self.latency = latency
+        self.fixtures = load_fixtures(fixtures_dir) if fixtures_dir else {
+            "listen": DEFAULT_SCRIPT, "tts": {}, "asr": {}}
+        self.cursors = {}  # session -> position in the listen script
+        self.requests = []  # (path, query) of every request served
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # keep-alive replies are written in two parts
+
+            def _reply(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, payload):
+                self._reply(200, json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                            "application/json; charset=utf-8")
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                stand_in.requests.append((url.path, query))
+                time.sleep(stand_in.latency)
+
+                if url.path == "/translate_tts" and "q" in query:
+                    text = query["q"]
+                    body = stand_in.fixtures["tts"].get(text) or fake_audio(text, query.get("tl", "te"))
+                    self._reply(200, body, "audio/mpeg")
+                elif url.path == "/listen":
+                    self._json({"text": stand_in.next_utterance(query.get("session", "default"))})
+                else:
+                    self._reply(404, b"not found", "text/plain")
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stand_in.requests.append((url.path, {}))
+                time.sleep(stand_in.latency)
+
+                if url.path == "/recognize":
+                    key = hashlib.sha256(body).hexdigest()
+                    self._json({"text": stand_in.fixtures["asr"].get(key, "")})
+                else:
+                    self._reply(404, b"not found", "text/plain")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    def next_utterance(self, session):
+        """Replay the listen script, one line per call, per session"""
+        with self.lock:
+            script = self.fixtures["listen"]
+            position = self.cursors.get(session, 0)
+            self.cursors[session] = position + 1
+        return script[position % len(script)]
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def run_end_to_end_benchmark(conversations=20, latency=0.0, fixtures_dir=None):
+    """Full voice conversations (listen -> process -> speak) against the stand-in"""
+    import contextlib
+    import tempfile
+    from agent import TeluguGovernmentAgent
+    from audio_cache import AudioCache
+    from speech import TeluguVoice
+    from speech_backends import LocalHTTPBackend
+    from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+    tool1 = Tool1_EligibilityChecker()
+    tool2 = Tool2_SchemeRecommender()
+
+    with StandInServer(latency=latency, fixtures_dir=fixtures_dir) as server, \
+            tempfile.TemporaryDirectory() as cache_dir, \
+            open(os.devnull, "w") as devnull:
+        cache = AudioCache(cache_dir)
+        start = time.perf_counter()
+        for i in range(conversations):
+            backend = LocalHTTPBackend(server.url, session=f"bench-{i}")
+            with contextlib.redirect_stdout(devnull):
+                voice = TeluguVoice(backend=backend, cache=cache, play_audio=False)
+                agent = TeluguGovernmentAgent(tool1=tool1, tool2=tool2, voice=voice)
+                agent.run_voice_conversation()
+        elapsed = time.perf_counter() - start
+
+    turns = sum(1 for path, _ in server.requests if path == "/listen")
+    result = {
+        "conversations": conversations,
+        "turns": turns,
+        "seconds": round(elapsed, 3),
+        "ms_per_turn": round(elapsed / max(turns, 1) * 1000, 3),
+        "tts_requests": sum(1 for path, _ in server.requests if path == "/translate_tts"),
+        "cache_hits": cache.hits,
+    }
+    print(f"📈 {result}")
+    return result
+
+
+# Self-test + end-to-end benchmark, fully offline
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local speech stand-in")
+    parser.add_argument("--serve", action="store_true", help="just run the stand-in")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--fixtures", help="directory with fixtures.json")
+    parser.add_argument("--conversations", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.serve:
+        server = StandInServer(port=args.port, latency=args.latency, fixtures_dir=args.fixtures)
+        print(f"🧪 స్టాండ్-ఇన్ సర్వర్: {server.url}")
+        server.httpd.serve_forever()
+    else:
+        import tempfile
+        from audio_cache import AudioCache
+        from playback import NullSink, PlaybackEngine
+        from speech import TeluguVoice
+        from speech_backends import LocalHTTPBackend
+
+        # Pipelined speak() + audio cache; every chunk "plays" for 200ms
+        with StandInServer(latency=0.15) as server, tempfile.TemporaryDirectory() as cache_dir:
+            sink = NullSink(duration=0.2)
+            voice = TeluguVoice(backend=LocalHTTPBackend(server.url),
+                                cache=AudioCache(cache_dir, max_bytes=4096),
+                                player=PlaybackEngine(sink))
+            text = "మీకు సిఫార్సు చేస్తున్న పథకాలు:\n1. PM కిసాన్. 2. ఆవాస్ యోజన. 3. ఆయుష్మాన్ భారత్."
+
+            for attempt in ("cold", "cached"):
+                sink.played = []
+                start = time.monotonic()
+                voice.speak(text)
+                total = time.monotonic() - start
+                first = sink.played[0][0] - start
+                print(f"📊 {attempt}: {len(sink.played)} chunks, first audio {first * 1000:.0f}ms, "
+                      f"total {total * 1000:.0f}ms")
+                assert all(audio.startswith(b"ID3") for _, audio in sink.played)
+
+            print(f"📊 cache hits={voice.cache.hits} misses={voice.cache.misses} "
+                  f"bytes={voice.cache.total_bytes} requests={len(server.requests)}")
+            assert voice.cache.total_bytes <= 4096
+
+        run_end_to_end_benchmark(args.conversations, args.latency, args.fixtures)
@@ -0,0 +1,410 @@
+# streaming_asr.py - FRAME-BY-FRAME CAPTURE, ENDPOINTING, PARTIALS AND BARGE-IN
+import math
+import sys
+import threading
+import time
+import wave
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit PCM
+FRAME_MS = 20
+
+SPEECH_START = "start"
+SPEECH_END = "end"
+
+
+def frame_energy(frame):
+    """RMS of one frame of 16-bit little-endian PCM"""
+    samples = array("h")
+    samples.frombytes(frame[:len(frame) - len(frame) % 2])
+    if not samples:
+        return 0.0
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class WavFrames:
+    """Fixed-size frames from a 16-bit mono WAV file (stands in for the microphone)"""
+
+    def __init__(self, path, frame_ms=FRAME_MS, realtime=False):
+        self.path = path
+        self.frame_ms = frame_ms
+        self.realtime = realtime  # sleep like a live microphone would
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != SAMPLE_WIDTH or wav.getnchannels() != 1:
+                raise ValueError(f"{path}: need 16-bit mono PCM")
+            self.sample_rate = wav.getframerate()
+
+    def __iter__(self):
+        samples_per_frame = self.sample_rate * self.frame_ms // 1000
+        next_time = time.monotonic()
+        with wave.open(self.path, "rb") as wav:
+            while True:
+                frame = wav.readframes(samples_per_frame)
+                if not frame:
+                    return
+                if self.realtime:
+                    next_time += self.frame_ms / 1000
+                    time.sleep(max(0.0, next_time - time.monotonic()))
+                yield frame
+
+
+class MicrophoneFrames:
+    """Fixed-size frames from one long-lived microphone stream"""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS, device_index=None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.device_index = device_index
+
+    def __iter__(self):
+        import speech_recognition as sr
+
+        samples_per_frame = self.sample_rate * self.frame_ms // 1000
+        with sr.Microphone(device_index=self.device_index, sample_rate=self.sample_rate,
+                           chunk_size=samples_per_frame) as source:
+            while True:
+                yield source.stream.read(samples_per_frame)
+
+
+class EnergyEndpointer:
+    """Energy VAD with an adaptive noise floor
+
+    The floor is calibrated once from the first frames of the stream and then
+    follows the background noise on every non-speech frame.
+    """
+
+    def __init__(self, frame_ms=FRAME_MS, calibration_ms=300, start_ms=60, end_silence_ms=600,
+                 max_speech_ms=10000, ratio=3.0, min_energy=100.0, adapt=0.05):
+        self.calibration_frames = max(1, calibration_ms // frame_ms)
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.max_frames = max(1, max_speech_ms // frame_ms)
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.adapt = adapt
+
+        self.noise_floor = None
+        self.calibration = []
+        self.in_speech = False
+        self.loud_run = 0  # consecutive loud frames while waiting for speech
+        self.quiet_run = 0  # consecutive quiet frames during speech
+        self.speech_frames = 0
+
+    @property
+    def calibrated(self):
+        return self.noise_floor is not None
+
+    def threshold(self, scale=1.0):
+        return max(self.noise_floor * self.ratio, self.min_energy) * scale
+
+    def process(self, energy, threshold_scale=1.0):
+        """Feed one frame's energy; returns SPEECH_START, SPEECH_END or None
+
+        threshold_scale > 1 makes speech harder to trigger (e.g. while our own
+        prompt is playing and leaks into the microphone).
+        """
+        if self.noise_floor is None:
+            self.calibration.append(energy)
+            if len(self.calibration) >= self.calibration_frames:
+                self.noise_floor = sum(self.calibration) / len(self.calibration)
+                self.calibration = []
+            return None
+
+        loud = energy > self.threshold(threshold_scale)
+        if not self.in_speech:
+            if loud:
+                self.loud_run += 1
+                if self.loud_run >= self.start_frames:
+                    self.in_speech = True
+                    self.loud_run = self.quiet_run = 0
+                    self.speech_frames = self.start_frames
+                    return SPEECH_START
+            else:
+                self.loud_run = 0
+                self.noise_floor += self.adapt * (energy - self.noise_floor)
+            return None
+
+        self.speech_frames += 1
+        self.quiet_run = 0 if loud else self.quiet_run + 1
+        if self.quiet_run >= self.end_frames or self.speech_frames >= self.max_frames:
+            self.in_speech = False
+            self.quiet_run = 0
+            return SPEECH_END
+        return None
+
+
+class ChunkedRecognizer:
+    """Partial transcripts from a whole-clip recognizer
+
+    Every partial_interval_ms of new speech, the audio so far is recognized on a
+    background thread (one request in flight at most); final() recognizes the
+    complete utterance.
+    """
+
+    def __init__(self, recognize_pcm, sample_rate=SAMPLE_RATE, sample_width=SAMPLE_WIDTH,
+                 partial_interval_ms=500):
+        self.recognize_pcm = recognize_pcm  # (pcm bytes, sample_rate, sample_width) -> text
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.partial_bytes = sample_rate * sample_width * partial_interval_ms // 1000
+        self.worker = ThreadPoolExecutor(max_workers=1)
+        self.on_partial = None
+        self.reset()
+
+    def reset(self):
+        self.audio = bytearray()
+        self.next_partial = self.partial_bytes
+        self.in_flight = None
+        self.partial = ""
+        self.session = None  # trace session of the utterance being recognized
+
+    def _partial(self, pcm):
+        try:
+            with tracing.span("asr:partial", session=self.session, bytes=len(pcm)):
+                text = self.recognize_pcm(pcm, self.sample_rate, self.sample_width)
+        except Exception as e:
+            print(f"⚠️ పాక్షిక గుర్తింపు విఫలమైంది: {e}")
+            return
+        if text and text != self.partial:
+            self.partial = text
+            if self.on_partial:
+                self.on_partial(text)
+
+    def feed(self, frame):
+        self.audio += frame
+        if len(self.audio) >= self.next_partial and (self.in_flight is None or self.in_flight.done()):
+            self.next_partial = len(self.audio) + self.partial_bytes
+            self.session = tracing.current_session()
+            self.in_flight = self.worker.submit(self._partial, bytes(self.audio))
+
+    def final(self):
+        if self.in_flight is not None:
+            self.in_flight.cancel()
+        if not self.audio:
+            return ""
+        with tracing.span("asr", bytes=len(self.audio)):
+            return self.recognize_pcm(bytes(self.audio), self.sample_rate, self.sample_width)
+
+
+class TranscriptRecognizer:
+    """Recognizer for WAV fixtures: returns known transcripts, one per utterance,
+    revealing one more word every partial_interval_ms of speech"""
+
+    def __init__(self, transcripts, frame_ms=FRAME_MS, partial_interval_ms=200):
+        self.transcripts = deque(transcripts)
+        self.frames_per_word = max(1, partial_interval_ms // frame_ms)
+        self.on_partial = None
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.partial = ""
+
+    def feed(self, frame):
+        self.frames += 1
+        if self.transcripts and self.frames % self.frames_per_word == 0:
+            words = self.transcripts[0].split()
+            partial = " ".join(words[:self.frames // self.frames_per_word])
+            if partial != self.partial:
+                self.partial = partial
+                if self.on_partial:
+                    self.on_partial(partial)
+
+    def final(self):
+        return self.transcripts.popleft() if self.transcripts else ""
+
+
+class StreamingListener:
+    """Endpointed user turns from one continuous frame stream"""
+
+    def __init__(self, frames, recognizer, endpointer=None, frame_ms=FRAME_MS,
+                 pre_roll_ms=200, no_speech_timeout_ms=5000, on_partial=None):
+        self.frames = iter(frames)
+        self.recognizer = recognizer
+        self.endpointer = endpointer or EnergyEndpointer(frame_ms=frame_ms)
+        self.frame_ms = frame_ms
+        self.pre_roll_frames = max(1, pre_roll_ms // frame_ms)
+        self.no_speech_timeout_ms = no_speech_timeout_ms
+        self.recognizer.on_partial = on_partial
+        self.carry = []  # frames of speech already detected by barge-in
+        self.lock = threading.Lock()  # one consumer of the stream at a time
+
+    @property
+    def on_partial(self):
+        return self.recognizer.on_partial
+
+    @on_partial.setter
+    def on_partial(self, callback):
+        self.recognizer.on_partial = callback
+
+    def listen(self):
+        """Block until the user finishes a phrase; returns its text ('' on timeout,
+        None once the frame stream has ended without speech)"""
+        with self.lock:
+            recognizer = self.recognizer
+            recognizer.reset()
+            speaking = bool(self.carry)
+            for frame in self.carry:
+                recognizer.feed(frame)
+            self.carry = []
+
+            pre_roll = deque(maxlen=self.pre_roll_frames)
+            waited_ms = 0
+            for frame in self.frames:
+                event = self.endpointer.process(frame_energy(frame))
+                if speaking:
+                    recognizer.feed(frame)
+                    if event == SPEECH_END:
+                        break
+                    continue
+
+                pre_roll.append(frame)
+                if event == SPEECH_START:
+                    speaking = True
+                    for buffered in pre_roll:
+                        recognizer.feed(buffered)
+                elif self.endpointer.calibrated:
+                    waited_ms += self.frame_ms
+                    if waited_ms >= self.no_speech_timeout_ms:
+                        return ""
+            else:
+                # Stream over (a WAV fixture ran out, the microphone closed)
+                return recognizer.final() if speaking else None
+
+            return recognizer.final()
+
+    def wait_for_speech(self, stop, threshold_scale=2.0):
+        """Barge-in watch: consume frames until speech starts (True) or stop is set
+
+        The speech frames are kept so the next listen() starts with them.
+        """
+        with self.lock:
+            pre_roll = deque(maxlen=self.pre_roll_frames)
+            for frame in self.frames:
+                if stop.is_set():
+                    return False
+                pre_roll.append(frame)
+                if self.endpointer.process(frame_energy(frame), threshold_scale) == SPEECH_START:
+                    self.carry = list(pre_roll)
+                    return True
+            return False
+
+
+def write_fixture_wav(path, segments, sample_rate=SAMPLE_RATE, seed=1):
+    """Write a test WAV: segments of (milliseconds, amplitude); amplitude 0 is
+    background hiss, anything else a voiced tone over the hiss"""
+    import random
+
+    rng = random.Random(seed)
+    samples = array("h")
+    t = 0
+    for duration_ms, amplitude in segments:
+        for _ in range(sample_rate * duration_ms // 1000):
+            value = rng.gauss(0, 30)
+            if amplitude:
+                value += amplitude * math.sin(2 * math.pi * 180 * t / sample_rate) * (
+                    0.6 + 0.4 * math.sin(2 * math.pi * 4 * t / sample_rate))
+            samples.append(max(-32768, min(32767, int(value))))
+            t += 1
+    if sys.byteorder == "big":
+        samples.byteswap()
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return path
+
+
+# Test: WAV fixtures through the endpointer, partials, and barge-in timing
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        turns_wav = write_fixture_wav(os.path.join(directory, "turns.wav"), [
+            (500, 0), (1200, 4000), (150, 0), (400, 3000),  # short pause inside turn 1
+            (900, 0), (800, 5000), (1000, 0)])
+        transcripts = ["నేను రైతుని నా వయస్సు 35", "నా ఆదాయం 2 లక్షలు"]
+
+        partials = []
+        listener = StreamingListener(WavFrames(turns_wav), TranscriptRecognizer(transcripts),
+                                     on_partial=lambda text: partials.append(text))
+        start = time.perf_counter()
+        heard = [listener.listen(), listener.listen(), listener.listen()]
+        elapsed = time.perf_counter() - start
+        assert heard == transcripts + [None], heard
+        assert listener.listen() is None, "an ended stream stays ended"
+        assert partials and partials[0] != transcripts[0], "partials come before the final text"
+        print(f"🎤 {heard[:2]} in {elapsed * 1000:.1f}ms CPU for 5.0s of audio, "
+              f"{len(partials)} partials, noise floor {listener.endpointer.noise_floor:.0f}")
+
+        # Barge-in: prompt plays for 2s, caller starts talking at 0.5s
+        barge_wav = write_fixture_wav(os.path.join(directory, "barge.wav"),
+                                      [(500, 0), (700, 4000), (800, 0)])
+        listener = StreamingListener(WavFrames(barge_wav, realtime=True),
+                                     TranscriptRecognizer(["ఆగండి"]))
+        stop = threading.Event()
+        interrupted = threading.Event()
+        watcher = threading.Thread(
+            target=lambda: listener.wait_for_speech(stop) and interrupted.set())
+        start = time.monotonic()
+        watcher.start()
+        interrupted.wait(timeout=2.0)  # "playback"
+        stopped_at = time.monotonic() - start
+        stop.set()
+        watcher.join()
+        assert interrupted.is_set() and listener.listen() == "ఆగండి"
+        print(f"✋ barge-in stopped a 2.0s prompt at {stopped_at:.2f}s (speech began at 0.50s)")
+
+        # A whole call from a WAV fixture: when the audio runs out the channel closes
+        import contextlib
+        from agent import TeluguGovernmentAgent
+        from channels import VoiceChannel
+        from playback import NullSink, PlaybackEngine
+        from speech import TeluguVoice
+        from speech_backends import FileBackend
+
+        script_path = os.path.join(directory, "script.txt")
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write("")
+        call_wav = write_fixture_wav(os.path.join(directory, "call.wav"), [
+            (500, 0), (800, 4000), (600, 0), (800, 4000), (600, 0)])
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            voice = TeluguVoice(backend=FileBackend(script_path), player=PlaybackEngine(NullSink()),
+                                listener=StreamingListener(WavFrames(call_wav),
+                                                           TranscriptRecognizer(["నేను రైతుని", "నా వయస్సు 35"])))
+            agent = TeluguGovernmentAgent(use_voice=True, voice=voice)
+            call = threading.Thread(target=agent.run, args=(VoiceChannel(voice),), daemon=True)
+            call.start()
+            call.join(timeout=10)
+            voice.player.close()
+        assert not call.is_alive(), "agent.run kept listening to an ended stream"
+        assert agent.state == "ASK_INCOME" and agent.memory.user_facts == {"occupation": "రైతు", "age": 35}, \
+            (agent.state, agent.memory.user_facts)
+        print(f"📴 WAV ran out after 2 turns: agent.run returned in state {agent.state}")
+
+        # Partial transcripts that complete the profile start the tools before the caller finishes
+        from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+        call_wav = write_fixture_wav(os.path.join(directory, "full_call.wav"), [
+            (500, 0), (800, 4000), (600, 0), (800, 4000), (600, 0), (1400, 4000), (600, 0)])
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            tool1, tool2 = Tool1_EligibilityChecker(), Tool2_SchemeRecommender()
+            voice = TeluguVoice(backend=FileBackend(script_path), player=PlaybackEngine(NullSink()),
+                                listener=StreamingListener(WavFrames(call_wav), TranscriptRecognizer(
+                                    ["నేను రైతుని", "నా వయస్సు 35", "నా ఆదాయం 2 లక్షలు"])))
+            agent = TeluguGovernmentAgent(tool1=tool1, tool2=tool2, voice=voice)
+            agent.run(VoiceChannel(voice))
+            voice.player.close()
+        facts = {"occupation": "రైతు", "age": 35, "income": 200000}
+        assert agent.state == "END" and agent.prewarmed_profile == facts, (agent.state, agent.prewarmed_profile)
+        print(f"⏳ tools started from the partial transcript {agent.prewarmed_profile}; "
+              f"eligibility cache {tool1.cache.stats()['hits']} hit(s)")
@@ -0,0 +1,150 @@
+# tool_history.py - BOUNDED TOOL CALL HISTORY WITH LATENCY HISTOGRAMS
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from latency_stats import LatencyHistogram
+
+
+def payload_size(value):
+    """Cheap approximate size in bytes (container plus its direct items)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(v) for v in value.values())
+    elif isinstance(value, (list, tuple)):
+        size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+class ToolCallRecord:
+    """One tool call, without the payloads themselves"""
+
+    __slots__ = ("tool", "started", "wall", "cpu", "input_bytes", "output_bytes", "ok")
+
+    def __init__(self, tool, started, wall, cpu, input_bytes, output_bytes, ok):
+        self.tool = tool
+        self.started = started  # time.monotonic() at start
+        self.wall = wall  # seconds
+        self.cpu = cpu  # seconds of CPU on the worker thread
+        self.input_bytes = input_bytes
+        self.output_bytes = output_bytes
+        self.ok = ok
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ToolHistory:
+    """Fixed-capacity ring buffer of ToolCallRecord + per-tool histograms"""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.records = [None] * capacity
+        self.next = 0  # total records ever written
+        self.wall = {}  # tool -> LatencyHistogram
+        self.cpu_total = {}  # tool -> seconds
+        self.failures = {}  # tool -> count
+        self.lock = threading.Lock()
+
+    def record(self, tool, started, wall, cpu, tool_input, output, ok=True):
+        entry = ToolCallRecord(tool, started, wall, cpu, payload_size(tool_input),
+                               payload_size(output) if ok else 0, ok)
+        with self.lock:
+            self.records[self.next % self.capacity] = entry
+            self.next += 1
+            if tool not in self.wall:
+                self.wall[tool] = LatencyHistogram()
+                self.cpu_total[tool] = 0.0
+                self.failures[tool] = 0
+            self.wall[tool].observe(wall)
+            self.cpu_total[tool] += cpu
+            if not ok:
+                self.failures[tool] += 1
+        return entry
+
+    def __len__(self):
+        return min(self.next, self.capacity)
+
+    def __iter__(self):
+        """Oldest to newest"""
+        with self.lock:
+            start = max(0, self.next - self.capacity)
+            snapshot = [self.records[i % self.capacity] for i in range(start, self.next)]
+        return iter(snapshot)
+
+    def recent(self, n=10, tool=None):
+        """Last n records (optionally for one tool), newest last"""
+        records = [r for r in self if tool is None or r.tool == tool]
+        return records[-n:]
+
+    def latency_summary(self):
+        """tool -> count, p50/p95/p99/mean wall ms, cpu ms, failures"""
+        with self.lock:
+            summary = {}
+            for tool, histogram in self.wall.items():
+                stats = histogram.summary()
+                stats["cpu_ms"] = round(self.cpu_total[tool] * 1000, 3)
+                stats["failures"] = self.failures[tool]
+                summary[tool] = stats
+            return summary
+
+    def prometheus_text(self):
+        """Prometheus text exposition format"""
+        def label(tool):
+            return tool.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        lines = [
+            "# HELP tool_call_seconds Wall time of tool calls",
+            "# TYPE tool_call_seconds histogram",
+        ]
+        with self.lock:
+            for tool, histogram in self.wall.items():
+                name = label(tool)
+                for bound, total in histogram.cumulative():
+                    lines.append(f'tool_call_seconds_bucket{{tool="{name}",le="{bound}"}} {total}')
+                lines.append(f'tool_call_seconds_sum{{tool="{name}"}} {histogram.sum:.6f}')
+                lines.append(f'tool_call_seconds_count{{tool="{name}"}} {histogram.count}')
+            lines.append("# HELP tool_call_cpu_seconds_total CPU time of tool calls")
+            lines.append("# TYPE tool_call_cpu_seconds_total counter")
+            for tool, cpu in self.cpu_total.items():
+                lines.append(f'tool_call_cpu_seconds_total{{tool="{label(tool)}"}} {cpu:.6f}')
+            lines.append("# HELP tool_call_failures_total Failed or timed out tool calls")
+            lines.append("# TYPE tool_call_failures_total counter")
+            for tool, failures in self.failures.items():
+                lines.append(f'tool_call_failures_total{{tool="{label(tool)}"}} {failures}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write the metrics file atomically (for node_exporter's textfile collector)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+    def serve_metrics(self, host="127.0.0.1", port=9108):
+        """Serve GET /metrics on a background thread; returns the server"""
+        history = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = history.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"📈 మెట్రిక్స్: http://{host}:{server.server_address[1]}/metrics")
+        return server
@@ -0,0 +1,121 @@
+# tool_index.py - BM25 INDEX OVER TOOL DESCRIPTIONS
+import heapq
+import math
+import re
+from collections import Counter, OrderedDict
+
+# \w alone splits Telugu words at vowel signs, so include the whole Telugu block
+TOKEN_PATTERN = re.compile(r"[0-9A-Za-z_ఀ-౿]+")
+
+
+def tokenize(text):
+    """Lower-cased Telugu/English word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class ToolIndex:
+    """Inverted index with BM25 scoring, built at register time"""
+
+    def __init__(self, k1=1.5, b=0.75, cache_size=1024):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> {tool: term frequency}
+        self.lengths = {}  # tool -> description length in tokens
+        self.order = {}  # tool -> registration order (tie-break)
+        self.total_length = 0
+        self.cache = OrderedDict()  # (task, k) -> results
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, name, description):
+        """Index (or re-index) one tool description"""
+        if name in self.lengths:
+            self.remove(name)
+        tokens = tokenize(description)
+        for term, count in Counter(tokens).items():
+            self.postings.setdefault(term, {})[name] = count
+        self.lengths[name] = len(tokens)
+        self.order.setdefault(name, len(self.order))
+        self.total_length += len(tokens)
+        self.cache.clear()
+
+    def remove(self, name):
+        for term in list(self.postings):
+            docs = self.postings[term]
+            if docs.pop(name, None) is not None and not docs:
+                del self.postings[term]
+        self.total_length -= self.lengths.pop(name)
+        self.cache.clear()
+
+    def search(self, task_description, k=1):
+        """Top-k (tool, score) pairs, best first; ties keep registration order"""
+        key = (task_description, k)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key]
+        self.misses += 1
+
+        count = len(self.lengths)
+        average = self.total_length / count if count else 0.0
+        scores = {}
+        for term in set(tokenize(task_description)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for name, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[name] / average)
+                scores[name] = scores.get(name, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        order = self.order
+        results = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -order[item[0]]))
+
+        self.cache[key] = results
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return results
+
+
+# Benchmark: 1k tools, linear scoring + sort vs index + heap (+ cache)
+if __name__ == "__main__":
+    import random
+    import time
+    from tool_orchestrator import ToolOrchestrator
+
+    rng = random.Random(5)
+    vocabulary = ["పథకం", "అర్హత", "సిఫార్సు", "దరఖాస్తు", "రైతు", "విద్యార్థి", "పెన్షన్",
+                  "ఆరోగ్యం", "గృహం", "loan", "apply", "status", "check", "form", "sms",
+                  "document", "aadhaar", "bank", "subsidy", "scholarship"]
+
+    orchestrator = ToolOrchestrator()
+    for i in range(1000):
+        words = rng.sample(vocabulary, 6) + [f"scheme_{i}"]
+        orchestrator.register_tool(f"apply_helper_{i}", lambda **kw: {}, " ".join(words),
+                                   ["user_profile"], [f"form_{i}"])
+
+    tasks = [" ".join(rng.sample(vocabulary, 3)) + f" scheme_{rng.randrange(1000)}"
+             for _ in range(200)]
+
+    start = time.perf_counter()
+    for task in tasks:
+        scored = [(name, orchestrator.calculate_relevance(tool['description'], task), tool)
+                  for name, tool in orchestrator.tool_registry.items()]
+        scored.sort(key=lambda x: x[1], reverse=True)
+    linear = (time.perf_counter() - start) / len(tasks)
+
+    orchestrator.tool_index.cache.clear()
+    start = time.perf_counter()
+    for task in tasks:
+        orchestrator.select_tool(task, {})
+    indexed = (time.perf_counter() - start) / len(tasks)
+
+    start = time.perf_counter()
+    for task in tasks:
+        orchestrator.select_tool(task, {})
+    cached = (time.perf_counter() - start) / len(tasks)
+
+    print(f"📊 1000 tools: linear {linear * 1000:.3f}ms, index {indexed * 1000:.3f}ms, "
+          f"cached {cached * 1000:.4f}ms per selection")
+    print(f"🔍 {tasks[0]!r} -> {orchestrator.select_tool(tasks[0], {})[0]}")
@@ -1,60 +1,234 @@
 # tool_orchestrator.py
+import time
+from collections import ChainMap
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import tracing
+from tool_history import ToolHistory
+from tool_index import ToolIndex, tokenize
+
+
+def _timed_call(function, tool_input, name=None, session=None):
+    """Run a tool on the worker thread, measuring its own wall and CPU time"""
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    with tracing.span(f"tool:{name}", session=session):
+        result = function(**tool_input)
+    return result, time.perf_counter() - wall_start, time.thread_time() - cpu_start
+
+
 class ToolOrchestrator:
     """Orchestrates multiple tools intelligently"""
 
-    def __init__(self):
+    def __init__(self, max_workers=8, default_timeout=10.0, history_capacity=1024):
         self.tool_registry = {}
-        self.tool_history = []
+        self.tool_history = ToolHistory(history_capacity)
+        self.tool_index = ToolIndex()
+        self.default_timeout = default_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def register_tool(self, tool_name, tool_function, description, input_schema, output_schema,
+                      timeout=None):
+        """Register a tool with metadata
 
-    def register_tool(self, tool_name, tool_function, description, input_schema, output_schema):
-        """Register a tool with metadata"""
+        input_schema / output_schema: field names (a dict of field -> type also works).
+        tool_function(**inputs) must return a dict with the output fields.
+        """
         self.tool_registry[tool_name] = {
             'function': tool_function,
             'description': description,
-            'input': input_schema,
-            'output': output_schema
+            'input': list(input_schema),
+            'output': list(output_schema),
+            'timeout': timeout or self.default_timeout
         }
+        self.tool_index.add(tool_name, description)
+
+    def calculate_relevance(self, description, task_description):
+        """Share of task words that appear in the tool description"""
+        tool_words = set(tokenize(description))
+        task_words = set(tokenize(task_description))
+        if not task_words:
+            return 0.0
+        return len(tool_words & task_words) / len(task_words)
+
+    def select_tools(self, task_description, k=3):
+        """Top-k (name, score, tool) by BM25 over the indexed descriptions"""
+        return [(name, score, self.tool_registry[name])
+                for name, score in self.tool_index.search(task_description, k)]
 
     def select_tool(self, task_description, context):
         """Intelligently select appropriate tool"""
+        best = self.select_tools(task_description, k=1)
+        if best:
+            return best[0]
 
-        # Score each tool for the task
-        tool_scores = []
+        # Nothing matched: first registered tool, as the old full sort did
         for name, tool in self.tool_registry.items():
-            score = self.calculate_relevance(tool['description'], task_description)
-            tool_scores.append((name, score, tool))
+            return (name, 0.0, tool)
+        return None
+
+    def build_plan(self, tools_chain):
+        """Dependency DAG: tool -> set of earlier tools whose outputs it reads
+
+        A field comes from the closest earlier tool in the chain that outputs it
+        (same as running the chain in order), otherwise from the initial data.
+        A tool listed twice runs once, at its first place, so every dependency
+        points back along the chain and the plan has no cycles.
+        """
+        producer = {}  # field -> latest tool so far that outputs it
+        sources = {}  # tool -> {field: producing tool or None}
+        for tool_name in tools_chain:
+            if tool_name not in self.tool_registry or tool_name in sources:
+                continue
+            tool = self.tool_registry[tool_name]
+            sources[tool_name] = {field: producer.get(field) for field in tool['input']}
+            for field in tool['output']:
+                producer[field] = tool_name
 
-        # Select best tool
-        tool_scores.sort(key=lambda x: x[1], reverse=True)
-        best_tool = tool_scores[0] if tool_scores else None
+        depends_on = {name: {src for src in fields.values() if src} for name, fields in sources.items()}
+        return sources, depends_on
 
-        return best_tool
+    def prepare_input(self, field_sources, results, initial_data):
+        """Pick each input field from its producing tool's output (no copies of the data)"""
+        tool_input = {}
+        for field, source in field_sources.items():
+            data = results[source] if source else initial_data
+            if field in data:
+                tool_input[field] = data[field]
+        return tool_input
 
     def execute_tool_chain(self, tools_chain, initial_data):
-        """Execute sequence of tools"""
+        """Execute tools, running independent ones concurrently"""
+        results, _ = self.run(tools_chain, initial_data)
+        return results
+
+    def run(self, tools_chain, initial_data):
+        """Run the DAG; returns (results per tool, merged read-only view of all data)"""
+        sources, depends_on = self.build_plan(tools_chain)
+        order = {name: i for i, name in enumerate(sources)}
+
         results = {}
-        current_data = initial_data
+        failed = set()
+        running = {}  # future -> (tool name, tool input, start, deadline)
+        waiting = dict(depends_on)
 
-        for tool_name in tools_chain:
-            if tool_name in self.tool_registry:
-                tool = self.tool_registry[tool_name]
+        def give_up(name, message):
+            """A tool that will not run counts as failed, in the history too"""
+            print(message)
+            self.tool_history.record(name, time.monotonic(), 0.0, 0.0, {}, None, ok=False)
+            failed.add(name)
+
+        def start_ready():
+            for name in [n for n, deps in waiting.items() if deps <= results.keys()]:
+                del waiting[name]
+                tool = self.tool_registry[name]
+                tool_input = self.prepare_input(sources[name], results, initial_data)
+                start = time.monotonic()
+                future = self.executor.submit(_timed_call, tool['function'], tool_input,
+                                              name, tracing.current_session())
+                running[future] = (name, tool_input, start, start + tool['timeout'])
+
+        start_ready()
+        while running:
+            now = time.monotonic()
+            timeout = max(0.0, min(deadline for *_, deadline in running.values()) - now)
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            now = time.monotonic()
+            for future in list(running):
+                name, tool_input, start, deadline = running[future]
+                if future in done:
+                    del running[future]
+                    try:
+                        result, wall, cpu = future.result()
+                    except Exception as e:
+                        print(f"❌ టూల్ {name} దోషం: {e}")
+                        self.tool_history.record(name, start, now - start, 0.0, tool_input, None, ok=False)
+                        failed.add(name)
+                        continue
+                    results[name] = result
+                    self.tool_history.record(name, start, wall, cpu, tool_input, result)
+                elif now >= deadline:
+                    # The thread cannot be killed; stop waiting for it
+                    del running[future]
+                    future.cancel()
+                    print(f"⏰ టూల్ {name} సమయం మించింది ({self.tool_registry[name]['timeout']}s)")
+                    self.tool_history.record(name, start, now - start, 0.0, tool_input, None, ok=False)
+                    failed.add(name)
+
+            # Tools that depend on a failed tool never run
+            for name in [n for n, deps in waiting.items() if deps & failed]:
+                del waiting[name]
+                give_up(name, f"⚠️ టూల్ {name} దాటవేయబడింది")
+            start_ready()
+
+        # Nothing left running, yet some never became ready: not silently dropped
+        for name in waiting:
+            give_up(name, f"⚠️ టూల్ {name} ప్రారంభం కాలేదు (ఆధారాలు పూర్తి కాలేదు)")
+
+        # Later tools in the chain shadow earlier ones, initial data is last
+        layers = [results[name] for name in sorted(results, key=order.get, reverse=True)]
+        return results, ChainMap(*layers, initial_data)
+
+
+def register_default_tools(orchestrator, tool1, tool2):
+    """Register Tool 1 (eligibility) and Tool 2 (recommender)"""
+    orchestrator.register_tool(
+        'eligibility_checker',
+        lambda user_profile: {'eligible_schemes': tool1.check(user_profile)},
+        'check eligibility of the user profile for government schemes అర్హత తనిఖీ పథకాలు',
+        input_schema={'user_profile': dict},
+        output_schema={'eligible_schemes': tuple}
+    )
+    orchestrator.register_tool(
+        'scheme_recommender',
+        lambda eligible_schemes, user_profile: {
+            'recommendations': tool2.recommend(eligible_schemes, user_profile)},
+        'recommend the best eligible schemes for the user సిఫార్సు పథకాలు',
+        input_schema={'eligible_schemes': tuple, 'user_profile': dict},
+        output_schema={'recommendations': list}
+    )
+    return orchestrator
+
+
+# Test
+if __name__ == "__main__":
+    from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+    orchestrator = register_default_tools(
+        ToolOrchestrator(), Tool1_EligibilityChecker(), Tool2_SchemeRecommender())
 
-                # Prepare input
-                tool_input = self.prepare_input(tool['input'], current_data)
+    initial = {'user_profile': {"age": 35, "income": 50000, "occupation": "రైతు"}}
+    results, merged = orchestrator.run(['eligibility_checker', 'scheme_recommender'], initial)
+    print(f"సిఫార్సులు: {[r['scheme']['id'] for r in merged['recommendations']]}")
+    assert set(initial) == {'user_profile'}, "initial data must not be mutated"
 
-                # Execute
-                result = tool['function'](**tool_input)
+    # Independent tools overlap; the slow one times out without blocking the rest
+    orchestrator.register_tool('sms', lambda user_profile: time.sleep(0.3) or {'sms': 'ok'},
+                               'send sms', ['user_profile'], ['sms'])
+    orchestrator.register_tool('audit', lambda user_profile: time.sleep(0.3) or {'audit': 'ok'},
+                               'audit log', ['user_profile'], ['audit'])
+    orchestrator.register_tool('stuck', lambda user_profile: time.sleep(2) or {'x': 1},
+                               'slow tool', ['user_profile'], ['x'], timeout=0.5)
+    start = time.perf_counter()
+    results = orchestrator.execute_tool_chain(['sms', 'audit', 'stuck', 'eligibility_checker'], initial)
+    print(f"📊 {sorted(results)} in {time.perf_counter() - start:.2f}s (sequential would be 2.6s+)")
+    print(f"🔍 ఎంపిక: {orchestrator.select_tool('recommend schemes', {})[0]}")
 
-                # Store result
-                results[tool_name] = result
-                current_data.update(result)
+    # A tool listed twice runs once (it used to wait on itself and silently never run)
+    chain = ['eligibility_checker', 'scheme_recommender', 'eligibility_checker']
+    _, depends_on = orchestrator.build_plan(chain)
+    assert depends_on == {'eligibility_checker': set(),
+                          'scheme_recommender': {'eligibility_checker'}}, depends_on
+    results = orchestrator.execute_tool_chain(chain, initial)
+    assert sorted(results) == ['eligibility_checker', 'scheme_recommender'], sorted(results)
 
-                # Log to history
-                self.tool_history.append({
-                    'tool': tool_name,
-                    'input': tool_input,
-                    'output': result,
-                    'timestamp': '...'
-                })
+    # Skipped tools are failures in the history, not just missing from the results
+    orchestrator.register_tool('needs_stuck', lambda x: {'y': x}, 'after stuck', ['x'], ['y'])
+    results = orchestrator.execute_tool_chain(['stuck', 'needs_stuck'], initial)
+    assert not results and orchestrator.tool_history.latency_summary()['needs_stuck']['failures'] == 1
 
-        return results
\ No newline at end of file
+    for _ in range(50):
+        orchestrator.execute_tool_chain(['eligibility_checker', 'scheme_recommender'], initial)
+    print(f"📈 {orchestrator.tool_history.latency_summary()}")
+    print(orchestrator.tool_history.prometheus_text().splitlines()[2])
@@ -1,16 +1,54 @@
 # tools.py - Two Required Tools
-import json
+import itertools
+import os
+import threading
+
+from eligibility_index import EligibilityIndex
+from result_cache import ResultCache
+from scheme_catalog import load_catalog
+from scoring_rules import DEFAULT_SCORING, CompiledScoring
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemes.json")
+_catalog_versions = itertools.count(1)  # unique across checkers, so versions never collide
+
+
+class CatalogVersion:
+    """Schemes + their index + version, swapped in as one object"""
+
+    __slots__ = ("schemes", "index", "version")
+
+    def __init__(self, schemes, index, version):
+        self.schemes = schemes
+        self.index = index
+        self.version = version
+
+
+class EligibleSchemes(tuple):
+    """Tool 1's result: eligible schemes, plus the key they were matched under
+
+    key is (catalog version, profile signature), or None when the check was
+    not cached; Tool 2 caches its ranking under the same key.
+    """
+
+    key = None
 
 
 class Tool1_EligibilityChecker:
     """TOOL 1: Check eligibility for schemes"""
 
-    def __init__(self):
-        self.schemes = self.load_schemes()
+    def __init__(self, cache=None, catalog_path=DEFAULT_CATALOG):
+        self.cache = cache if cache is not None else ResultCache()
+        self.use_cache = True
+        self.catalog = None
+        self.reload_lock = threading.Lock()
+        if catalog_path and os.path.exists(catalog_path):
+            self.reload_schemes(load_catalog(catalog_path))
+        else:
+            self.reload_schemes(self.load_schemes())
         print("🔧 టూల్ 1: అర్హత తనిఖీదారు సిద్ధంగా ఉంది")
 
     def load_schemes(self):
-        """Load Telugu government schemes"""
+        """Built-in Telugu government schemes (used when there is no catalog file)"""
         return [
             {
                 "id": "pm_kisan",
@@ -18,7 +56,11 @@ class Tool1_EligibilityChecker:
                 "min_age": 18,
                 "max_income": 100000,
                 "occupation": "రైతు",
-                "benefits": "సంవత్సరానికి ₹6000"
+                "benefits": "సంవత్సరానికి ₹6000",
+                "scoring": [
+                    {"name": "farmer", "field": "occupation", "op": "eq", "value": "రైతు", "points": 10},
+                    {"name": "low_income", "field": "income", "op": "lt", "value": 50000, "points": 5}
+                ]
             },
             {
                 "id": "pm_awas",
@@ -26,7 +68,11 @@ class Tool1_EligibilityChecker:
                 "min_age": 21,
                 "max_income": 300000,
                 "occupation": "any",
-                "benefits": "గృహలోన్ సబ్సిడీ"
+                "benefits": "గృహలోన్ సబ్సిడీ",
+                "scoring": [
+                    {"name": "low_income", "field": "income", "op": "lt", "value": 50000, "points": 5},
+                    {"name": "senior_citizen", "field": "age", "op": "gt", "value": 60, "points": 3}
+                ]
             },
             {
                 "id": "ayushman",
@@ -34,17 +80,49 @@ class Tool1_EligibilityChecker:
                 "min_age": 21,
                 "max_income": 500000,
                 "occupation": "any",
-                "benefits": "₹5 లక్షల ఆరోగ్య బీమా"
+                "benefits": "₹5 లక్షల ఆరోగ్య బీమా",
+                "scoring": [
+                    {"name": "low_income", "field": "income", "op": "lt", "value": 50000, "points": 5}
+                ]
             }
         ]
 
-    def check(self, user_profile):
-        """Check which schemes user is eligible for"""
-        eligible = []
+    @property
+    def schemes(self):
+        return self.catalog.schemes
+
+    @property
+    def index(self):
+        return self.catalog.index
 
-        for scheme in self.schemes:
-            if self.is_eligible(scheme, user_profile):
-                eligible.append(scheme)
+    @property
+    def catalog_version(self):
+        return self.catalog.version
+
+    def reload_schemes(self, schemes):
+        """Build the new index off to the side, then swap it in with one assignment
+
+        Checks already running keep the catalog they started with; schemes handed
+        out earlier (e.g. an agent's eligible_schemes) stay valid.
+        """
+        with self.reload_lock:
+            version = next(_catalog_versions)
+            self.catalog = CatalogVersion(schemes, EligibilityIndex(schemes, self.is_eligible), version)
+        self.cache.invalidate()
+
+    def check(self, user_profile):
+        """Check which schemes user is eligible for (an EligibleSchemes tuple)"""
+        catalog = self.catalog  # one consistent snapshot for this call
+        signature = catalog.index.signature(user_profile) if self.use_cache else None
+        if signature is None:
+            eligible = EligibleSchemes(catalog.index.match(user_profile))
+        else:
+            key = (catalog.version, signature)
+            eligible = self.cache.get(key)
+            if eligible is None:
+                eligible = EligibleSchemes(catalog.index.match(user_profile))
+                eligible.key = key
+                self.cache.put(key, eligible)
 
         print(f"✅ {len(eligible)} పథకాలు అర్హత ఉన్నాయి")
         return eligible
@@ -72,40 +150,50 @@ class Tool1_EligibilityChecker:
 class Tool2_SchemeRecommender:
     """TOOL 2: Recommend best schemes"""
 
-    def __init__(self):
+    def __init__(self, cache=None, default_rules=DEFAULT_SCORING):
+        self.cache = cache if cache is not None else ResultCache()
+        self.default_rules = default_rules  # for schemes without their own "scoring"
+        self.use_cache = True
         print("🔧 టూల్ 2: పథకాలు సిఫార్సుదారు సిద్ధంగా ఉంది")
 
     def recommend(self, eligible_schemes, user_profile):
-        """Recommend top 3 schemes"""
-        recommendations = []
-
-        for scheme in eligible_schemes:
-            score = 0
-
-            # Priority for farmers for PM Kisan
-            if scheme["id"] == "pm_kisan" and user_profile.get("occupation") == "రైతు":
-                score += 10
-
-            # Priority for low income
-            if user_profile.get("income", 0) < 50000:
-                score += 5
-
-            # Priority for specific age groups
-            age = user_profile.get("age", 0)
-            if age > 60 and scheme["id"] == "pm_awas":
-                score += 3
-
-            recommendations.append({
-                "scheme": scheme,
-                "score": score,
-                "priority": self.get_priority(score)
-            })
-
-        # Sort by score
-        recommendations.sort(key=lambda x: x["score"], reverse=True)
-
-        print(f"📊 {len(recommendations)} సిఫార్సులు")
-        return recommendations[:3]  # Top 3
+        """Recommend top 3 schemes (cached per eligible list and satisfied features)"""
+        key = getattr(eligible_schemes, "key", None)
+        if not self.use_cache or key is None:
+            return self.rank(eligible_schemes, user_profile)
+
+        # One entry per Tool 1 result (catalog version + profile signature): its
+        # compiled rules and the top 3 for each set of satisfied features
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = (CompiledScoring(eligible_schemes, self.default_rules), {})
+            self.cache.put(key, entry)
+        compiled, ranked = entry
+
+        active = compiled.active(user_profile)
+        recommendations = ranked.get(active)
+        if recommendations is None:
+            recommendations = ranked[active] = self.rank(eligible_schemes, user_profile, compiled, active)
+        else:
+            print(f"📊 {len(eligible_schemes)} సిఫార్సులు")
+        return list(recommendations)
+
+    def rank(self, eligible_schemes, user_profile, compiled=None, active=None):
+        """Top 3 by rule score, each with the points every rule contributed"""
+        if compiled is None:
+            compiled = CompiledScoring(eligible_schemes, self.default_rules)
+        if active is None:
+            active = compiled.active(user_profile)
+
+        recommendations = [{
+            "scheme": eligible_schemes[position],
+            "score": score,
+            "priority": self.get_priority(score),
+            "breakdown": compiled.breakdown(position, active)
+        } for position, score in compiled.top_k(active, 3)]
+
+        print(f"📊 {len(eligible_schemes)} సిఫార్సులు")
+        return recommendations
 
     def get_priority(self, score):
         """Get priority level in Telugu"""
@@ -0,0 +1,233 @@
+# tracing.py - SPAN TRACING FOR TURN LATENCY (CHROME TRACE + HISTOGRAMS)
+#
+#   with tracing.span("tool:eligibility_checker"):
+#       ...
+#
+# Disabled by default (VOICE_AGENT_TRACE=1 or tracing.enable() turns it on).
+# When disabled span() checks one module-level flag and returns a shared no-op
+# object: instrumented code costs a function call and an empty with block.
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from latency_stats import LatencyHistogram
+
+_session = contextvars.ContextVar("trace_session", default=None)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "session", "args", "start")
+
+    def __init__(self, tracer, name, session, args):
+        self.tracer = tracer
+        self.name = name
+        self.session = session
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args = dict(self.args or {}, error=exc_type.__name__)
+        self.tracer.record(self.name, self.start, time.perf_counter_ns(), self.session, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach details learned inside the span (e.g. cache hit)"""
+        self.args = dict(self.args or {}, **args)
+
+
+class _SessionScope:
+    __slots__ = ("session_id", "token")
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+
+    def __enter__(self):
+        self.token = _session.set(self.session_id)
+        return self
+
+    def __exit__(self, *exc):
+        _session.reset(self.token)
+        return False
+
+
+class Tracer:
+    """Bounded ring of finished spans + one LatencyHistogram per span name"""
+
+    def __init__(self, capacity=100000):
+        self.events = deque(maxlen=capacity)  # (name, session, tid, start_ns, duration_ns, args)
+        self.histograms = {}
+        self.thread_names = {}
+        self.origin_ns = time.perf_counter_ns()
+        self.lock = threading.Lock()
+
+    def record(self, name, start_ns, end_ns, session=None, args=None):
+        if session is None:
+            session = _session.get()
+        tid = threading.get_ident()
+        with self.lock:
+            self.events.append((name, session, tid, start_ns, end_ns - start_ns, args))
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.observe((end_ns - start_ns) / 1e9)
+            if tid not in self.thread_names:
+                self.thread_names[tid] = threading.current_thread().name
+
+    def clear(self):
+        with self.lock:
+            self.events.clear()
+            self.histograms.clear()
+
+    def summary(self):
+        """span name -> count / p50 / p95 / p99 / mean (ms)"""
+        with self.lock:
+            return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def chrome_trace(self):
+        """Trace Event Format dict (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                 for tid, name in thread_names.items()]
+        for name, session, tid, start_ns, duration_ns, args in events:
+            event = {"name": name, "ph": "X", "pid": pid, "tid": tid,
+                     "ts": (start_ns - self.origin_ns) / 1000, "dur": duration_ns / 1000,
+                     "cat": name.split(":", 1)[0]}
+            event_args = dict(args) if args else {}
+            if session is not None:
+                event_args["session"] = str(session)
+            if event_args:
+                event["args"] = event_args
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        """Write the trace JSON atomically"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False, default=str)
+        os.replace(temp_path, path)
+        return path
+
+
+TRACER = Tracer()
+_enabled = os.environ.get("VOICE_AGENT_TRACE", "") not in ("", "0")
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def span(name, session=None, **args):
+    """Context manager timing one stage; no-op when tracing is disabled"""
+    if not _enabled:
+        return NULL_SPAN
+    return Span(TRACER, name, session, args or None)
+
+
+def session(session_id):
+    """Spans opened inside this block (same thread/task) carry session_id"""
+    if not _enabled:
+        return NULL_SPAN
+    return _SessionScope(session_id)
+
+
+def current_session():
+    return _session.get()
+
+
+# Overhead of disabled/enabled spans, then a traced conversation exported for chrome://tracing
+if __name__ == "__main__":
+    import contextlib
+    import tempfile
+    import tracing  # the instrumented modules share this module, not __main__
+    from agent import TeluguGovernmentAgent
+    from audio_cache import AudioCache
+    from memory import ConversationMemory
+    from playback import NullSink, PlaybackEngine
+    from speech import TeluguVoice
+    from speech_backends import LocalHTTPBackend
+    from standin_server import StandInServer
+    from tools import Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+    def cost_per_span(count=200000):
+        start = time.perf_counter()
+        for _ in range(count):
+            with tracing.span("bench"):
+                pass
+        return (time.perf_counter() - start) / count * 1e9
+
+    def cost_of_empty_with(count=200000):
+        """The floor: the with statement on the no-op object, no span() call"""
+        start = time.perf_counter()
+        for _ in range(count):
+            with tracing.NULL_SPAN:
+                pass
+        return (time.perf_counter() - start) / count * 1e9
+
+    tracer = tracing.TRACER
+    tracing.enable(False)
+    floor_ns = min(cost_of_empty_with() for _ in range(5))
+    disabled_ns = min(cost_per_span() for _ in range(5))
+    tracing.enable(True)
+    enabled_ns = min(cost_per_span() for _ in range(5))
+    tracer.clear()
+
+    tool1, tool2 = Tool1_EligibilityChecker(), Tool2_SchemeRecommender()
+    inputs = ["నేను రైతుని", "నా వయస్సు 35 సంవత్సరాలు", "నా ఆదాయం 2 లక్షలు", "సరే", "సరే"]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        timings = {}
+        for on in (False, True):
+            tracing.enable(on)
+            start = time.perf_counter()
+            for i in range(2000):
+                agent = TeluguGovernmentAgent(tool1=tool1, tool2=tool2, use_voice=False)
+                agent.handle_start("")
+                for text in inputs:
+                    agent.process(text)
+            timings[on] = (time.perf_counter() - start) / (2000 * len(inputs))
+        tracer.clear()
+
+        with StandInServer(latency=0.02) as server, tempfile.TemporaryDirectory() as cache_dir:
+            for i in range(3):
+                voice = TeluguVoice(backend=LocalHTTPBackend(server.url, session=f"call-{i}"),
+                                    cache=AudioCache(cache_dir),
+                                    player=PlaybackEngine(NullSink(bytes_per_second=4000)))
+                agent = TeluguGovernmentAgent(tool1=tool1, tool2=tool2, voice=voice,
+                                              memory=ConversationMemory(session_id=f"call-{i}"))
+                agent.run_voice_conversation()
+                voice.player.close()
+
+    print(f"⏱️ span cost: disabled {disabled_ns:.0f}ns (empty with block alone {floor_ns:.0f}ns), "
+          f"enabled {enabled_ns:.0f}ns")
+    print(f"⏱️ text turn: tracing off {timings[False] * 1e6:.1f}µs, on {timings[True] * 1e6:.1f}µs")
+    path = tracer.export_chrome_trace(os.path.join(tempfile.gettempdir(), "voice_agent_trace.json"))
+    print(f"📁 {len(tracer.events)} spans -> {path}")
+    for name, stats in sorted(tracer.summary().items(), key=lambda item: -item[1]["mean_ms"] * item[1]["count"]):
+        print(f"   {name:<32} {stats}")
@@ -0,0 +1,304 @@
+# transcript_replay.py - OFFLINE REPLAY OF ARCHIVED CALL TRANSCRIPTS
+#
+#   python transcript_replay.py corpus.jsonl outcomes.jsonl [--previous old_outcomes.jsonl]
+#
+# One JSON object per line with an "id" and the caller's "turns" (strings, or
+# {"user": ...} entries under "transcript"). Every transcript is re-run through
+# the agent, its memory and the SelfEvaluator in a process pool; outcomes are
+# written in input order, so a previous run's output is read in lockstep and
+# changed outcomes carry a "diff". Work goes in bounded batches: a checkpoint
+# after each batch records byte offsets, and a rerun resumes from there.
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+
+CHECKPOINT_VERSION = 1
+_worker = {}
+
+
+def _init_worker(catalog_path):
+    """Pool initializer: quiet stdout, one set of tools per worker process"""
+    from tools import DEFAULT_CATALOG, Tool1_EligibilityChecker, Tool2_SchemeRecommender
+
+    sys.stdout = open(os.devnull, "w")
+    _worker["tools"] = (Tool1_EligibilityChecker(catalog_path=catalog_path or DEFAULT_CATALOG),
+                        Tool2_SchemeRecommender())
+
+
+def transcript_turns(record):
+    turns = record.get("turns")
+    if turns is None:
+        turns = [entry.get("user", "") for entry in record.get("transcript", [])]
+    return turns
+
+
+def replay_transcript(record, tool1, tool2):
+    """Outcome of one transcript: final state, facts, eligibility and evaluation"""
+    from agent import TeluguGovernmentAgent
+    from channels import ReplayChannel
+    from memory import ConversationMemory
+    from self_evaluator import SelfEvaluator
+
+    memory = ConversationMemory(session_id=record.get("id"))
+    agent = TeluguGovernmentAgent(tool1=tool1, tool2=tool2, use_voice=False, memory=memory)
+    agent.run(ReplayChannel(transcript_turns(record)))
+    verdict = SelfEvaluator().evaluate_conversation(list(memory.history))
+    return {
+        "id": record.get("id"),
+        "final_state": agent.state,
+        "facts": dict(memory.user_facts),
+        "eligible": [scheme["id"] for scheme in agent.eligible_schemes],
+        "recommended": [rec["scheme"]["id"] for rec in agent.recommendations],
+        "contradictions": len(memory.contradictions),
+        "evaluation": verdict.get("status") or verdict.get("action"),
+    }
+
+
+def diff_outcomes(old, new):
+    """key -> [old, new] for every field that changed"""
+    return {key: [old.get(key), new.get(key)]
+            for key in sorted(old.keys() | new.keys())
+            if key != "diff" and old.get(key) != new.get(key)}
+
+
+def _replay_line(task):
+    """Worker: (transcript line, previous outcome line or None) -> (output line, changed?, failed?)
+
+    A line that cannot be parsed, replayed or compared becomes an outcome
+    with an "error", so one bad line never stops the run.
+    """
+    line, previous_line = task
+    record_id = None
+    try:
+        record = json.loads(line)
+        record_id = record.get("id")
+        outcome = replay_transcript(record, *_worker["tools"])
+    except Exception as e:
+        outcome = {"id": record_id, "error": f"{type(e).__name__}: {e}"}
+    changed = False
+    if previous_line is not None:
+        try:
+            previous = json.loads(previous_line)
+            if previous.get("id") != outcome["id"]:
+                raise ValueError(f"previous outcomes out of step: {previous.get('id')} != {outcome['id']}")
+        except Exception as e:
+            errors = [outcome.get("error"), f"{type(e).__name__}: {e}"]
+            outcome["error"] = "; ".join(error for error in errors if error)
+        else:
+            diff = diff_outcomes(previous, outcome)
+            if diff:
+                outcome["diff"] = diff
+                changed = True
+    return json.dumps(outcome, ensure_ascii=False) + "\n", changed, "error" in outcome
+
+
+class Checkpoint:
+    """Byte offsets of the input, previous and output files after the last full batch"""
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {"version": CHECKPOINT_VERSION, "input_offset": 0, "previous_offset": 0,
+                      "output_size": 0, "records": 0, "changed": 0, "errors": 0}
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"{self.path}: unknown checkpoint version")
+        self.state = state
+        return True
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+
+class TranscriptReplayer:
+    """Streams a JSONL corpus through a pool; only one batch is ever in memory
+
+    maxtasksperchild recycles workers, so whatever a transcript leaves behind
+    (caches, interned strings, fragmentation) cannot grow a worker for ever.
+    """
+
+    def __init__(self, corpus_path, output_path, previous_path=None, catalog_path=None,
+                 workers=None, batch_size=2000, chunksize=50, maxtasksperchild=2000,
+                 checkpoint_path=None):
+        self.corpus_path = corpus_path
+        self.output_path = output_path
+        self.previous_path = previous_path
+        self.catalog_path = catalog_path
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.chunksize = chunksize
+        self.maxtasksperchild = maxtasksperchild
+        self.checkpoint = Checkpoint(checkpoint_path or f"{output_path}.checkpoint")
+
+    def read_batch(self, corpus, previous):
+        tasks = []
+        while len(tasks) < self.batch_size:
+            line = corpus.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            previous_line = None
+            if previous is not None:
+                previous_line = previous.readline()
+                if not previous_line:
+                    raise ValueError(f"{self.previous_path} ends before {self.corpus_path}")
+            tasks.append((line.decode("utf-8"), previous_line and previous_line.decode("utf-8")))
+        return tasks
+
+    def run(self, resume=True, max_batches=None, on_batch=None):
+        """Replay everything not covered by the checkpoint; returns the checkpoint state"""
+        if not (resume and self.checkpoint.load()):
+            self.checkpoint = Checkpoint(self.checkpoint.path)
+        state = self.checkpoint.state
+
+        context = multiprocessing.get_context("spawn")
+        with open(self.corpus_path, "rb") as corpus, \
+                (open(self.previous_path, "rb") if self.previous_path else contextlib.nullcontext()) as previous, \
+                open(self.output_path, "ab") as output, \
+                context.Pool(self.workers, _init_worker, (self.catalog_path,),
+                             maxtasksperchild=self.maxtasksperchild) as pool:
+            # Anything written after the last checkpoint is redone
+            output.truncate(state["output_size"])
+            corpus.seek(state["input_offset"])
+            if previous is not None:
+                previous.seek(state["previous_offset"])
+
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                tasks = self.read_batch(corpus, previous)
+                if not tasks:
+                    break
+                for line, changed, failed in pool.imap(_replay_line, tasks, self.chunksize):
+                    output.write(line.encode("utf-8"))
+                    state["records"] += 1
+                    state["changed"] += changed
+                    state["errors"] += failed
+                output.flush()
+                os.fsync(output.fileno())
+                state["input_offset"] = corpus.tell()
+                state["previous_offset"] = previous.tell() if previous is not None else 0
+                state["output_size"] = output.tell()
+                self.checkpoint.save()
+                batches += 1
+                if on_batch:
+                    on_batch(state)
+        return state
+
+
+# Test + benchmark: full run, catalog change audit, interrupted run resumed
+if __name__ == "__main__":
+    import argparse
+    import filecmp
+    import shutil
+    import tempfile
+    import time
+
+    parser = argparse.ArgumentParser(description="Replay archived call transcripts")
+    parser.add_argument("corpus", nargs="?", help="JSONL transcripts (omit for the self-test)")
+    parser.add_argument("output", nargs="?", help="JSONL outcomes, appended to on resume")
+    parser.add_argument("--previous", help="outcomes of an earlier run to diff against")
+    parser.add_argument("--catalog", help="scheme catalog (JSON/CSV)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--batch", type=int, default=2000)
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--transcripts", type=int, default=20000, help="self-test corpus size")
+    args = parser.parse_args()
+
+    def progress(state):
+        print(f"   ⏳ {state['records']:,} transcripts, {state['changed']:,} changed", file=sys.stderr)
+
+    if args.corpus:
+        replayer = TranscriptReplayer(args.corpus, args.output, args.previous, args.catalog,
+                                      args.workers, args.batch)
+        state = replayer.run(resume=not args.fresh, on_batch=progress)
+        print(f"✅ {state['records']:,} transcripts, {state['changed']:,} changed, "
+              f"{state['errors']:,} errors -> {args.output}")
+        sys.exit(0)
+
+    from conversation_generator import generate_corpus, write_jsonl
+    from scheme_catalog import read_source
+    from tools import DEFAULT_CATALOG
+
+    directory = tempfile.mkdtemp(prefix="replay_")
+    try:
+        corpus_path = os.path.join(directory, "corpus.jsonl")
+        write_jsonl(corpus_path, generate_corpus(args.transcripts, seed=5))
+
+        # The "new" catalog: PM Kisan now also covers incomes up to 3 lakh
+        new_catalog = os.path.join(directory, "schemes.json")
+        schemes = read_source(DEFAULT_CATALOG)
+        for scheme in schemes:
+            if scheme["id"] == "pm_kisan":
+                scheme["max_income"] = 300000
+        with open(new_catalog, "w", encoding="utf-8") as f:
+            json.dump(schemes, f, ensure_ascii=False)
+
+        before = os.path.join(directory, "before.jsonl")
+        start = time.perf_counter()
+        worker_rss = []
+
+        def sample_rss(state):
+            sizes = []
+            for child in multiprocessing.active_children():
+                with contextlib.suppress(OSError), open(f"/proc/{child.pid}/status") as f:
+                    sizes += [int(line.split()[1]) // 1024 for line in f if line.startswith("VmRSS")]
+            worker_rss.append(max(sizes, default=0))
+
+        state = TranscriptReplayer(corpus_path, before, workers=args.workers,
+                                   batch_size=args.batch, maxtasksperchild=1000).run(on_batch=sample_rss)
+        elapsed = time.perf_counter() - start
+        print(f"📊 {state['records']:,} transcripts in {elapsed:.1f}s "
+              f"({state['records'] / elapsed:,.0f}/s), errors {state['errors']}, "
+              f"largest worker RSS after each batch {worker_rss}MB")
+
+        after = os.path.join(directory, "after.jsonl")
+        state = TranscriptReplayer(corpus_path, after, previous_path=before, catalog_path=new_catalog,
+                                   workers=args.workers, batch_size=args.batch).run()
+        print(f"🔍 new catalog: {state['changed']:,}/{state['records']:,} outcomes changed")
+        with open(after, encoding="utf-8") as f:
+            example = next(json.loads(line) for line in f if '"diff"' in line)
+        print(f"   {example['id']}: {example['diff']}")
+
+        # Stop after two batches, leave a half-written batch behind, then resume
+        resumed = os.path.join(directory, "resumed.jsonl")
+        replayer = TranscriptReplayer(corpus_path, resumed, previous_path=before,
+                                      catalog_path=new_catalog, workers=args.workers,
+                                      batch_size=args.batch)
+        partial = replayer.run(max_batches=2)
+        with open(resumed, "a", encoding="utf-8") as f:
+            f.write('{"id": "half-written')
+        state = replayer.run()
+        assert filecmp.cmp(after, resumed, shallow=False), "resumed output differs"
+        print(f"✅ interrupted after {partial['records']:,} transcripts, resumed to "
+              f"{state['records']:,}: output identical to the uninterrupted run")
+
+        # A corrupt transcript and two swapped previous outcomes are errors, not a crash
+        with open(corpus_path, encoding="utf-8") as f:
+            lines = [next(f) for _ in range(100)]
+        with open(before, encoding="utf-8") as f:
+            previous_lines = [next(f) for _ in range(100)]
+        lines[50] = "{not json\n"
+        previous_lines[10], previous_lines[11] = previous_lines[11], previous_lines[10]
+        damaged, damaged_previous = (os.path.join(directory, name) for name in ("damaged.jsonl", "swapped.jsonl"))
+        for path, content in ((damaged, lines), (damaged_previous, previous_lines)):
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(content)
+        state = TranscriptReplayer(damaged, os.path.join(directory, "damaged_out.jsonl"),
+                                   previous_path=damaged_previous, workers=2, batch_size=40).run()
+        assert (state["records"], state["errors"]) == (100, 3), state
+        print(f"✅ bad lines: {state['records']} outcomes written, {state['errors']} of them errors")
+    finally:
+        shutil.rmtree(directory)